@@ -1,10 +1,15 @@
 import os, sys
+from typing import Any
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, event, MetaData, String
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from app.lib.environment import SQLALCHEMY_DATABASE_URL
+from app.lib.environment import SQLALCHEMY_DATABASE_URL, ASYNC_DATABASE_URL, REPLICA_DATABASE_URLS
+from app.lib.name_key import name_key
+from app.db.pool import engine_options
+from app.db.routing import RoutingSession
 """
 Initializes SQLALchemy
 """
@@ -13,8 +18,15 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 load_dotenv(os.path.join(BASE_DIR, ".env"))
 sys.path.append(BASE_DIR)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+replica_engines = [create_engine(url, **engine_options(url)) for url in REPLICA_DATABASE_URLS]
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replica_engines)
+
+if ASYNC_DATABASE_URL:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession)
 
 metadata = MetaData(
     naming_convention={
@@ -26,4 +38,44 @@ metadata = MetaData(
     }
 )
 
-Base = declarative_base(metadata=metadata)
\ No newline at end of file
+Base = declarative_base(metadata=metadata)
+
+# maximum length of names of articles, stores, categories and brands
+NAME_LENGTH = 255
+# maximum length of their keys, casefolding may lengthen names
+NAME_KEY_LENGTH = 2 * NAME_LENGTH
+
+
+def NameString(length: int = NAME_LENGTH) -> String:
+    """
+    Bounded string type the database sorts and filters case-insensitively. Names are told apart by their name_key instead, as
+    collations fold case and accents differently than Python does.
+    """
+    return String(length) \
+            .with_variant(mysql.VARCHAR(length, charset="utf8mb4", collation="utf8mb4_unicode_ci"), "mysql") \
+            .with_variant(sqlite.VARCHAR(length, collation="NOCASE"), "sqlite")
+
+
+def ExactString(length: int = NAME_LENGTH) -> String:
+    """
+    Bounded string type the database compares exactly, i.e. case and accent sensitive like Python does.
+    """
+    return String(length).with_variant(mysql.VARCHAR(length, charset="utf8mb4", collation="utf8mb4_bin"), "mysql")
+
+
+def NameKeyString() -> String:
+    """
+    String type of name_key columns, compared exactly by the database.
+    """
+    return ExactString(NAME_KEY_LENGTH)
+
+
+def keyed_name(model: Any) -> Any:
+    """
+    Class decorator keeping the name_key column of <model> equal to name_key(name) whenever its name is set.
+    """
+    @event.listens_for(model.name, "set")
+    def _set_name_key(target: Any, value: Any, oldvalue: Any, initiator: Any) -> None:
+        target.name_key = name_key(value) if value is not None else None
+
+    return model
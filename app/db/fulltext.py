@@ -0,0 +1,24 @@
+import re
+from typing import Any
+from sqlalchemy import and_, func
+
+from app.lib.environment import SEARCH_FULLTEXT
+"""
+Substring filters of name columns, optionally narrowed down by MySQL FULLTEXT ngram indexes
+"""
+
+# MySQL's default ngram_token_size, shorter words are not indexed
+NGRAM_TOKEN_SIZE = 2
+
+
+def contains(column: Any, text: str) -> Any:
+    """
+    Case insensitive filter of <column> containing <text>. With SEARCH_FULLTEXT, rows are narrowed down by the column's FULLTEXT index
+    (see migration 0004) first, requiring each word of <text> as a phrase of ngrams, so MySQL doesn't compare the names of all of a user's rows.
+    """
+    clause = func.lower(column).contains(text.lower(), autoescape=True)
+    words = [word for word in re.findall(r"\w+", text) if len(word) >= NGRAM_TOKEN_SIZE]
+    if SEARCH_FULLTEXT and words:
+        clause = and_(column.match(" ".join(f'+"{word}"' for word in words)), clause)
+
+    return clause
@@ -0,0 +1,24 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.db import BASE_DIR
+"""
+Applies the Alembic migrations in migrations/ on startup
+"""
+
+
+def migrate(engine: Engine) -> None:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+
+        tables = inspect(connection).get_table_names()
+        if "User" in tables and "alembic_version" not in tables:
+            # created by Base.metadata.create_all before migrations were introduced
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
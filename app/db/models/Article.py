@@ -1,20 +1,25 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Any, List
-from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func
-from sqlalchemy.orm import Session, relationship
-import bleach
+from typing import Any, Dict, List, Tuple
+from app.db import Base, NameKeyString, NameString, NAME_KEY_LENGTH, NAME_LENGTH, keyed_name, name_key
+from sqlalchemy import Column, Index, Integer, ForeignKey, String, Text, DateTime, bindparam, func
+from sqlalchemy.orm import Query, Session, joinedload, object_session, relationship
 import app.lib as lib
+from app.lib.export import BATCH_SIZE
+from app.lib.pagination import ArticleColumns
 import app.db.models as models
 
 
+@keyed_name
 class Article(Base):
     __tablename__ = "Article"
+    __table_args__ = (Index("ix_Article_username_name_key", "username", "name_key"), )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
-    name: str = Column(Text, nullable=False)
+    name: str = Column(NameString(), nullable=False)
+    # identifies the name among the user's names, see app.lib.name_key
+    name_key: str = Column(NameKeyString(), nullable=False)
     detail: str = Column(Text, nullable=True)
 
     created_at: datetime = Column(DateTime)
@@ -23,13 +28,16 @@ class Article(Base):
     store_id: int = Column(Integer, ForeignKey("Store.id"), nullable=True)
     category_id: int = Column(Integer, ForeignKey("Category.id"), nullable=True)
     brand_id: int = Column(Integer, ForeignKey("Brand.id"), nullable=True)
+    # latest price, maintained by set_price so reading the current price does not sort the price history
+    current_price_id: int = Column(Integer, ForeignKey("Price.id", ondelete="SET NULL", use_alter=True), nullable=True)
 
     username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False)
 
     store: models.Store = relationship("Store", back_populates="articles", uselist=False)
     category: models.Category = relationship("Category", back_populates="articles", uselist=False)
     brand: models.Brand = relationship("Brand", back_populates="articles", uselist=False)
-    prices: List[models.Price] = relationship("Price", back_populates="article", cascade="all, delete")
+    prices: List[models.Price] = relationship("Price", back_populates="article", foreign_keys="Price.article_id", cascade="all, delete")
+    current_price: models.Price = relationship("Price", foreign_keys=[current_price_id], uselist=False, post_update=True)
     user: models.User = relationship("User", back_populates="articles")
 
     instances: List[models.ShoppingListItem] = relationship("ShoppingListItem", back_populates="article", cascade="all, delete")
@@ -38,12 +46,11 @@ class Article(Base):
         return self.name
 
     def price(self, at: datetime = None) -> models.Price:
-        prices = sorted(self.prices, key=lambda price: price.created_at, reverse=True)
-        if at:
-            for price in prices:
-                if price.created_at <= at:
-                    return price
-        return prices[0]
+        current_price = self.current_price
+        if current_price is not None and (not at or current_price.created_at <= at):
+            return current_price
+
+        return lib.PriceTimeline.of(self).at(at)
 
     def set_name(self, name: Any) -> None:
         name = Article.process_name(name, self.user, self)
@@ -72,6 +79,20 @@ class Article(Base):
             self.brand = brand
             self.updated_at = datetime.utcnow()
 
+    def set_price(self, price: models.Price) -> None:
+        if price != self.current_price:
+            price.article = self
+            self.current_price = price
+            self.updated_at = datetime.utcnow()
+            lib.PriceTimeline.invalidate(self.id, object_session(self))
+
+    @staticmethod
+    def loader_options() -> List[Any]:
+        """
+        Eagerly loads everything serialized by schemas.Article.
+        """
+        return [joinedload(Article.store), joinedload(Article.category), joinedload(Article.brand), joinedload(Article.current_price)]
+
     @staticmethod
     def create(user: models.User) -> Article:
         article = Article()
@@ -82,33 +103,37 @@ class Article(Base):
 
     @staticmethod
     def get(article_id: Any, user: models.User, db: Session) -> Article:
+        return lib.get_owned(Article, article_id, user, db, "article", Article.loader_options())
+
+    @staticmethod
+    def version(article_id: Any, user: models.User, db: Session) -> Tuple[Any, ...]:
+        """
+        Last updates of article <article_id>, its store, category and brand in a single query. Setting a price updates the article,
+        so this changes whenever a representation of the article or its prices does and tells unchanged articles without loading them.
+        """
         try:
             article_id = int(article_id)
         except:
             raise LookupError(f"Invalid article ID: {article_id}")
 
-        article = db.query(Article).filter(Article.id == article_id).first()
-        if article is None:
+        version = lib.owned(Article, user, db).with_entities(
+            Article.updated_at, models.Store.updated_at, models.Category.updated_at, models.Brand.updated_at
+        ).outerjoin(Article.store).outerjoin(Article.category).outerjoin(Article.brand).filter(Article.id == article_id).first()   #yapf:disable
+        if version is None:
             raise LookupError(f"No such article: {article_id}")
-        if user.role != lib.UserRoles.ADMIN:
-            if article not in user.articles:
-                raise LookupError(f"No such article: {article_id}")
 
-        return article
+        return (article_id, *version)
 
     @staticmethod
     def byName(article_name: str, user: models.User, db: Session) -> Article:
         if not isinstance(article_name, str) or not article_name:
             raise LookupError(f"No such article: {article_name}")
 
-        article_name = bleach.clean(article_name.strip(), tags=[])
+        article_name = lib.sanitize(article_name.strip())
 
-        article = db.query(Article).filter(func.lower(Article.name) == func.lower(article_name)).first()
+        article = lib.owned(Article, user, db).filter(Article.name_key == name_key(article_name)).first()
         if article is None:
             raise LookupError(f"No such article: {article_name}")
-        if user.role != lib.UserRoles.ADMIN:
-            if article not in user.categories:
-                raise LookupError(f"No such article: {article_name}")
 
         return article
 
@@ -117,28 +142,217 @@ class Article(Base):
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+
+        return lib.SearchIndex.find(Article, name, user, object_session(user))
+
+    @staticmethod
+    def ranked(user: models.User, db: Session, name: Any) -> List[int]:
+        """
+        IDs of <user>'s articles whose name contains <name>, most relevant first, see app.lib.SearchIndex.
+        """
+        if not isinstance(name, str) or not name:
+            raise ValueError("Invalid name")
 
-        products: List[Article] = []
-        for product in user.articles:
-            if name.casefold() in product.name.casefold():
-                products.append(product)
+        name: str = lib.sanitize(name.strip())
 
-        return products
+        return lib.SearchIndex.ranked(Article, name, user, db)
 
     @staticmethod
-    def process_name(name: Any, user: models.User, reference: Article) -> str:
+    def search(user: models.User, db: Session, name: Any = None) -> Query:
+        query = db.query(Article).options(*Article.loader_options()).filter(Article.username == user.username)
+        if name is not None:
+            query = query.filter(Article.id.in_(Article.ranked(user, db, name)))
+
+        return query
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: ArticleColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == ArticleColumns.NAME:
+            keys = [func.lower(Article.name)]
+        elif sort_by == ArticleColumns.PRICE:
+            query = query.outerjoin(Article.current_price)
+            # articles without a price come last in ascending order
+            keys = [models.Price.price.is_(None), func.coalesce(models.Price.price, 0)]
+        elif sort_by in (ArticleColumns.STORE, ArticleColumns.CATEGORY, ArticleColumns.BRAND):
+            attribute, related = {
+                ArticleColumns.STORE: (Article.store, models.Store),
+                ArticleColumns.CATEGORY: (Article.category, models.Category),
+                ArticleColumns.BRAND: (Article.brand, models.Brand)
+            }[sort_by]
+            query = query.outerjoin(attribute)
+            # articles without store, category or brand come last in ascending order
+            keys = [related.name.is_(None), func.coalesce(func.lower(related.name), "")]
+        else:
+            keys = [Article.updated_at]
+
+        return query, keys + [Article.id]
+
+    @staticmethod
+    def export(user: models.User, db: Session) -> Query:
+        """
+        Articles of <user> joined with their prices, ordered by article and price history, streamed in batches from a server side cursor.
+        """
+        return db.query(
+            Article.id, Article.name, Article.detail,
+            models.Store.name.label("store"), models.Category.name.label("category"), models.Brand.name.label("brand"),
+            Article.created_at, Article.updated_at,
+            models.Price.price, models.Price.currency, models.Price.created_at.label("price_created_at")
+        ).outerjoin(Article.store).outerjoin(Article.category).outerjoin(Article.brand).outerjoin(Article.prices) \
+         .filter(Article.username == user.username) \
+         .order_by(Article.id, models.Price.created_at, models.Price.id) \
+         .yield_per(BATCH_SIZE)   #yapf:disable
+
+    @staticmethod
+    def bulk_create(rows: List[Tuple[int, Any]], user: models.User, db: Session, batch_size: int = 500) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Creates an article with its first price for each (index, row) of <rows>, rows being shaped like schemas.ArticleCreate.
+        Stores, categories and brands are resolved by a lookup map loaded once, duplicates are detected in memory,
+        and articles and prices are inserted by executemany in batches of <batch_size>.
+        Returns the IDs of the created articles and (index, reason) of rows that were skipped. Does not commit.
+        """
+        related = {
+            model: {
+                instance.name_key: instance
+                for instance in db.query(model).filter(model.username == user.username)
+            }
+            for model in (models.Store, models.Category, models.Brand)
+        }
+        store_name, category_name = models.Store.name.label("store_name"), models.Category.name.label("category_name")
+        keys = {
+            (name_key(name), name_key(store or ""), name_key(category or ""))
+            for name, store, category in db.query(Article.name, store_name, category_name) \
+                                           .outerjoin(Article.store).outerjoin(Article.category) \
+                                           .filter(Article.username == user.username)
+        }   #yapf:disable
+
+        def resolve(model: Any, name: str) -> Any:
+            if not name:
+                return None
+            instance = related[model].get(name_key(name))
+            if instance is None:
+                instance = model.create(user)
+                instance.set_name(name)
+                related[model][instance.name_key] = instance
+            return instance
+
+        articles: List[Dict[str, Any]] = []
+        errors: List[Tuple[int, str]] = []
+        for index, row in rows:
+            try:
+                values = dict(
+                    name=Article.clean_name(row.name),
+                    detail=Article.process_detail(row.detail) if row.detail is not None else None,
+                    price=models.Price.process_price(row.price.price),
+                    currency=models.Price.process_currency(row.price.currency),
+                )
+                names = {
+                    model: lib.sanitize(name.strip()) if name else ""
+                    for model, name in ((models.Store, row.store), (models.Category, row.category), (models.Brand, row.brand))
+                }
+                key = (name_key(values["name"]), name_key(names[models.Store]), name_key(names[models.Category]))
+                if key in keys:
+                    raise ValueError(f"Article {values['name']} already exists")
+                # validates names of stores, categories and brands to be created before creating any of them
+                for model, name in names.items():
+                    if name and name_key(name) not in related[model]:
+                        model.process_name(name, user, None)
+            # Category.process_name raises LookupError for reserved and too long names
+            except (ValueError, LookupError) as e:
+                errors.append((index, str(e)))
+            else:
+                values.update(
+                    {
+                        relation: resolve(model, names[model])
+                        for relation, model in (("store", models.Store), ("category", models.Category), ("brand", models.Brand))
+                    }
+                )
+                keys.add(key)
+                articles.append(values)
+
+        # assigns IDs to newly created stores, categories and brands
+        db.flush()
+
+        ids: List[int] = []
+        # MySQL DATETIME columns keep whole seconds, the created rows are found again by exactly the stored time
+        now = datetime.utcnow().replace(microsecond=0)
+        article_table, price_table = Article.__table__, models.Price.__table__
+        for start in range(0, len(articles), batch_size):
+            batch = articles[start:start + batch_size]
+            for values in batch:
+                for relation in ("store", "category", "brand"):
+                    values[f"{relation}_id"] = values[relation].id if values[relation] else None
+
+            db.execute(
+                article_table.insert(),
+                [
+                    dict(name=values["name"], name_key=name_key(values["name"]), detail=values["detail"], created_at=now, updated_at=now,
+                         username=user.username, store_id=values["store_id"], category_id=values["category_id"], brand_id=values["brand_id"])
+                    for values in batch
+                ]
+            )   #yapf:disable
+            # executemany does not return generated keys, the rows are found again by their creation time and duplicate key
+            batch_keys = {
+                (name_key(values["name"]), values["store_id"], values["category_id"]): values
+                for values in batch
+            }
+            created: Dict[Tuple[str, Any, Any], int] = {}
+            for article_id, key, store_id, category_id in db.query(Article.id, Article.name_key, Article.store_id, Article.category_id) \
+                                                            .filter(Article.username == user.username, Article.created_at == now) \
+                                                            .filter(Article.name_key.in_([key for key, _, _ in batch_keys])):   #yapf:disable
+                key = (key, store_id, category_id)
+                if key in created:
+                    # another transaction committed the same article in the same second
+                    raise ValueError(f"Article {batch_keys[key]['name']} already exists")
+                if key in batch_keys:
+                    created[key] = article_id
+            batch_ids = [created[key] for key in batch_keys]
+
+            db.execute(
+                price_table.insert(),
+                [
+                    dict(price=values["price"], currency=values["currency"], created_at=now, article_id=article_id, username=user.username)
+                    for values, article_id in zip(batch, batch_ids)
+                ]
+            )   #yapf:disable
+            price_ids = db.query(models.Price.article_id, models.Price.id).filter(models.Price.article_id.in_(batch_ids))
+            db.execute(
+                article_table.update().where(article_table.c.id == bindparam("article_id")).values(current_price_id=bindparam("price_id")),
+                [dict(article_id=article_id, price_id=price_id) for article_id, price_id in price_ids]
+            )
+            ids.extend(batch_ids)
+
+        if ids:
+            lib.SearchIndex.changed(Article, user.username, db)
+            lib.Suggestions.changed(user.username, db)
+        return ids, errors
+
+    @staticmethod
+    def clean_name(name: Any) -> str:
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+        if len(name) > NAME_LENGTH or len(name_key(name)) > NAME_KEY_LENGTH:
+            raise ValueError(f"Name cannot be longer than {NAME_LENGTH} characters")
 
-        names = [
-            article.name.casefold()
-            for article in user.articles if article != reference and reference.store == article.store and reference.category == article.category
-        ]
+        return name
 
-        if name.casefold() in names:
+    @staticmethod
+    def process_name(name: Any, user: models.User, reference: Article) -> str:
+        name = Article.clean_name(name)
+
+        # stores and categories that are yet to be created have no articles
+        if any(related is not None and related.id is None for related in (reference.store, reference.category)):
+            return name
+
+        # the lookup uses ix_Article_username_name_key
+        query = object_session(user).query(Article.id).filter(Article.username == user.username, Article.name_key == name_key(name)) \
+                                    .filter(Article.store_id == (reference.store.id if reference.store else None)) \
+                                    .filter(Article.category_id == (reference.category.id if reference.category else None))   #yapf:disable
+        if reference.id is not None:
+            query = query.filter(Article.id != reference.id)
+        if query.first() is not None:
             raise ValueError(f"Article {name} already exists")
 
         return name
@@ -148,6 +362,6 @@ class Article(Base):
         if not isinstance(detail, str):
             raise ValueError("Invalid article detail")
 
-        detail = bleach.clean(detail, tags=[])
+        detail = lib.sanitize(detail)
 
         return detail
\ No newline at end of file
@@ -1,20 +1,24 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Any, List
-from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func
-from sqlalchemy.orm import Session, relationship
-import bleach
+from typing import Any, List, Tuple
+from app.db import Base, NameKeyString, NameString, NAME_KEY_LENGTH, NAME_LENGTH, keyed_name, name_key
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import Query, Session, object_session, relationship
 import app.lib as lib
+from app.lib.pagination import BrandColumns
 import app.db.models as models
 
 
+@keyed_name
 class Brand(Base):
     __tablename__ = "Brand"
+    __table_args__ = (UniqueConstraint("username", "name_key", name="uq_Brand_username_name_key"), )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
-    name: str = Column(Text, nullable=False)
+    name: str = Column(NameString(), nullable=False)
+    # identifies the name among the user's names, see app.lib.name_key
+    name_key: str = Column(NameKeyString(), nullable=False)
 
     created_at: datetime = Column(DateTime)
     updated_at: datetime = Column(DateTime)
@@ -43,33 +47,18 @@ class Brand(Base):
 
     @staticmethod
     def get(brand_id: Any, user: models.User, db: Session) -> Brand:
-        try:
-            brand_id = int(brand_id)
-        except:
-            raise LookupError(f"Invalid brand ID: {brand_id}")
-
-        brand = db.query(Brand).filter(Brand.id == brand_id).first()
-        if brand is None:
-            raise LookupError(f"No such brand: {brand_id}")
-        if user.role != lib.UserRoles.ADMIN:
-            if brand not in user.brands:
-                raise LookupError(f"No such brand: {brand_id}")
-
-        return brand
+        return lib.get_owned(Brand, brand_id, user, db, "brand")
 
     @staticmethod
     def byName(brand_name: str, user: models.User, db: Session) -> Brand:
         if not isinstance(brand_name, str) or not brand_name:
             raise LookupError(f"No such brand: {brand_name}")
 
-        brand_name = bleach.clean(brand_name.strip(), tags=[])
+        brand_name = lib.sanitize(brand_name.strip())
 
-        brand = db.query(Brand).filter(func.lower(Brand.name) == func.lower(brand_name)).first()
+        brand = lib.Catalog.lookup(Brand, brand_name, user, db)
         if brand is None:
             raise LookupError(f"No such brand: {brand_name}")
-        if user.role != lib.UserRoles.ADMIN:
-            if brand not in user.brands:
-                raise LookupError(f"No such brand: {brand_name}")
 
         return brand
 
@@ -78,24 +67,42 @@ class Brand(Base):
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+
+        return lib.SearchIndex.find(Brand, name, user, object_session(user))
 
-        brands: List[Brand] = []
-        for brand in user.brands:
-            if name.casefold() in brand.name.casefold():
-                brands.append(brand)
+    @staticmethod
+    def search(user: models.User, db: Session, name: Any = None) -> Query:
+        query = db.query(Brand).filter(Brand.username == user.username)
+        if name is not None:
+            if not isinstance(name, str) or not name:
+                raise ValueError("Invalid name")
+
+            name: str = lib.sanitize(name.strip())
+            query = query.filter(Brand.id.in_(lib.SearchIndex.ranked(Brand, name, user, db)))
+
+        return query
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: BrandColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == BrandColumns.NAME:
+            keys = [func.lower(Brand.name)]
+        else:
+            keys = [Brand.updated_at]
 
-        return brands
+        return query, keys + [Brand.id]
 
     @staticmethod
     def process_name(name: Any, user: models.User, reference: Brand) -> str:
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+        if len(name) > NAME_LENGTH or len(name_key(name)) > NAME_KEY_LENGTH:
+            raise ValueError(f"Name cannot be longer than {NAME_LENGTH} characters")
 
-        names = [brand.name.casefold() for brand in user.brands if reference != brand]
-        if name.lower() in names:
+        existing = lib.Catalog.of(Brand, user, object_session(user)).id(name)
+        if existing is not None and (reference is None or existing != reference.id):
             raise ValueError(f"Brand {name} already exists")
 
         return name
\ No newline at end of file
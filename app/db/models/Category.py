@@ -1,20 +1,24 @@
 from __future__ import annotations
-from typing import Any, List
-from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func
-from sqlalchemy.orm import Session, relationship
+from typing import Any, List, Tuple
+from app.db import Base, NameKeyString, NameString, NAME_KEY_LENGTH, NAME_LENGTH, keyed_name, name_key
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import Query, Session, object_session, relationship
 from datetime import datetime
-import bleach
 import app.lib as lib
+from app.lib.pagination import CategoryColumns
 import app.db.models as models
 
 
+@keyed_name
 class Category(Base):
     __tablename__ = "Category"
+    __table_args__ = (UniqueConstraint("username", "name_key", name="uq_Category_username_name_key"), )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
-    name: str = Column(Text, nullable=False)
+    name: str = Column(NameString(), nullable=False)
+    # identifies the name among the user's names, see app.lib.name_key
+    name_key: str = Column(NameKeyString(), nullable=False)
     created_at: datetime = Column(DateTime)
     updated_at: datetime = Column(DateTime)
 
@@ -43,33 +47,18 @@ class Category(Base):
 
     @staticmethod
     def get(category_id: Any, user: models.User, db: Session) -> Category:
-        try:
-            category_id = int(category_id)
-        except:
-            raise LookupError(f"Invalid store ID: {category_id}")
-
-        category = db.query(Category).filter(Category.id == category_id).first()
-        if category is None:
-            raise LookupError(f"No such category: {category_id}")
-        if user.role != lib.UserRoles.ADMIN:
-            if category not in user.categories:
-                raise LookupError(f"No such category: {category_id}")
-
-        return category
+        return lib.get_owned(Category, category_id, user, db, "category")
 
     @staticmethod
     def byName(category_name: str, user: models.User, db: Session) -> Category:
         if not isinstance(category_name, str) or not category_name:
             raise LookupError(f"No such category: {category_name}")
 
-        category_name = bleach.clean(category_name.strip(), tags=[])
+        category_name = lib.sanitize(category_name.strip())
 
-        category = db.query(Category).filter(func.lower(Category.name) == func.lower(category_name)).first()
+        category = lib.Catalog.lookup(Category, category_name, user, db)
         if category is None:
             raise LookupError(f"No such category: {category_name}")
-        if user.role != lib.UserRoles.ADMIN:
-            if category not in user.categories:
-                raise LookupError(f"No such category: {category_name}")
 
         return category
 
@@ -78,26 +67,44 @@ class Category(Base):
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+
+        return lib.SearchIndex.find(Category, name, user, object_session(user))
 
-        categories: List[Category] = []
-        for category in user.categories:
-            if name.casefold() in category.name.casefold():
-                categories.append(category)
+    @staticmethod
+    def search(user: models.User, db: Session, name: Any = None) -> Query:
+        query = db.query(Category).filter(Category.username == user.username)
+        if name is not None:
+            if not isinstance(name, str) or not name:
+                raise ValueError("Invalid name")
+
+            name: str = lib.sanitize(name.strip())
+            query = query.filter(Category.id.in_(lib.SearchIndex.ranked(Category, name, user, db)))
+
+        return query
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: CategoryColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == CategoryColumns.NAME:
+            keys = [func.lower(Category.name)]
+        else:
+            keys = [Category.updated_at]
 
-        return categories
+        return query, keys + [Category.id]
 
     @staticmethod
     def process_name(name: Any, user: models.User, reference: Category) -> str:
         if not isinstance(name, str) or not name:
             raise LookupError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+        if len(name) > NAME_LENGTH or len(name_key(name)) > NAME_KEY_LENGTH:
+            raise LookupError(f"Name cannot be longer than {NAME_LENGTH} characters")
         if name == "uncategorized":
             raise LookupError("Invalid name")
 
-        names = [category.name.casefold() for category in user.categories if reference != category]
-        if name.casefold() in names:
+        existing = lib.Catalog.of(Category, user, object_session(user)).id(name)
+        if existing is not None and (reference is None or existing != reference.id):
             raise LookupError(f"Category {name} already exists")
 
         return name
\ No newline at end of file
@@ -0,0 +1,56 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, List
+from app.db import Base, ExactString
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, select
+from sqlalchemy.orm import Session, relationship
+import app.db.models as models
+
+
+class ListCost(Base):
+    """
+    Snapshot of the cost of a shopping list for one category, "uncategorized" or "total".
+    Snapshots are up to date as long as their created_at equals the updated_at of their list. Categories are keyed exactly like
+    the dictionaries of ShoppingList.compute_costs, so e.g. "Total" or "Café" don't collide with "total" or "Cafe".
+    """
+    __tablename__ = "ListCost"
+
+    list_id: int = Column(Integer, ForeignKey("ShoppingList.id", ondelete="CASCADE"), primary_key=True)
+    category: str = Column(ExactString(), primary_key=True)
+    cost: float = Column(Float, nullable=False)
+    created_at: datetime = Column(DateTime)
+
+    list: models.ShoppingList = relationship("ShoppingList", back_populates="costs")
+
+    def __str__(self) -> str:
+        return f"{self.category}: {self.cost}"
+
+    @staticmethod
+    def to_dict(list_costs: List[ListCost]) -> Dict[str, float]:
+        costs = {
+            list_cost.category: list_cost.cost
+            for list_cost in list_costs
+        }
+
+        cost = {
+            category: costs[category]
+            for category in sorted(costs.keys()) if category not in ("uncategorized", "total")
+        }
+        cost["uncategorized"] = costs.get("uncategorized", 0)
+        cost["total"] = costs.get("total", sum([cost[category] for category in cost.keys()]))
+        return cost
+
+    @staticmethod
+    def invalidate(article_id: Any, db: Session) -> None:
+        """
+        Drops the snapshots of all lists containing article <article_id>, e.g. after its category changed.
+        """
+        ListCost.invalidate_articles([article_id], db)
+
+    @staticmethod
+    def invalidate_articles(article_ids: List[Any], db: Session) -> None:
+        """
+        Drops the snapshots of all lists containing any of <article_ids>, e.g. after prices were added to their history.
+        """
+        list_ids = select(models.ShoppingListItem.list_id).where(models.ShoppingListItem.article_id.in_(article_ids))
+        db.query(ListCost).filter(ListCost.list_id.in_(list_ids)).delete(synchronize_session="fetch")
@@ -1,17 +1,25 @@
 from __future__ import annotations
-from typing import Any, List
-
-import bleach
-from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, Float, DateTime
-from sqlalchemy.orm import Session, relationship
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from app.db import Base, name_key
+from sqlalchemy import Column, Index, Integer, ForeignKey, String, Text, Boolean, Float, DateTime, event, func, select
+from sqlalchemy.orm import Session, object_session, relationship
 from datetime import datetime
 import app.db.models as models
-from app.lib.UserRoles import UserRoles
+from app.lib.ownership import get_owned
+from app.lib.sanitize import sanitize
+from app.lib.PriceTimeline import PriceTimeline
+
+# price of a price feed row, not yet inserted
+FeedPrice = namedtuple("FeedPrice", ["article_id", "created_at", "price", "currency"])
 
 
 class Price(Base):
     __tablename__ = "Price"
+    __table_args__ = (Index("ix_Price_article_id_created_at", "article_id", "created_at"), )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -20,9 +28,9 @@ class Price(Base):
     currency: str = Column(String(32), nullable=False)
 
     article_id: int = Column(Integer, ForeignKey("Article.id", ondelete="CASCADE"), nullable=False)
-    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False)
+    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False, index=True)
 
-    article: models.Article = relationship("Article", back_populates="prices", uselist=False)
+    article: models.Article = relationship("Article", back_populates="prices", foreign_keys=[article_id], uselist=False)
     user: models.User = relationship("User", back_populates="prices")
 
     def __str__(self) -> str:
@@ -38,19 +46,125 @@ class Price(Base):
 
     @staticmethod
     def get(price_id: Any, user: models.User, db: Session) -> Price:
-        try:
-            price_id = int(price_id)
-        except:
-            raise LookupError(f"Invalid price ID: {price_id}")
+        return get_owned(Price, price_id, user, db, "price")
 
-        price = db.query(Price).filter(Price.id == price_id).first()
-        if price is None:
-            raise LookupError(f"No such price: {price_id}")
-        if user.role != UserRoles.ADMIN:
-            if price not in user.prices:
-                raise LookupError(f"No such price: {price_id}")
+    @staticmethod
+    def at(article_id: Any, at: Any) -> Any:
+        """
+        SQL expression for the price of article <article_id> valid at <at>, falling back to the latest price like Article.price does.
+        """
+        latest = select(Price.price).where(Price.article_id == article_id).order_by(Price.created_at.desc()).limit(1)
+        return func.coalesce(latest.where(Price.created_at <= at).scalar_subquery(), latest.scalar_subquery())
 
-        return price
+    @staticmethod
+    def import_feed(rows: Iterable[Tuple[int, Dict[str, Any]]],
+                    user: models.User,
+                    db: Session,
+                    batch_size: int = 1000,
+                    max_errors: int = 100) -> Dict[str, Any]:
+        """
+        Adds prices from a price feed, (line, row) with columns store, name, brand, price, currency and date, to the articles of <user>.
+        Articles are matched by (store, name, brand) through an index built by a single query. Rows whose price equals the price
+        valid at their date are skipped, all others are inserted with their date as created_at by executemany in batches of
+        <batch_size>, so <rows> are consumed incrementally.
+        Returns the number of inserted, unchanged and failed rows and (line, reason) of the first <max_errors> failures. Does not commit.
+        Raises a ValueError naming the line of a date with a time zone.
+        """
+        articles: Dict[Tuple[str, str, str], Any] = {}
+        for article_id, name, store, brand in db.query(models.Article.id, models.Article.name, models.Store.name, models.Brand.name) \
+                                                .outerjoin(models.Article.store).outerjoin(models.Article.brand) \
+                                                .filter(models.Article.username == user.username):
+            key = (name_key(store or ""), name_key(name), name_key(brand or ""))
+            # articles only differing by category cannot be told apart
+            articles[key] = None if key in articles else article_id
+
+        result = dict(inserted=0, unchanged=0, failed=0, errors=[])
+        timelines: Dict[int, PriceTimeline] = {}
+        changed: Set[int] = set()
+
+        def fail(line: int, reason: str) -> None:
+            result["failed"] += 1
+            if len(result["errors"]) < max_errors:
+                result["errors"].append((line, reason))
+
+        def insert(batch: List[Tuple[int, FeedPrice]]) -> None:
+            missing = set(price.article_id for _, price in batch) - timelines.keys()
+            history = {
+                article_id: []
+                for article_id in missing
+            }
+            for price in db.query(Price.article_id, Price.created_at, Price.price, Price.currency).filter(Price.article_id.in_(missing)):
+                history[price.article_id].append(price)
+            for article_id, prices in history.items():
+                timelines[article_id] = PriceTimeline(prices)
+
+            rows = []
+            for line, price in batch:
+                timeline = timelines[price.article_id]
+                # the price valid at the row's date, or any price of exactly that time, makes re-importing a feed a no-op
+                candidates = timeline.prices[bisect_left(timeline.timestamps, price.created_at):bisect_right(timeline.timestamps, price.created_at)]
+                if timeline.prices:
+                    candidates.append(timeline.at(price.created_at))
+                if any((candidate.price, candidate.currency) == (price.price, price.currency) for candidate in candidates):
+                    result["unchanged"] += 1
+                    continue
+                timeline.add(price)
+                changed.add(price.article_id)
+                rows.append(
+                    dict(
+                        price=price.price, currency=price.currency, created_at=price.created_at, article_id=price.article_id, username=user.username
+                    )
+                )
+            if rows:
+                db.execute(Price.__table__.insert(), rows)
+                result["inserted"] += len(rows)
+
+        # feeds repeat stores, brands, articles and currencies on many rows, each distinct value is sanitized once
+        clean = lru_cache(maxsize=65536)(lambda value: name_key(sanitize(value.strip())))
+        process_currency = lru_cache(maxsize=256)(Price.process_currency)
+
+        batch: List[Tuple[int, FeedPrice]] = []
+        for line, row in rows:
+            try:
+                key = tuple(clean(row.get(column) or "") for column in ("store", "name", "brand"))
+                if not key[1]:
+                    raise ValueError("Missing article name")
+                if key not in articles:
+                    raise LookupError(f"No such article: {row.get('name')}")
+                if articles[key] is None:
+                    raise LookupError(f"Article {row.get('name')} is ambiguous")
+                date = (row.get("date") or "").strip()
+                price = FeedPrice(
+                    article_id=articles[key],
+                    created_at=datetime.fromisoformat(date) if date else datetime.utcnow(),
+                    price=Price.process_price(row.get("price")),
+                    currency=process_currency(row.get("currency"))
+                )
+            except (ValueError, LookupError) as e:
+                fail(line, str(e))
+                continue
+            if price.created_at.tzinfo is not None:
+                # dates are stored as naive UTC times, which cannot be compared with dates in a time zone
+                raise ValueError(f"Line {line}: dates cannot have a time zone")
+
+            batch.append((line, price))
+            if len(batch) >= batch_size:
+                insert(batch)
+                batch = []
+        if batch:
+            insert(batch)
+
+        # the current price may have changed, and changing any price changes the representations of the article, see Article.version
+        changed_ids = sorted(changed)
+        for start in range(0, len(changed_ids), batch_size):
+            article_ids = changed_ids[start:start + batch_size]
+            current_price = select(Price.id).where(Price.article_id == models.Article.id).order_by(Price.created_at.desc(), Price.id.desc()).limit(1)
+            db.query(models.Article).filter(models.Article.id.in_(article_ids)) \
+              .update(dict(current_price_id=current_price.scalar_subquery(), updated_at=datetime.utcnow()), synchronize_session=False)   #yapf:disable
+            # costs of lists are based on the prices valid when they were last updated, which may have changed now
+            models.ListCost.invalidate_articles(article_ids, db)
+
+        return result
 
     @staticmethod
     def process_price(price: Any) -> str:
@@ -68,5 +182,11 @@ class Price(Base):
         if not isinstance(currency, str) or not currency:
             raise ValueError("Invalid currency")
 
-        currency = bleach.clean(currency, tags=[])
-        return currency
\ No newline at end of file
+        currency = sanitize(currency)
+        return currency
+
+
+@event.listens_for(Price, "after_insert")
+@event.listens_for(Price, "after_delete")
+def invalidate_price_timeline(mapper, connection, price: Price) -> None:
+    PriceTimeline.invalidate(price.article_id, object_session(price))
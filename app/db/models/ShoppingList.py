@@ -1,11 +1,12 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Any, List
+from typing import Any, Dict, List, Tuple
 from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, DateTime
-from sqlalchemy.orm import Session, relationship
-import bleach
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, DateTime, func, select
+from sqlalchemy.orm import Query, Session, object_session, relationship, selectinload
 import app.lib as lib
+from app.lib.export import BATCH_SIZE
+from app.lib.pagination import ListColumns
 import app.db.models as models
 
 
@@ -20,10 +21,11 @@ class ShoppingList(Base):
 
     category_id: int = Column(Integer, ForeignKey("Category.id"), nullable=True)
     category: models.Category = relationship("Category", back_populates="lists")
-    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False)
+    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False, index=True)
     user: models.User = relationship("User", back_populates="lists")
 
     items: List[models.ShoppingListItem] = relationship("ShoppingListItem", back_populates="parent", cascade="all, delete")
+    costs: List[models.ListCost] = relationship("ListCost", back_populates="list", cascade="all, delete, delete-orphan")
 
     def __str__(self) -> str:
         return self.title
@@ -32,14 +34,14 @@ class ShoppingList(Base):
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
 
-        list_items: List[models.ShoppingListItem] = []
-        for item in self.items:
-            if name.casefold() in item.article.name.casefold():
-                list_items.append(item)
-
-        return list_items
+        # ranks items like their articles
+        ranks = {
+            id: rank
+            for rank, id in enumerate(lib.SearchIndex.of(models.Article, self.user, object_session(self)).search(name))
+        }
+        return sorted((item for item in self.items if item.article_id in ranks), key=lambda item: ranks[item.article_id])
 
     def set_title(self, title: Any) -> None:
         title = ShoppingList.process_title(title)
@@ -66,7 +68,14 @@ class ShoppingList(Base):
                 return False
         return True
 
-    def cost(self):
+    def cost(self) -> Dict[str, float]:
+        if self.areCostsUpToDate():
+            return models.ListCost.to_dict(self.costs)
+
+        db = object_session(self)
+        if db is not None and self.id is not None:
+            return ShoppingList.compute_costs([self], db)[self.id]
+
         cost = dict()
         uncategorized_cost: float = 0
         for item in self.items:
@@ -82,6 +91,193 @@ class ShoppingList(Base):
         cost["total"] = sum([cost[category] for category in cost.keys()])
         return cost
 
+    def update_costs(self, db: Session) -> None:
+        """
+        Rewrites the cost snapshots of this list unless they are up to date.
+        """
+        if self.areCostsUpToDate():
+            return
+
+        cost = ShoppingList.compute_costs([self], db)[self.id]
+        list_costs = {
+            list_cost.category: list_cost
+            for list_cost in self.costs
+        }
+        for category, category_cost in cost.items():
+            if category not in list_costs.keys():
+                list_costs[category] = models.ListCost(category=category)
+            list_costs[category].cost = category_cost
+            list_costs[category].created_at = self.updated_at
+        self.costs = [list_costs[category] for category in cost.keys()]
+
+    def export_items(self, db: Session) -> Query:
+        """
+        Store name, article name, amount and cost at the list's last update of every item of this list in a single query.
+        """
+        return db.query(
+            models.Store.name.label("store"), models.Article.name.label("article"), models.ShoppingListItem.amount,
+            models.ShoppingListItem.cost_at(self.updated_at).label("cost")
+        ).select_from(models.ShoppingListItem).join(models.ShoppingListItem.article).outerjoin(models.Article.store) \
+         .filter(models.ShoppingListItem.list_id == self.id) \
+         .order_by(models.ShoppingListItem.id)   #yapf:disable
+
+    def export_version(self, db: Session) -> Tuple[Any, ...]:
+        """
+        Changes whenever an export of this list does: changing items bumps the list's updated_at,
+        renaming articles or stores bumps their own.
+        """
+        articles_updated_at, stores_updated_at = db.query(func.max(models.Article.updated_at), func.max(models.Store.updated_at)) \
+                                                   .select_from(models.ShoppingListItem).join(models.ShoppingListItem.article) \
+                                                   .outerjoin(models.Article.store) \
+                                                   .filter(models.ShoppingListItem.list_id == self.id).one()   #yapf:disable
+        return (self.id, self.updated_at, articles_updated_at, stores_updated_at)
+
+    def apply_item_changes(self, create: List[Any], update: List[Any], delete: List[Any], user: models.User, db: Session) -> List[int]:
+        """
+        Adds, updates and deletes items of this list as described by <create>, <update> and <delete> (shaped like
+        schemas.ListItemCreate, schemas.ListItemUpdate and item IDs), validating all of them before anything is written to <db>.
+        Articles are looked up by a single query, duplicates are detected by a set of article IDs and new items are inserted
+        by a single executemany. Returns the IDs of the updated and created items. Does not commit.
+        """
+        if self.finalized:
+            raise ValueError(f"Items of finalized list {self.id} cannot be changed.")
+
+        items = {
+            item.id: item
+            for item in self.items
+        }
+        article_ids = set(item.article_id for item in items.values())
+
+        requested = set(item.article_id for item in create) | set(item.article_id for item in update if item.article_id is not None)
+        articles = {
+            article.id: article
+            for article in lib.owned(models.Article, user, db).options(*models.Article.loader_options(), selectinload(models.Article.prices)) \
+                              .filter(models.Article.id.in_(requested))
+        }   #yapf:disable
+        missing = requested - articles.keys()
+        if missing:
+            raise LookupError(f"No such article: {min(missing)}")
+
+        def item_of_list(item_id: Any) -> models.ShoppingListItem:
+            if item_id not in items:
+                raise LookupError(f"Item {item_id} is not an item of shopping list {self.id}.")
+            return items[item_id]
+
+        deleted = [item_of_list(item_id) for item_id in dict.fromkeys(delete)]
+        for item in deleted:
+            del items[item.id]
+            article_ids.discard(item.article_id)
+
+        changes: List[Tuple[models.ShoppingListItem, Any]] = [(item_of_list(item.id), item) for item in update]
+        for current_item, item in changes:
+            if item.article_id is not None and item.article_id != current_item.article_id:
+                if item.article_id in article_ids:
+                    raise ValueError(f"Shopping list {self.id} already contains article {articles[item.article_id].name}")
+                article_ids.discard(current_item.article_id)
+                article_ids.add(item.article_id)
+            if item.amount is not None:
+                models.ShoppingListItem.process_amount(item.amount)
+            if item.price is not None:
+                models.ShoppingListItem.process_price(item.price.price)
+
+        for item in create:
+            if item.article_id in article_ids:
+                raise ValueError(f"Shopping list {self.id} already contains article {articles[item.article_id].name}")
+            article_ids.add(item.article_id)
+            models.ShoppingListItem.process_amount(item.amount)
+            if item.price is not None:
+                models.ShoppingListItem.process_price(item.price.price)
+
+        for item in deleted:
+            db.delete(item)
+
+        item_ids: List[int] = []
+        for current_item, item in changes:
+            if item.article_id is not None:
+                current_item.set_article(articles[item.article_id])
+            if item.amount is not None:
+                current_item.set_amount(item.amount)
+            if item.price is not None:
+                current_item.set_price(item.price.price)
+            item_ids.append(current_item.id)
+
+        # the setters bump updated_at once per change, all changes share a single update time instead
+        now = datetime.utcnow()
+        if deleted or create or db.is_modified(self):
+            self.updated_at = now
+
+        if create:
+            db.flush()
+            rows = []
+            for item in create:
+                offer_price = models.ShoppingListItem.process_price(item.price.price) if item.price is not None else None
+                if offer_price == articles[item.article_id].price(now).price:
+                    offer_price = None
+                rows.append(
+                    dict(article_id=item.article_id, amount=models.ShoppingListItem.process_amount(item.amount), offer_price=offer_price,
+                         created_at=now, updated_at=now, list_id=self.id, username=user.username)
+                )   #yapf:disable
+            db.execute(models.ShoppingListItem.__table__.insert(), rows)
+            lib.Suggestions.used(user.username, [row["article_id"] for row in rows], 1, db)
+            db.expire(self, ["items"])
+            # a list contains each article once, so the generated IDs are found again by article
+            created = dict(
+                db.query(models.ShoppingListItem.article_id, models.ShoppingListItem.id) \
+                  .filter(models.ShoppingListItem.list_id == self.id, models.ShoppingListItem.article_id.in_(row["article_id"] for row in rows))
+            )   #yapf:disable
+            item_ids.extend(created[row["article_id"]] for row in rows)
+
+        self.update_costs(db)
+
+        return item_ids
+
+    @staticmethod
+    def compute_costs(lists: List[ShoppingList], db: Session) -> Dict[int, Dict[str, float]]:
+        """
+        Costs of <lists> by category and in total, computed by a single aggregate query for all lists not computed before.
+        Results are cached in the session by list and update time.
+        """
+        if db.new or db.dirty or db.deleted:
+            db.flush()
+
+        cache = db.info.setdefault("list_costs", dict())
+        missing = {
+            list.id: list
+            for list in lists if (list.id, list.updated_at) not in cache
+        }
+        if missing:
+            costs = {
+                list_id: dict()
+                for list_id in missing.keys()
+            }
+            item_costs = func.sum(models.ShoppingListItem.cost_at(ShoppingList.updated_at))
+            rows = db.query(models.ShoppingListItem.list_id, models.Category.name, item_costs) \
+                     .join(models.ShoppingListItem.parent) \
+                     .join(models.ShoppingListItem.article) \
+                     .outerjoin(models.Article.category) \
+                     .filter(models.ShoppingListItem.list_id.in_(missing.keys())) \
+                     .group_by(models.ShoppingListItem.list_id, models.Category.id, models.Category.name) \
+                     .all()
+            for list_id, category, cost in rows:
+                costs[list_id][category if category is not None else "uncategorized"] = cost or 0
+
+            for list_id, cost in costs.items():
+                cost["uncategorized"] = cost.pop("uncategorized", 0)
+                cost["total"] = sum([cost[category] for category in cost.keys()])
+                cache[(list_id, missing[list_id].updated_at)] = cost
+
+        return {
+            list.id: cache[(list.id, list.updated_at)]
+            for list in lists
+        }
+
+    @staticmethod
+    def loader_options() -> List[Any]:
+        """
+        Eagerly loads everything serialized by schemas.List.
+        """
+        return [selectinload(ShoppingList.costs)]
+
     @staticmethod
     def create(user: models.User) -> ShoppingList:
         shopping_list = ShoppingList()
@@ -92,38 +288,99 @@ class ShoppingList(Base):
 
     @staticmethod
     def get(list_id: Any, user: models.User, db: Session) -> ShoppingList:
+        return lib.get_owned(ShoppingList, list_id, user, db, "list", ShoppingList.loader_options())
+
+    @staticmethod
+    def version(list_id: Any, user: models.User, db: Session) -> Tuple[Any, ...]:
+        """
+        Last update of shopping list <list_id>, its item count and the last updates of its items, their articles, stores and categories
+        in a single query. Changes whenever a representation of the list does, so it can tell unchanged lists without loading them.
+        """
         try:
             list_id = int(list_id)
         except:
             raise LookupError(f"Invalid list ID: {list_id}")
 
-        shopping_list = db.query(ShoppingList).filter(ShoppingList.id == list_id).first()
-        if shopping_list is None:
+        version = lib.owned(ShoppingList, user, db).with_entities(
+            ShoppingList.updated_at, func.count(models.ShoppingListItem.id), func.max(models.ShoppingListItem.updated_at),
+            func.max(models.Article.updated_at), func.max(models.Store.updated_at), func.max(models.Category.updated_at)
+        ).outerjoin(ShoppingList.items).outerjoin(models.ShoppingListItem.article).outerjoin(models.Article.store) \
+         .outerjoin(models.Article.category).filter(ShoppingList.id == list_id) \
+         .group_by(ShoppingList.id, ShoppingList.updated_at).first()   #yapf:disable
+        if version is None:
             raise LookupError(f"No such list: {list_id}")
-        if user.role != lib.UserRoles.ADMIN:
-            if shopping_list not in user.lists:
-                raise LookupError(f"No such list: {list_id}")
 
-        return shopping_list
+        return (list_id, *version)
 
     @staticmethod
     def find(title: Any, user: models.User) -> List[ShoppingList]:
         if not isinstance(title, str) or not title:
             raise ValueError("Invalid name")
 
-        title: str = bleach.clean(title.strip(), tags=[])
+        title: str = lib.sanitize(title.strip())
+
+        return lib.SearchIndex.find(ShoppingList, title, user, object_session(user))
+
+    @staticmethod
+    def ranked(user: models.User, db: Session, title: Any) -> List[int]:
+        """
+        IDs of <user>'s shopping lists whose title contains <title>, most relevant first, see app.lib.SearchIndex.
+        """
+        if not isinstance(title, str) or not title:
+            raise ValueError("Invalid name")
+
+        title: str = lib.sanitize(title.strip())
+
+        return lib.SearchIndex.ranked(ShoppingList, title, user, db)
 
-        lists: List[ShoppingList] = []
-        for list in user.lists:
-            if title.casefold() in list.title.casefold():
-                lists.append(list)
+    @staticmethod
+    def search(user: models.User, db: Session, title: Any = None) -> Query:
+        query = db.query(ShoppingList).options(*ShoppingList.loader_options()).filter(ShoppingList.username == user.username)
+        if title is not None:
+            query = query.filter(ShoppingList.id.in_(ShoppingList.ranked(user, db, title)))
+
+        return query
+
+    @staticmethod
+    def export(user: models.User, db: Session) -> Query:
+        """
+        Shopping lists of <user> joined with their items, ordered by list and item, streamed in batches from a server side cursor.
+        """
+        return db.query(
+            ShoppingList.id, ShoppingList.title, models.Category.name.label("category"), ShoppingList.finalized,
+            ShoppingList.created_at, ShoppingList.updated_at,
+            models.ShoppingListItem.id.label("item_id"), models.ShoppingListItem.article_id, models.Article.name.label("article"),
+            models.ShoppingListItem.amount, models.ShoppingListItem.offer_price,
+            models.ShoppingListItem.created_at.label("item_created_at"), models.ShoppingListItem.updated_at.label("item_updated_at")
+        ).outerjoin(ShoppingList.category).outerjoin(ShoppingList.items).outerjoin(models.ShoppingListItem.article) \
+         .filter(ShoppingList.username == user.username) \
+         .order_by(ShoppingList.id, models.ShoppingListItem.id) \
+         .yield_per(BATCH_SIZE)   #yapf:disable
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: ListColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == ListColumns.TITLE:
+            keys = [func.lower(ShoppingList.title)]
+        elif sort_by == ListColumns.COST:
+            cost = select(func.sum(models.ShoppingListItem.cost_at(ShoppingList.updated_at))) \
+                    .where(models.ShoppingListItem.list_id == ShoppingList.id) \
+                    .scalar_subquery()
+            keys = [func.coalesce(cost, 0)]
+        elif sort_by == ListColumns.FINALIZED:
+            keys = [ShoppingList.finalized]
+        elif sort_by == ListColumns.CATEGORY:
+            query = query.outerjoin(ShoppingList.category)
+            # uncategorized lists come last in ascending order
+            keys = [models.Category.name.is_(None), func.coalesce(func.lower(models.Category.name), "")]
+        else:
+            keys = [ShoppingList.updated_at]
 
-        return lists
+        return query, keys + [ShoppingList.id]
 
     @staticmethod
     def process_title(title: Any) -> str:
         if not isinstance(title, str) or not title:
             raise ValueError("Shopping list titles cannot be null")
 
-        title = bleach.clean(str(title.strip()), tags=[])
-        return title
\ No newline at end of file
+        title = lib.sanitize(str(title.strip()))
+        return title
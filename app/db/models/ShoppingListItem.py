@@ -1,10 +1,11 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Any
+from typing import Any, List, Tuple
 from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Float, DateTime
-from sqlalchemy.orm import Session, relationship
-from app.lib import UserRoles
+from sqlalchemy import Column, Integer, ForeignKey, String, Float, DateTime, func
+from sqlalchemy.orm import Query, Session, joinedload, relationship
+from app.lib import PriceTimeline, get_owned
+from app.lib.pagination import ListItemColumns
 import app.db.models as models
 import app.schemas as schemas
 
@@ -13,15 +14,15 @@ class ShoppingListItem(Base):
     __tablename__ = "ShoppingListItem"
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
-    article_id: int = Column(Integer, ForeignKey("Article.id", ondelete="CASCADE"), nullable=False)
+    article_id: int = Column(Integer, ForeignKey("Article.id", ondelete="CASCADE"), nullable=False, index=True)
     amount: float = Column(Float)
     offer_price: float = Column(Float, nullable=True)
 
     created_at: datetime = Column(DateTime)
     updated_at: datetime = Column(DateTime)
 
-    list_id: int = Column(Integer, ForeignKey("ShoppingList.id", ondelete="CASCADE"), nullable=False)
-    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False)
+    list_id: int = Column(Integer, ForeignKey("ShoppingList.id", ondelete="CASCADE"), nullable=False, index=True)
+    username: str = Column(String(32), ForeignKey("User.username", ondelete="CASCADE"), nullable=False, index=True)
 
     article: models.Article = relationship("Article", back_populates="instances")
     user: models.User = relationship("User", back_populates="list_items")
@@ -67,6 +68,36 @@ class ShoppingListItem(Base):
             self.updated_at = datetime.utcnow()
             self.parent.updated_at = self.updated_at
 
+    @staticmethod
+    def loader_options() -> List[Any]:
+        """
+        Eagerly loads everything needed to price an item for schemas.ListItem. Only the current price of its article is loaded,
+        the price histories of items whose list was last updated before the current price was set are loaded by load_prices.
+        """
+        article = joinedload(ShoppingListItem.article)
+        return [joinedload(ShoppingListItem.parent), article.joinedload(models.Article.current_price)]
+
+    @staticmethod
+    def load_prices(items: List[ShoppingListItem], db: Session) -> None:
+        """
+        Loads the price histories of the articles of all <items> priced at an earlier time than their current price by a single query.
+        """
+        cached = db.info.get("price_timelines", dict())
+        stale = set()
+        for item in items:
+            # see Article.price
+            current_price, at = item.article.current_price, item.parent.updated_at
+            if item.article_id not in cached and (current_price is None or at and current_price.created_at > at):
+                stale.add(item.article_id)
+        if stale:
+            histories = {
+                article_id: []
+                for article_id in stale
+            }
+            for price in db.query(models.Price).filter(models.Price.article_id.in_(list(stale))):
+                histories[price.article_id].append(price)
+            PriceTimeline.load(histories, db)
+
     @staticmethod
     def create(user: models.User) -> ShoppingListItem:
         item = ShoppingListItem()
@@ -77,19 +108,61 @@ class ShoppingListItem(Base):
 
     @staticmethod
     def get(item_id: Any, user: models.User, db: Session) -> ShoppingListItem:
-        try:
-            item_id = int(item_id)
-        except:
-            raise LookupError(f"Invalid list item ID: {item_id}")
+        return get_owned(ShoppingListItem, item_id, user, db, "list item", ShoppingListItem.loader_options())
 
-        list_item = db.query(ShoppingListItem).filter(ShoppingListItem.id == item_id).first()
-        if list_item is None:
-            raise LookupError(f"No list item: {item_id}")
-        if user.role != UserRoles.ADMIN:
-            if list_item not in user.list_items:
-                raise LookupError(f"No such list item: {item_id}")
+    @staticmethod
+    def cost_at(at: Any) -> Any:
+        """
+        SQL expression for the cost of an item (amount times offer price or regular price valid at <at>).
+        """
+        return ShoppingListItem.amount * func.coalesce(ShoppingListItem.offer_price, models.Price.at(ShoppingListItem.article_id, at))
 
-        return list_item
+    @staticmethod
+    def ranked(shopping_list: models.ShoppingList, db: Session, name: Any) -> List[int]:
+        """
+        IDs of the items of <shopping_list> whose article's name contains <name>, ranked like their articles.
+        """
+        ranks = {
+            article_id: rank
+            for rank, article_id in enumerate(models.Article.ranked(shopping_list.user, db, name))
+        }
+        items = db.query(ShoppingListItem.id, ShoppingListItem.article_id) \
+                  .filter(ShoppingListItem.list_id == shopping_list.id, ShoppingListItem.article_id.in_(list(ranks)))   #yapf:disable
+        return [item.id for item in sorted(items, key=lambda item: (ranks[item.article_id], item.id))]
+
+    @staticmethod
+    def search(shopping_list: models.ShoppingList, db: Session, name: Any = None) -> Query:
+        query = db.query(ShoppingListItem).options(*ShoppingListItem.loader_options()).filter(ShoppingListItem.list_id == shopping_list.id)
+        if name is not None:
+            query = query.filter(ShoppingListItem.article_id.in_(models.Article.ranked(shopping_list.user, db, name)))
+
+        return query
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: ListItemColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == ListItemColumns.NAME:
+            query = query.join(ShoppingListItem.article)
+            keys = [func.lower(models.Article.name)]
+        elif sort_by == ListItemColumns.COST:
+            query = query.join(ShoppingListItem.parent)
+            # items without a price at the time of the list come last in ascending order
+            cost = ShoppingListItem.cost_at(models.ShoppingList.updated_at)
+            keys = [cost.is_(None), func.coalesce(cost, 0)]
+        elif sort_by == ListItemColumns.AMOUNT:
+            keys = [ShoppingListItem.amount]
+        elif sort_by in (ListItemColumns.STORE, ListItemColumns.CATEGORY, ListItemColumns.BRAND):
+            attribute, related = {
+                ListItemColumns.STORE: (models.Article.store, models.Store),
+                ListItemColumns.CATEGORY: (models.Article.category, models.Category),
+                ListItemColumns.BRAND: (models.Article.brand, models.Brand)
+            }[sort_by]
+            query = query.join(ShoppingListItem.article).outerjoin(attribute)
+            # items without store, category or brand come last in ascending order
+            keys = [related.name.is_(None), func.coalesce(func.lower(related.name), "")]
+        else:
+            keys = [ShoppingListItem.updated_at]
+
+        return query, keys + [ShoppingListItem.id]
 
     @staticmethod
     def process_amount(amount: Any) -> str:
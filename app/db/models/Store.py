@@ -1,20 +1,24 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Any, List
-from app.db import Base
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func
-from sqlalchemy.orm import Session, relationship
-import bleach
+from typing import Any, List, Tuple
+from app.db import Base, NameKeyString, NameString, NAME_KEY_LENGTH, NAME_LENGTH, keyed_name, name_key
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, UniqueConstraint, func
+from sqlalchemy.orm import Query, Session, object_session, relationship
 import app.lib as lib
+from app.lib.pagination import StoreColumns
 import app.db.models as models
 
 
+@keyed_name
 class Store(Base):
     __tablename__ = "Store"
+    __table_args__ = (UniqueConstraint("username", "name_key", name="uq_Store_username_name_key"), )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
 
-    name: str = Column(Text, nullable=False)
+    name: str = Column(NameString(), nullable=False)
+    # identifies the name among the user's names, see app.lib.name_key
+    name_key: str = Column(NameKeyString(), nullable=False)
 
     created_at: datetime = Column(DateTime)
     updated_at: datetime = Column(DateTime)
@@ -43,33 +47,18 @@ class Store(Base):
 
     @staticmethod
     def get(store_id: Any, user: models.User, db: Session) -> Store:
-        try:
-            store_id = int(store_id)
-        except:
-            raise LookupError(f"Invalid store ID: {store_id}")
-
-        store = db.query(Store).filter(Store.id == store_id).first()
-        if store is None:
-            raise LookupError(f"No such store: {store_id}")
-        if user.role != lib.UserRoles.ADMIN:
-            if store not in user.stores:
-                raise LookupError(f"No such store: {store_id}")
-
-        return store
+        return lib.get_owned(Store, store_id, user, db, "store")
 
     @staticmethod
     def byName(store_name: str, user: models.User, db: Session) -> Store:
         if not isinstance(store_name, str) or not store_name:
             raise LookupError(f"No such store: {store_name}")
 
-        store_name = bleach.clean(store_name.strip(), tags=[])
+        store_name = lib.sanitize(store_name.strip())
 
-        store = db.query(Store).filter(func.lower(Store.name) == func.lower(store_name)).first()
+        store = lib.Catalog.lookup(Store, store_name, user, db)
         if store is None:
             raise LookupError(f"No such store: {store_name}")
-        if user.role != lib.UserRoles.ADMIN:
-            if store not in user.stores:
-                raise LookupError(f"No such store: {store_name}")
 
         return store
 
@@ -78,24 +67,42 @@ class Store(Base):
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+
+        return lib.SearchIndex.find(Store, name, user, object_session(user))
 
-        stores: List[Store] = []
-        for store in user.stores:
-            if name.casefold() in store.name.casefold():
-                stores.append(store)
+    @staticmethod
+    def search(user: models.User, db: Session, name: Any = None) -> Query:
+        query = db.query(Store).filter(Store.username == user.username)
+        if name is not None:
+            if not isinstance(name, str) or not name:
+                raise ValueError("Invalid name")
+
+            name: str = lib.sanitize(name.strip())
+            query = query.filter(Store.id.in_(lib.SearchIndex.ranked(Store, name, user, db)))
+
+        return query
+
+    @staticmethod
+    def sort_keys(query: Query, sort_by: StoreColumns) -> Tuple[Query, List[Any]]:
+        if sort_by == StoreColumns.NAME:
+            keys = [func.lower(Store.name)]
+        else:
+            keys = [Store.updated_at]
 
-        return stores
+        return query, keys + [Store.id]
 
     @staticmethod
     def process_name(name: Any, user: models.User, reference: Store) -> str:
         if not isinstance(name, str) or not name:
             raise ValueError("Invalid name")
 
-        name: str = bleach.clean(name.strip(), tags=[])
+        name: str = lib.sanitize(name.strip())
+        if len(name) > NAME_LENGTH or len(name_key(name)) > NAME_KEY_LENGTH:
+            raise ValueError(f"Name cannot be longer than {NAME_LENGTH} characters")
 
-        names = [store.name.casefold() for store in user.stores if reference != store]
-        if name.lower() in names:
+        existing = lib.Catalog.of(Store, user, object_session(user)).id(name)
+        if existing is not None and (reference is None or existing != reference.id):
             raise ValueError(f"Store {name} already exists")
 
         return name
\ No newline at end of file
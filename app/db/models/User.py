@@ -1,11 +1,12 @@
 from __future__ import annotations
 from typing import Any, List
 from app.db import Base
-from sqlalchemy import Column, String, Text, Boolean
+from sqlalchemy import Column, Integer, String, Text, Boolean
 from sqlalchemy.orm import Session, relationship
-import bleach, re, hashlib
+import re
 import app.db.models as models
-import app.lib.environment as env
+from app.lib.passwords import hash_password
+from app.lib.sanitize import sanitize
 
 
 class User(Base):
@@ -17,6 +18,8 @@ class User(Base):
     pw_hash: str = Column(Text, nullable=False)
     role: str = Column(Text, nullable=False)
     logged_in: bool = Column(Boolean, default=False)
+    # part of every access token, incrementing it revokes all tokens issued before
+    token_version: int = Column(Integer, nullable=False, default=0, server_default="0")
 
     lists: List[models.ShoppingList] = relationship("ShoppingList", back_populates="user", cascade="all, delete, delete-orphan")
     list_items: List[models.ShoppingListItem] = relationship("ShoppingListItem", back_populates="user", cascade="all, delete, delete-orphan")
@@ -37,18 +40,20 @@ class User(Base):
 
         return user
 
+    def revoke_tokens(self) -> None:
+        self.token_version = (self.token_version or 0) + 1
+
     @staticmethod
     def process_username(username: Any, db: Session) -> str:
         if not isinstance(username, str) or not username:
             raise ValueError(f"Invalid user name")
 
-        usernames = [u.username for u in db.query(User).all()]
-        if username in usernames:
-            raise ValueError(f"User name {username} is already used")
-
         if re.match("^[a-zA-Z0-9_]*$", username) is None or len(username) > 32:
             raise ValueError(f"User name must be a string of at most 32 alphanumeric characters")
 
+        if db.query(User.username).filter(User.username == username).first() is not None:
+            raise ValueError(f"User name {username} is already used")
+
         return username
 
     @staticmethod
@@ -56,7 +61,7 @@ class User(Base):
         if not isinstance(name, str) or not name:
             raise ValueError(f"Invalid first name")
 
-        name = bleach.clean(name, tags=[])
+        name = sanitize(name)
         if len(name) > 64:
             raise ValueError(f"First name cannot be longer than 64 characters")
 
@@ -67,7 +72,7 @@ class User(Base):
         if not isinstance(name, str) or not name:
             raise ValueError(f"Invalid last name")
 
-        name = bleach.clean(name, tags=[])
+        name = sanitize(name)
         if len(name) > 64:
             raise ValueError(f"Last name cannot be longer than 64 characters")
 
@@ -78,6 +83,4 @@ class User(Base):
         if not isinstance(password, str) or not password:
             raise ValueError(f"Invalid password")
 
-        hash = hashlib.sha512((password + env.SALT).encode("UTF-8")).hexdigest()
-
-        return hash
+        return hash_password(password)
@@ -6,4 +6,5 @@ from app.db.models.Store import Store
 from app.db.models.Brand import Brand
 from app.db.models.Price import Price
 from app.db.models.ShoppingList import ShoppingList
-from app.db.models.ShoppingListItem import ShoppingListItem
\ No newline at end of file
+from app.db.models.ShoppingListItem import ShoppingListItem
+from app.db.models.ListCost import ListCost
\ No newline at end of file
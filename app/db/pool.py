@@ -0,0 +1,115 @@
+from threading import Lock
+from typing import Any, Dict
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.lib.environment import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_POOL_USE_LIFO
+"""
+Connection pool configuration and metrics
+"""
+
+
+class PoolMetrics:
+    """
+    Counters of a connection pool, collected since the application started.
+    A checkout is an overflow checkout if more than pool_size connections were in use afterwards.
+    """
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.checkout_seconds_max = 0.0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.lock = Lock()
+
+    def record_checkout(self, seconds: float, overflow: bool) -> None:
+        with self.lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            if overflow:
+                self.overflow_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self.lock:
+            self.timeouts += 1
+
+    def report(self, pool: QueuePool) -> Dict[str, Any]:
+        with self.lock:
+            return dict(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                checkouts=self.checkouts,
+                checkout_ms_mean=self.checkout_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                checkout_ms_max=self.checkout_seconds_max * 1000,
+                overflow_checkouts=self.overflow_checkouts,
+                timeouts=self.timeouts,
+            )
+
+
+class MeteredPool:
+    """
+    Mixin for QueuePool classes measuring how long checkouts take, including waiting for a free connection and pre-ping.
+    """
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.checkedout() > self.size())
+        return connection
+
+    def recreate(self):
+        # invalidating all connections replaces the pool, keep counting in the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(MeteredPool, QueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+class MeteredAsyncAdaptedQueuePool(MeteredPool, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_engine() or create_async_engine() configuring the pool of <url> from the environment.
+    Only drivers pooled by a QueuePool by default (e.g. MySQL) get a metered pool; file based SQLite keeps its NullPool.
+    """
+    options = dict(pool_pre_ping=DB_POOL_PRE_PING, pool_recycle=DB_POOL_RECYCLE)
+    url = make_url(url)
+    pool_class = url.get_dialect().get_pool_class(url)
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            poolclass=MeteredAsyncAdaptedQueuePool if issubclass(pool_class, AsyncAdaptedQueuePool) else MeteredQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_use_lifo=DB_POOL_USE_LIFO,
+        )
+    return options
+
+
+def pool_metrics(pool: Pool) -> Dict[str, Any]:
+    """
+    Current state and counters of <pool>, None if it isn't metered.
+    """
+    if isinstance(pool, MeteredPool):
+        return pool.metrics.report(pool)
+    return None
@@ -0,0 +1,54 @@
+from typing import List
+import random
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.lib.environment import READ_YOUR_WRITES_SECONDS
+from app.lib.LRUCache import LRUCache
+from app.lib.last_write import wrote_recently
+"""
+Routes read-only sessions to replica databases
+"""
+
+# users who committed changes in this process within the last READ_YOUR_WRITES_SECONDS, they read from the primary to see their
+# own writes. Other workers only know about these writes if the client sends their time along, see app.lib.last_write
+recent_writers = LRUCache(10000, READ_YOUR_WRITES_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Session reading from a random one of <replicas> if info["read_only"] is set, writing to and reading from its bind otherwise.
+    Once a session flushed, and for READ_YOUR_WRITES_SECONDS after the user in info["username"] committed changes in this process
+    or the client's last write in info["last_write"], all of its statements go to the primary, so users don't read older data than
+    they wrote.
+    """
+    def __init__(self, replicas: List[Engine] = (), **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.replicas = list(replicas)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas and self.reads_from_replica():
+            return random.choice(self.replicas)
+        return super().get_bind(mapper, clause, **kwargs)
+
+    def reads_from_replica(self) -> bool:
+        if not self.info.get("read_only") or self._flushing or self.info.get("wrote") or wrote_recently(self.info.get("last_write")):
+            return False
+        username = self.info.get("username")
+        return username is None or recent_writers.get(username) is None
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: RoutingSession, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: RoutingSession) -> None:
+    if not session.info.get("wrote"):
+        return
+    session.info["written_at"] = time.time()
+    if session.info.get("username") is not None:
+        recent_writers.set(session.info["username"], True)
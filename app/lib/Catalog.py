@@ -0,0 +1,99 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.lib.environment import CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL
+from app.lib.LRUCache import LRUCache
+from app.lib.name_key import name_key
+from app.lib.ownership import owned
+from app.lib.session_caches import register
+from app.lib.UserRoles import UserRoles
+
+# tables whose rows are catalog entries, i.e. are named uniquely per user and referenced by articles
+CATALOG_TABLES = ("Store", "Category", "Brand")
+
+
+@register
+class Catalog:
+    """
+    IDs of the stores, categories or brands of a user by name key (see app.lib.name_key), so article writes resolve and validate
+    names without querying or loading all entries. Catalogs are cached in-process per table and user for CATALOG_CACHE_TTL seconds and dropped
+    whenever a transaction creating, renaming or deleting one of their entries commits. Sessions that changed a catalog without
+    committing yet load it from their own transaction and don't cache it.
+    """
+
+    cache = LRUCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL)
+    tables = CATALOG_TABLES
+
+    def __init__(self, rows: Iterable[Tuple[int, str]]) -> None:
+        self.ids: Dict[str, int] = {}
+        for id, key in rows:
+            self.ids.setdefault(key, id)
+
+    def id(self, name: str) -> Optional[int]:
+        return self.ids.get(name_key(name))
+
+    @staticmethod
+    def key(model: Any, username: str) -> Tuple[str, str]:
+        return (model.__tablename__, username)
+
+    @staticmethod
+    def of(model: Any, user: Any, db: Session) -> Catalog:
+        key = Catalog.key(model, user.username)
+        if key in db.info.get("changed_catalogs", ()):
+            return Catalog(db.query(model.id, model.name_key).filter(model.username == user.username).order_by(model.id))
+
+        catalog = Catalog.cache.get(key)
+        if catalog is None:
+            catalog = Catalog(db.query(model.id, model.name_key).filter(model.username == user.username).order_by(model.id))
+            Catalog.cache.set(key, catalog)
+
+        return catalog
+
+    @staticmethod
+    def lookup(model: Any, name: str, user: Any, db: Session) -> Any:
+        """
+        The <model> instance named <name> (case insensitive) of <user>, or of any user for administrators, None if there is none.
+        """
+        id = Catalog.of(model, user, db).id(name)
+        instance = db.get(model, id) if id is not None else None
+        if id is not None and instance is None:
+            # deleted by another process since the catalog was cached
+            Catalog.invalidate(model, user.username)
+            return Catalog.lookup(model, name, user, db)
+
+        if instance is None and user.role == UserRoles.ADMIN:
+            instance = owned(model, user, db).filter(model.name_key == name_key(name)).first()
+        return instance
+
+    @staticmethod
+    def invalidate(model: Any, username: str) -> None:
+        Catalog.cache.pop(Catalog.key(model, username))
+
+    @staticmethod
+    def invalidate_user(username: str) -> None:
+        for table in CATALOG_TABLES:
+            Catalog.cache.pop((table, username))
+
+    @staticmethod
+    def flushed(session: Session, instances: List[Any], dirty: Set[Any], deleted: Set[Any]) -> None:
+        changed = session.info.setdefault("changed_catalogs", set())
+        for instance in instances:
+            # entries become dirty whenever articles are added to or removed from them, only renaming them changes the catalog
+            if instance in dirty and not inspect(instance).attrs.name.history.has_changes():
+                continue
+            # None if the owner of a deleted entry was never loaded, all catalogs are dropped then
+            changed.add(Catalog.key(type(instance), instance.__dict__.get("username")))
+
+    @staticmethod
+    def committed(session: Session) -> None:
+        for table, username in session.info.pop("changed_catalogs", ()):
+            if username is None:
+                Catalog.cache.clear()
+            else:
+                Catalog.cache.pop((table, username))
+
+    @staticmethod
+    def rolled_back(session: Session) -> None:
+        session.info.pop("changed_catalogs", None)
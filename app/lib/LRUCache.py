@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Tuple
+import time
+
+
+class LRUCache:
+    """
+    Thread safe cache holding at most <maxsize> entries, evicting the least recently used one first.
+    Entries expire <ttl> seconds after they were set, or never if <ttl> is None.
+    Counts hits and misses so the cache can be sized.
+    """
+    def __init__(self, maxsize: int, ttl: float = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key: Hashable) -> Any:
+        """
+        Like get, but neither counts a hit or miss nor marks the entry as used, for maintaining cached values in place.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                return entry[1]
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize < 1:
+            return
+
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy.orm import object_session
+
+
+class PriceTimeline:
+    """
+    Price history of one article sorted by creation time. Point-in-time lookups are binary searches.
+    Timelines are cached in the info dictionary of the article's session, i.e. per request, and invalidated whenever a price of
+    the article is inserted or deleted.
+    """
+    def __init__(self, prices: List[Any]) -> None:
+        self.prices = sorted(prices, key=lambda price: price.created_at)
+        self.timestamps: List[datetime] = [price.created_at for price in self.prices]
+
+    def at(self, at: datetime = None) -> Any:
+        if not self.prices:
+            raise LookupError("Article has no prices")
+
+        if at:
+            index = bisect_right(self.timestamps, at)
+            if index > 0:
+                return self.prices[index - 1]
+        # like before any price existed, fall back to the latest price
+        return self.prices[-1]
+
+    def add(self, price: Any) -> None:
+        index = bisect_right(self.timestamps, price.created_at)
+        self.prices.insert(index, price)
+        self.timestamps.insert(index, price.created_at)
+
+    @staticmethod
+    def of(article: Any) -> PriceTimeline:
+        db = object_session(article)
+        if db is None or article.id is None:
+            return PriceTimeline(article.prices)
+
+        timelines = db.info.setdefault("price_timelines", dict())
+        if article.id not in timelines:
+            timelines[article.id] = PriceTimeline(article.prices)
+
+        return timelines[article.id]
+
+    @staticmethod
+    def load(histories: Dict[Any, List[Any]], db: Any) -> None:
+        """
+        Caches timelines of the price <histories> by article ID in <db>, e.g. loaded by a single query for many articles,
+        so PriceTimeline.of doesn't load them one article at a time.
+        """
+        timelines = db.info.setdefault("price_timelines", dict())
+        for article_id, prices in histories.items():
+            timelines.setdefault(article_id, PriceTimeline(prices))
+
+    @staticmethod
+    def invalidate(article_id: Any, db: Any) -> None:
+        if db is not None:
+            db.info.get("price_timelines", dict()).pop(article_id, None)
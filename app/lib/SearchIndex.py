@@ -0,0 +1,183 @@
+from __future__ import annotations
+import heapq
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.db.fulltext import contains
+from app.lib.environment import SEARCH_INDEX_SIZE, SEARCH_INDEX_TTL
+from app.lib.LRUCache import LRUCache
+from app.lib.session_caches import register
+
+# indexed tables and their name columns
+INDEXED_COLUMNS = {
+    "Article": "name",
+    "ShoppingList": "title",
+    "Store": "name",
+    "Category": "name",
+    "Brand": "name"
+}
+
+
+@register
+class SearchIndex:
+    """
+    Trigram inverted index of the names of one user's articles, lists, stores, categories or brands, answering case insensitive
+    substring queries ranked by relevance without touching the database. Indexes are cached in-process per table and user for
+    SEARCH_INDEX_TTL seconds and updated in place whenever a transaction creating, renaming or deleting one of their rows commits.
+    With SEARCH_INDEX_TTL 0 nothing is cached, names are filtered by SQL (narrowed down by FULLTEXT indexes with SEARCH_FULLTEXT)
+    and only the matches are indexed to rank them.
+    """
+
+    cache = LRUCache(SEARCH_INDEX_SIZE, SEARCH_INDEX_TTL)
+    tables = tuple(INDEXED_COLUMNS)
+
+    def __init__(self, rows: Iterable[Tuple[int, str]] = ()) -> None:
+        self.names: Dict[int, str] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.lock = Lock()
+        for id, name in rows:
+            self.add(id, name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        return set(text[index:index + 3] for index in range(len(text) - 2))
+
+    def add(self, id: int, name: str) -> None:
+        with self.lock:
+            self._remove(id)
+            name = name.casefold()
+            self.names[id] = name
+            for trigram in SearchIndex.trigrams(name):
+                self.postings.setdefault(trigram, set()).add(id)
+
+    def remove(self, id: int) -> None:
+        with self.lock:
+            self._remove(id)
+
+    def _remove(self, id: int) -> None:
+        name = self.names.pop(id, None)
+        if name is not None:
+            for trigram in SearchIndex.trigrams(name):
+                ids = self.postings[trigram]
+                ids.discard(id)
+                if not ids:
+                    del self.postings[trigram]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        IDs of the names containing <query>, case insensitive, ranked by relevance. Names sharing all trigrams of <query> are candidates,
+        queries shorter than a trigram check every name.
+        """
+        query = query.casefold()
+        with self.lock:
+            trigrams = SearchIndex.trigrams(query)
+            if trigrams:
+                postings = sorted((self.postings.get(trigram, set()) for trigram in trigrams), key=len)
+                candidates = postings[0].intersection(*postings[1:])
+            else:
+                candidates = self.names.keys()
+            names = self.names
+            matches = [(position, id, names[id]) for position, id in ((names[id].find(query), id) for id in candidates) if position >= 0]
+
+        # names starting with <query> first, the exact match being the shortest of them, then names with a word starting with it,
+        # then earlier and then shorter matches
+        rank = lambda match: (match[0] != 0, match[0] > 0 and match[2][match[0] - 1].isalnum(), match[0], len(match[2]), match[2], match[1])
+        ranked = heapq.nsmallest(limit, matches, key=rank) if limit is not None else sorted(matches, key=rank)
+        return [id for _, id, _ in ranked]
+
+    @staticmethod
+    def key(model: Any, username: str) -> Tuple[str, str]:
+        return (model.__tablename__, username)
+
+    @staticmethod
+    def of(model: Any, user: Any, db: Session) -> SearchIndex:
+        """
+        Index of the names of <user>'s <model> rows, loaded by a single query if it isn't cached.
+        """
+        column = getattr(model, INDEXED_COLUMNS[model.__tablename__])
+        key = SearchIndex.key(model, user.username)
+        if key in db.info.get("changed_search_indexes", ()):
+            # the session changed rows that aren't committed yet, caching them could make rolled back names show up
+            return SearchIndex(db.query(model.id, column).filter(model.username == user.username))
+
+        index = SearchIndex.cache.get(key)
+        if index is None:
+            index = SearchIndex(db.query(model.id, column).filter(model.username == user.username))
+            SearchIndex.cache.set(key, index)
+
+        return index
+
+    @staticmethod
+    def ranked(model: Any, query: str, user: Any, db: Session, limit: Optional[int] = None) -> List[int]:
+        """
+        IDs of <user>'s <model> rows whose name contains <query>, ranked by relevance.
+        """
+        if SEARCH_INDEX_TTL > 0:
+            return SearchIndex.of(model, user, db).search(query, limit)
+
+        column = getattr(model, INDEXED_COLUMNS[model.__tablename__])
+        return SearchIndex(db.query(model.id, column).filter(model.username == user.username, contains(column, query))).search(query, limit)
+
+    @staticmethod
+    def find(model: Any, query: str, user: Any, db: Session, limit: Optional[int] = None) -> List[Any]:
+        """
+        <user>'s <model> rows whose name contains <query>, ranked by relevance, loaded by a single query by primary key.
+        """
+        ids = SearchIndex.ranked(model, query, user, db, limit)
+        rows = {
+            row.id: row
+            for row in db.query(model).filter(model.id.in_(ids))
+        } if ids else {}
+        # rows deleted by other processes may still be indexed
+        return [rows[id] for id in ids if id in rows]
+
+    @staticmethod
+    def changed(model: Any, username: str, db: Session) -> None:
+        """
+        Drops the index of <username>'s <model> rows once <db> commits. Has to be called by writes bypassing the ORM, like executemany inserts.
+        """
+        db.info.setdefault("changed_search_indexes", set()).add(SearchIndex.key(model, username))
+        db.info.setdefault("rebuilt_search_indexes", set()).add(SearchIndex.key(model, username))
+
+    @staticmethod
+    def flushed(session: Session, instances: List[Any], dirty: Set[Any], deleted: Set[Any]) -> None:
+        changes = session.info.setdefault("search_index_changes", [])
+        for instance in instances:
+            table = type(instance).__tablename__
+            column = INDEXED_COLUMNS[table]
+            if instance in dirty and not inspect(instance).attrs[column].history.has_changes():
+                continue
+
+            username = instance.__dict__.get("username")
+            name = None if instance in deleted else getattr(instance, column)
+            changes.append(((table, username), instance.id, name))
+            session.info.setdefault("changed_search_indexes", set()).add((table, username))
+
+    @staticmethod
+    def committed(session: Session) -> None:
+        session.info.pop("changed_search_indexes", None)
+        rebuilt = session.info.pop("rebuilt_search_indexes", set())
+        for key in rebuilt:
+            SearchIndex.cache.pop(key)
+
+        for key, id, name in session.info.pop("search_index_changes", ()):
+            if key[1] is None:
+                # owner of a deleted row was never loaded
+                SearchIndex.cache.clear()
+                continue
+            index = SearchIndex.cache.peek(key) if key not in rebuilt else None
+            if index is not None:
+                if name is None:
+                    index.remove(id)
+                else:
+                    index.add(id, name)
+
+    @staticmethod
+    def rolled_back(session: Session) -> None:
+        for name in ("changed_search_indexes", "rebuilt_search_indexes", "search_index_changes"):
+            session.info.pop(name, None)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import heapq
+from bisect import bisect_left
+from enum import Enum
+from html import unescape
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import Session
+
+from app.lib.environment import SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL
+from app.lib.LRUCache import LRUCache
+from app.lib.session_caches import register
+
+# attributes of rows whose changes change suggestions, usage counts of list items are maintained separately
+SUGGESTED_ATTRIBUTES = {
+    "Article": ("name", "store", "category", "brand"),
+    "Store": ("name", ),
+    "Category": ("name", ),
+    "Brand": ("name", )
+}
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+
+class SuggestionTypes(str, Enum):
+    ARTICLE = "article"
+    STORE = "store"
+    CATEGORY = "category"
+    BRAND = "brand"
+
+
+@register
+class Suggestions:
+    """
+    Names of one user's articles, stores, categories or brands as a sorted array of the casefolded name from each word on, so prefix
+    queries of any word are binary searches. Matches are ranked by how many shopping list items use them.
+    Suggestions are built by a single query on first use, cached in-process per type and user for SUGGEST_CACHE_TTL seconds and
+    dropped whenever a transaction changing the user's articles, stores, categories, brands or list items commits.
+    """
+
+    cache = LRUCache(SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL)
+    tables = (*SUGGESTED_ATTRIBUTES, "ShoppingListItem")
+
+    def __init__(self, rows: Iterable[Tuple[int, str, int]]) -> None:
+        self.names: Dict[int, str] = {}
+        self.folded: Dict[int, str] = {}
+        self.uses: Dict[int, int] = {}
+        entries: List[Tuple[str, int]] = []
+        for id, name, uses in rows:
+            self.names[id] = name
+            self.uses[id] = uses
+            # names are stored escaped, users type the characters
+            folded = self.folded[id] = unescape(name).casefold()
+            entries.extend((folded[start:], id) for start in range(len(folded)) if start == 0 or not folded[start - 1].isalnum())
+
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [id for _, id in entries]
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[int, str, int]]:
+        """
+        (ID, name, uses) of up to <limit> names with a word starting with <prefix>, most used first,
+        then names starting with <prefix> and then shorter names.
+        """
+        if not isinstance(prefix, str) or not prefix.strip():
+            raise ValueError("Invalid prefix")
+        if not isinstance(limit, int) or not 0 < limit <= MAX_SUGGESTIONS:
+            raise ValueError(f"Limit must be between 1 and {MAX_SUGGESTIONS}")
+
+        prefix = prefix.strip().casefold()
+        # keys starting with <prefix> sort between it and it followed by the highest code point
+        start, end = bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\U0010ffff")
+
+        rank = lambda id: (-self.uses[id], not self.folded[id].startswith(prefix), len(self.folded[id]), self.folded[id], id)
+        return [(id, self.names[id], self.uses[id]) for id in heapq.nsmallest(limit, set(self.ids[start:end]), key=rank)]
+
+    def use(self, id: int, count: int) -> None:
+        if id in self.uses:
+            self.uses[id] += count
+
+    @staticmethod
+    def load(type: SuggestionTypes, username: str, db: Session) -> Suggestions:
+        from app.db.models import Article, Brand, Category, ShoppingListItem, Store
+        if type == SuggestionTypes.ARTICLE:
+            query = db.query(Article.id, Article.name, func.count(ShoppingListItem.id)).outerjoin(Article.instances) \
+                      .filter(Article.username == username).group_by(Article.id, Article.name)   #yapf:disable
+        else:
+            model = {
+                SuggestionTypes.STORE: Store,
+                SuggestionTypes.CATEGORY: Category,
+                SuggestionTypes.BRAND: Brand
+            }[type]
+            query = db.query(model.id, model.name, func.count(ShoppingListItem.id)).outerjoin(model.articles).outerjoin(Article.instances) \
+                      .filter(model.username == username).group_by(model.id, model.name)   #yapf:disable
+
+        return Suggestions(query)
+
+    @staticmethod
+    def of(type: SuggestionTypes, user: Any, db: Session) -> Suggestions:
+        if user.username in db.info.get("changed_suggestions", ()):
+            # the session changed rows that aren't committed yet, caching them could make rolled back names show up
+            return Suggestions.load(type, user.username, db)
+
+        suggestions = Suggestions.cache.get((type, user.username))
+        if suggestions is None:
+            suggestions = Suggestions.load(type, user.username, db)
+            Suggestions.cache.set((type, user.username), suggestions)
+
+        return suggestions
+
+    @staticmethod
+    def changed(username: str, db: Session) -> None:
+        """
+        Drops the suggestions of <username> once <db> commits. Has to be called by writes bypassing the ORM, like executemany inserts.
+        """
+        db.info.setdefault("changed_suggestions", set()).add(username)
+
+    @staticmethod
+    def used(username: str, article_ids: Iterable[int], count: int, db: Session) -> None:
+        """
+        Adds <count> uses of each of <article_ids> to the article suggestions of <username> once <db> commits, drops its other suggestions.
+        Has to be called by list item writes bypassing the ORM, like executemany inserts.
+        """
+        db.info.setdefault("used_suggestions", []).extend((username, article_id, count) for article_id in article_ids)
+
+    @staticmethod
+    def invalidate(username: str, types: Iterable[SuggestionTypes] = SuggestionTypes) -> None:
+        for type in types:
+            Suggestions.cache.pop((type, username))
+
+    @staticmethod
+    def flushed(session: Session, instances: List[Any], dirty: Set[Any], deleted: Set[Any]) -> None:
+        for instance in instances:
+            table = type(instance).__tablename__
+            # None if the owner of a deleted row was never loaded, all suggestions are dropped then
+            username = instance.__dict__.get("username")
+            if table in SUGGESTED_ATTRIBUTES:
+                # rows also become dirty whenever articles or items are added to or removed from them
+                attributes = inspect(instance).attrs
+                if instance not in dirty or any(attributes[name].history.has_changes() for name in SUGGESTED_ATTRIBUTES[table]):
+                    Suggestions.changed(username, session)
+            elif instance not in dirty:
+                Suggestions.used(username, [instance.article_id], -1 if instance in deleted else 1, session)
+            else:
+                # items only change usage counts by changing their article
+                history = inspect(instance).attrs.article_id.history
+                Suggestions.used(username, history.deleted, -1, session)
+                Suggestions.used(username, history.added, 1, session)
+
+    @staticmethod
+    def committed(session: Session) -> None:
+        changed = session.info.pop("changed_suggestions", set())
+        if None in changed:
+            Suggestions.cache.clear()
+        for username in changed:
+            Suggestions.invalidate(username)
+
+        for username, article_id, count in session.info.pop("used_suggestions", ()):
+            if username is None:
+                Suggestions.cache.clear()
+            elif username not in changed:
+                # only article usage is counted in place, stores, categories and brands are used through articles
+                suggestions = Suggestions.cache.peek((SuggestionTypes.ARTICLE, username))
+                if suggestions is not None:
+                    suggestions.use(article_id, count)
+                Suggestions.invalidate(username, [SuggestionTypes.STORE, SuggestionTypes.CATEGORY, SuggestionTypes.BRAND])
+
+    @staticmethod
+    def rolled_back(session: Session) -> None:
+        session.info.pop("changed_suggestions", None)
+        session.info.pop("used_suggestions", None)
@@ -1,5 +1,16 @@
 from app.lib.UserRoles import UserRoles
+from app.lib.sanitize import sanitize
+from app.lib.name_key import name_key
+from app.lib.ownership import owned, get_owned
 from app.lib.get_db import get_db
-from app.lib.get_current_user import get_current_user
+from app.lib.get_async_db import get_async_db
+from app.lib.read_json_rows import read_json_rows
+from app.lib.not_modified import not_modified
+from app.lib.get_current_user import get_current_user, get_current_user_async, invalidate_user
 from app.lib.create_access_token import create_access_token
-from app.lib.pagination import PaginationDefaults
\ No newline at end of file
+from app.lib.pagination import PaginationDefaults
+from app.lib.PriceTimeline import PriceTimeline
+from app.lib.Catalog import Catalog
+from app.lib.commit_unique import commit_unique
+from app.lib.SearchIndex import SearchIndex
+from app.lib.Suggestions import Suggestions, SuggestionTypes
\ No newline at end of file
@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.lib.Catalog import CATALOG_TABLES, Catalog
+
+# error code of MySQL for rows violating a primary key or unique constraint
+ER_DUP_ENTRY = 1062
+
+
+def is_duplicate(error: IntegrityError) -> bool:
+    return error.orig.args[:1] == (ER_DUP_ENTRY, ) or "UNIQUE constraint failed" in str(error.orig)
+
+
+def commit_unique(db: Session, message: str) -> None:
+    """
+    Commits <db> and raises a ValueError instead if a row violates a unique constraint. New stores, categories or brands whose name
+    was already taken before the session started are reported as duplicates, as catalogs cached by this process may not know entries
+    other processes created. Otherwise another request inserted the same row after it was validated, which is reported as <message>.
+    The catalogs of the session's user are dropped either way.
+    """
+    entries = [
+        (type(instance), instance.user.username, instance.name_key, instance.name)
+        for instance in db.new if type(instance).__tablename__ in CATALOG_TABLES
+    ]
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_duplicate(e):
+            raise
+        if db.info.get("username") is not None:
+            Catalog.invalidate_user(db.info["username"])
+
+        # DATETIME columns of MySQL keep whole seconds
+        started_at = db.info.get("started_at", datetime.max).replace(microsecond=0)
+        for model, username, key, name in entries:
+            created_at = db.query(model.created_at).filter(model.username == username, model.name_key == key).scalar()
+            if created_at is not None and created_at < started_at:
+                raise ValueError(f"{model.__name__} {name} already exists") from e
+        raise ValueError(message) from e
@@ -9,4 +9,42 @@ SQLALCHEMY_DATABASE_URL = os.environ["DATABASE_URL"]
 CREATE_DATABASE = json.loads(os.environ["CREATE_DATABASE"])
 CORS_ORIGINS = json.loads(os.environ["CORS_ORIGINS"])
 SALT = os.environ["SALT"]
-SECRET_KEY = os.environ["SECRET_KEY"]
\ No newline at end of file
+SECRET_KEY = os.environ["SECRET_KEY"]
+# seconds authenticated users are cached in-process, 0 looks them up in the database on every request
+AUTH_CACHE_TTL = json.loads(os.environ.get("AUTH_CACHE_TTL", "0"))
+AUTH_CACHE_SIZE = json.loads(os.environ.get("AUTH_CACHE_SIZE", "1024"))
+# seconds stores, categories and brands of a user are cached in-process by name, changes made by other processes may take as long to show
+CATALOG_CACHE_TTL = json.loads(os.environ.get("CATALOG_CACHE_TTL", "60"))
+CATALOG_CACHE_SIZE = json.loads(os.environ.get("CATALOG_CACHE_SIZE", "3072"))
+# seconds the search indexes of a user's names are cached in-process, renames by other processes may take as long to show
+SEARCH_INDEX_TTL = json.loads(os.environ.get("SEARCH_INDEX_TTL", "300"))
+SEARCH_INDEX_SIZE = json.loads(os.environ.get("SEARCH_INDEX_SIZE", "1024"))
+# seconds autocomplete suggestions of a user are cached in-process, changes by other processes may take as long to show
+SUGGEST_CACHE_TTL = json.loads(os.environ.get("SUGGEST_CACHE_TTL", "300"))
+SUGGEST_CACHE_SIZE = json.loads(os.environ.get("SUGGEST_CACHE_SIZE", "4096"))
+# narrows down name filters by FULLTEXT ngram indexes, requires MySQL with innodb_ft_enable_stopword=OFF
+SEARCH_FULLTEXT = json.loads(os.environ.get("SEARCH_FULLTEXT", "false"))
+# threads deriving password hashes at once, defaults to the number of CPUs
+PASSWORD_HASH_WORKERS = json.loads(os.environ.get("PASSWORD_HASH_WORKERS", "null")) or os.cpu_count()
+# seconds successful password verifications are cached in-process, 0 derives the hash on every login
+PASSWORD_CACHE_TTL = json.loads(os.environ.get("PASSWORD_CACHE_TTL", "300"))
+PASSWORD_CACHE_SIZE = json.loads(os.environ.get("PASSWORD_CACHE_SIZE", "1024"))
+# seconds rendered list exports are cached in-process, changed lists are rendered again right away
+EXPORT_CACHE_TTL = json.loads(os.environ.get("EXPORT_CACHE_TTL", "300"))
+EXPORT_CACHE_SIZE = json.loads(os.environ.get("EXPORT_CACHE_SIZE", "1024"))
+# number of distinct sanitized texts containing markup cached in-process
+SANITIZE_CACHE_SIZE = json.loads(os.environ.get("SANITIZE_CACHE_SIZE", "4096"))
+# optional async driver URL (e.g. "mysql+aiomysql://..."), enables the async read endpoints
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL", None)
+# connection pool of DATABASE_URL and ASYNC_DATABASE_URL, applies to QueuePool based drivers like MySQL
+DB_POOL_SIZE = json.loads(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = json.loads(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = json.loads(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# seconds after which connections are replaced, should be lower than MySQL's wait_timeout
+DB_POOL_RECYCLE = json.loads(os.environ.get("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = json.loads(os.environ.get("DB_POOL_PRE_PING", "true"))
+DB_POOL_USE_LIFO = json.loads(os.environ.get("DB_POOL_USE_LIFO", "false"))
+# optional list of replica URLs of DATABASE_URL, read-only requests are routed to them
+REPLICA_DATABASE_URLS = json.loads(os.environ.get("REPLICA_DATABASE_URLS", "[]"))
+# seconds users read from the primary after changing data, should exceed the replication lag
+READ_YOUR_WRITES_SECONDS = json.loads(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
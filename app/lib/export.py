@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class ExportFormats(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormats.NDJSON: "application/x-ndjson",
+    ExportFormats.CSV: "text/csv"
+}
+# rows fetched from the database and documents written to the response at once
+BATCH_SIZE = 1000
+
+
+def encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def nest(rows: Iterable[Any], parent: List[str], children: str, child: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """
+    Turns <rows> of a join ordered by parent into one document per parent holding the <parent> columns,
+    and a list <children> of the <child> columns (output name: column name) of each of its rows.
+    The first parent column identifies a parent, rows without a child (outer joins) have None in the first child column.
+    """
+    first_child = next(iter(child.values()))
+    for _, group in groupby(rows, key=lambda row: row._mapping[parent[0]]):
+        group = list(group)
+        document = {
+            column: group[0]._mapping[column]
+            for column in parent
+        }
+        document[children] = [
+            {
+                name: row._mapping[column]
+                for name, column in child.items()
+            } for row in group if row._mapping[first_child] is not None
+        ]
+        yield document
+
+
+def stream_ndjson(documents: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    lines = []
+    for document in documents:
+        lines.append(json.dumps(document, default=encode))
+        if len(lines) >= BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_csv(header: List[str], rows: Iterable[Iterable[Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([encode(value) for value in row])
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
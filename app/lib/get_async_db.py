@@ -0,0 +1,7 @@
+async def get_async_db():
+    from app.db import AsyncSessionLocal
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
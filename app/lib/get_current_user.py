@@ -1,29 +1,73 @@
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 from jose import jwt
 from datetime import datetime
-from app.lib.environment import SECRET_KEY
-from app.lib import get_db
+from app.lib.environment import SECRET_KEY, AUTH_CACHE_SIZE, AUTH_CACHE_TTL
+from app.lib.LRUCache import LRUCache
+from app.lib import get_db, get_async_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
+# column values of recently authenticated users by user name
+principals = LRUCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+PRINCIPAL_COLUMNS = ["username", "first_name", "last_name", "pw_hash", "role", "logged_in", "token_version"]
+
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         username = payload.get("sub")
         expires_at = payload.get("exp")
+        # lets the session route reads of users who just changed data to the primary
+        db.info["username"] = username
 
-        from app.db.models import User
-        current_user = User.get(username, db)
-        if datetime.utcnow() > datetime.fromtimestamp(expires_at):
-            current_user.logged_in = False
-            db.commit()
+        if AUTH_CACHE_TTL > 0:
+            current_user = get_cached_user(username, db)
+        else:
+            from app.db.models import User
+            current_user = User.get(username, db)
+            if datetime.utcnow() > datetime.fromtimestamp(expires_at):
+                current_user.logged_in = False
+                db.commit()
 
         if not current_user.logged_in:
             raise Exception()
+        if payload.get("ver", 0) != (current_user.token_version or 0):
+            raise Exception()
     except Exception:
         raise HTTPException(status_code=401, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"})
     else:
-        return current_user
\ No newline at end of file
+        return current_user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    get_current_user for async endpoints, runs on the AsyncSession's underlying sync session.
+    """
+    return await db.run_sync(lambda session: get_current_user(token, session))
+
+
+def get_cached_user(username: str, db: Session):
+    """
+    Returns user <username> attached to <db> without querying the database if it was looked up less than AUTH_CACHE_TTL seconds ago.
+    Expired tokens are rejected by jwt.decode already, so nothing is written here.
+    """
+    from app.db.models import User
+    principal = principals.get(username)
+    if principal is None:
+        current_user = User.get(username, db)
+        principals.set(username, {column: getattr(current_user, column) for column in PRINCIPAL_COLUMNS})
+        return current_user
+
+    current_user = User(**principal)
+    make_transient_to_detached(current_user)
+    return db.merge(current_user, load=False)
+
+
+def invalidate_user(username: str) -> None:
+    """
+    Drops the cached principal of user <username>. Has to be called whenever one of its PRINCIPAL_COLUMNS changes.
+    """
+    principals.pop(username)
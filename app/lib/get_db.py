@@ -1,6 +1,18 @@
-def get_db():
+from datetime import datetime
+from fastapi import Request
+from app.lib.last_write import last_write
+
+
+def get_db(request: Request):
     from app.db import SessionLocal
     db = SessionLocal()
+    # GET requests don't change data and can be served by a replica, see app.db.routing
+    db.info["read_only"] = request.method in ("GET", "HEAD")
+    db.info["last_write"] = last_write(request)
+    # tells rows other requests inserted meanwhile from older ones, see app.lib.commit_unique
+    db.info["started_at"] = datetime.utcnow()
+    # read by app.lib.last_write.mark_last_write once the response is ready
+    request.state.session = db
     try:
         yield db
     finally:
@@ -0,0 +1,44 @@
+import math
+import time
+from typing import Optional
+from fastapi import Request
+from starlette.responses import Response
+
+from app.lib.environment import READ_YOUR_WRITES_SECONDS
+"""
+Carries the time of a client's last write from request to request, so whichever worker serves its next requests reads from the
+primary database while replicas may not have caught up yet, see app.db.routing
+"""
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def last_write(request: Request) -> Optional[float]:
+    """
+    Time of the last write of the client sending <request>, from its X-Last-Write header or last_write cookie, None if unknown.
+    """
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def wrote_recently(written_at: Optional[float]) -> bool:
+    return written_at is not None and time.time() - written_at < READ_YOUR_WRITES_SECONDS
+
+
+async def mark_last_write(request: Request, call_next) -> Response:
+    """
+    Middleware sending the time a request committed changes in the X-Last-Write header and the last_write cookie of its response.
+    Browsers return the cookie by themselves, other clients should send the header back.
+    """
+    response = await call_next(request)
+    session = getattr(request.state, "session", None)
+    written_at = session.info.get("written_at") if session is not None else None
+    if written_at is not None and READ_YOUR_WRITES_SECONDS > 0:
+        value = f"{written_at:.3f}"
+        response.headers[LAST_WRITE_HEADER] = value
+        response.set_cookie(LAST_WRITE_COOKIE, value, max_age=math.ceil(READ_YOUR_WRITES_SECONDS), httponly=True, samesite="strict")
+    return response
@@ -0,0 +1,100 @@
+from enum import Enum
+from html import escape, unescape
+from typing import Any, Dict, List, Tuple
+from sqlalchemy.orm import Session
+from app.lib.environment import EXPORT_CACHE_SIZE, EXPORT_CACHE_TTL
+from app.lib.LRUCache import LRUCache
+
+NO_STORE = "No store specified"
+
+
+class ListFormats(str, Enum):
+    MARKDOWN = "markdown"
+    TEXT = "text"
+    HTML = "html"
+
+
+MEDIA_TYPES = {
+    ListFormats.MARKDOWN: "text/markdown",
+    ListFormats.TEXT: "text/plain",
+    ListFormats.HTML: "text/html"
+}
+
+# rendered exports by list version and format, expiring so documents of lists nobody exports anymore don't stay in memory
+documents = LRUCache(EXPORT_CACHE_SIZE, EXPORT_CACHE_TTL)
+
+
+def format_amount(amount: float) -> str:
+    return str(int(amount) if amount.is_integer() else amount)
+
+
+def format_cost(cost: float) -> str:
+    return f"{cost:.2f}"
+
+
+def render_markdown(title: str, stores: Dict[str, List[Tuple[str, float]]], costs: Dict[str, float], total: float) -> str:
+    lines = [f"# {title}"]
+    for store, items in stores.items():
+        lines.append(f"## {store}")
+        lines.extend(f"* [ ] {format_amount(amount)} x {article}" for article, amount in items)
+        lines.append("")
+        lines.append(f"Expected cost: {format_cost(costs[store])}")
+    lines.append("---")
+    lines.append(f"Expected total cost: {format_cost(total)}")
+    return "\n".join(lines)
+
+
+def render_text(title: str, stores: Dict[str, List[Tuple[str, float]]], costs: Dict[str, float], total: float) -> str:
+    # names are stored sanitized, i.e. partially escaped, which plain text doesn't need
+    title = unescape(title)
+    lines = [title, "=" * len(title)]
+    for store, items in stores.items():
+        lines.extend(["", unescape(store), "-" * len(unescape(store))])
+        lines.extend(f"[ ] {format_amount(amount)} x {unescape(article)}" for article, amount in items)
+        lines.append(f"Expected cost: {format_cost(costs[store])}")
+    lines.extend(["", f"Expected total cost: {format_cost(total)}"])
+    return "\n".join(lines)
+
+
+def render_html(title: str, stores: Dict[str, List[Tuple[str, float]]], costs: Dict[str, float], total: float) -> str:
+    # unescaping first keeps already escaped characters from being escaped twice
+    html = lambda value: escape(unescape(value))
+    lines = [f"<h1>{html(title)}</h1>"]
+    for store, items in stores.items():
+        lines.append(f"<h2>{html(store)}</h2>")
+        lines.append("<ul>")
+        lines.extend(f'<li><input type="checkbox"> {format_amount(amount)} x {html(article)}</li>' for article, amount in items)
+        lines.append("</ul>")
+        lines.append(f"<p>Expected cost: {format_cost(costs[store])}</p>")
+    lines.append("<hr>")
+    lines.append(f"<p>Expected total cost: {format_cost(total)}</p>")
+    return "\n".join(lines)
+
+
+RENDERERS = {
+    ListFormats.MARKDOWN: render_markdown,
+    ListFormats.TEXT: render_text,
+    ListFormats.HTML: render_html
+}
+
+
+def render_list(shopping_list: Any, db: Session, format: ListFormats = ListFormats.MARKDOWN) -> str:
+    """
+    Renders <shopping_list> with its items grouped by store in <format>.
+    Items are fetched by a single query and documents are cached for EXPORT_CACHE_TTL seconds or until the list, one of its articles
+    or stores changes.
+    """
+    key = (shopping_list.export_version(db), format)
+    document = documents.get(key)
+    if document is None:
+        stores: Dict[str, List[Tuple[str, float]]] = {}
+        costs: Dict[str, float] = {}
+        for store, article, amount, cost in shopping_list.export_items(db):
+            store = store or NO_STORE
+            stores.setdefault(store, []).append((article, amount))
+            costs[store] = costs.get(store, 0) + (cost or 0)
+
+        document = RENDERERS[format](shopping_list.title, stores, costs, sum(costs.values()))
+        documents.set(key, document)
+
+    return document
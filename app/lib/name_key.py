@@ -0,0 +1,6 @@
+def name_key(name: str) -> str:
+    """
+    Key identifying <name> among the names of a user: names only differing in case are the same, names differing in accents are not.
+    Unique constraints and all duplicate checks and lookups in Python compare names by this key.
+    """
+    return name.casefold()
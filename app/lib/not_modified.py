@@ -0,0 +1,34 @@
+from hashlib import sha1
+from typing import Any, Optional
+from fastapi import Request
+from starlette.responses import Response
+
+# responses depend on the logged in user and may be stored by the client only, which has to revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag(request: Request, version: Any) -> str:
+    """
+    Entity tag of the response to <request> for data at <version>, any value changing whenever the response does.
+    """
+    digest = sha1(repr((request.url.path, request.url.query, version)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, response: Response, version: Any) -> Optional[Response]:
+    """
+    Sets the ETag and Cache-Control headers of <response> for data at <version>. Returns an empty 304 response
+    if the client's copy, named by If-None-Match, is still current, so routes can answer before loading any data, None otherwise.
+    """
+    tag = etag(request, version)
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    tags = [candidate.strip() for candidate in request.headers.get("if-none-match", "").split(",")]
+    if "*" in tags or tag[2:] in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in tags):
+        return Response(status_code=304, headers={
+            "ETag": tag,
+            "Cache-Control": CACHE_CONTROL
+        })
+    return None
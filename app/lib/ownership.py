@@ -0,0 +1,30 @@
+from typing import Any
+from sqlalchemy.orm import Query, Session
+from app.lib.UserRoles import UserRoles
+
+
+def owned(model: Any, user: Any, db: Session) -> Query:
+    """
+    Query of all rows of <model> <user> may access: every row for administrators, rows created by <user> otherwise.
+    """
+    query = db.query(model)
+    if user.role != UserRoles.ADMIN:
+        query = query.filter(model.username == user.username)
+
+    return query
+
+
+def get_owned(model: Any, object_id: Any, user: Any, db: Session, label: str, options: list = []) -> Any:
+    """
+    Looks up the <model> row with primary key <object_id> <user> may access with a single indexed query.
+    """
+    try:
+        object_id = int(object_id)
+    except:
+        raise LookupError(f"Invalid {label} ID: {object_id}")
+
+    row = owned(model, user, db).options(*options).filter(model.id == object_id).first()
+    if row is None:
+        raise LookupError(f"No such {label}: {object_id}")
+
+    return row
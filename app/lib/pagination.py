@@ -1,4 +1,10 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
 from enum import Enum
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import asc as ascending, desc as descending, tuple_
+from sqlalchemy.orm import Query
+import json
 
 
 class PaginationDefaults(int, Enum):
@@ -7,6 +13,10 @@ class PaginationDefaults(int, Enum):
     ASC = 1
 
 
+# response header carrying the cursor of the next page
+CURSOR_HEADER = "X-Next-Cursor"
+
+
 class ArticleColumns(str, Enum):
     NAME = "name"
     PRICE = "price"
@@ -14,6 +24,7 @@ class ArticleColumns(str, Enum):
     STORE = "store"
     CATEGORY = "category"
     BRAND = "brand"
+    RELEVANCE = "relevance"
 
 
 class StoreColumns(str, Enum):
@@ -37,6 +48,7 @@ class ListColumns(str, Enum):
     FINALIZED = "finalized"
     COST = "cost"
     CATEGORY = "category"
+    RELEVANCE = "relevance"
 
 
 class ListItemColumns(str, Enum):
@@ -47,3 +59,89 @@ class ListItemColumns(str, Enum):
     STORE = "store"
     CATEGORY = "category"
     BRAND = "brand"
+    RELEVANCE = "relevance"
+
+
+def encode_cursor(values: List[Any], sort_by: str, asc: int) -> str:
+    values = [dict(datetime=value.isoformat()) if isinstance(value, datetime) else value for value in values]
+    cursor = json.dumps(dict(sort_by=sort_by, asc=asc == PaginationDefaults.ASC, keys=values), separators=(",", ":"))
+    return urlsafe_b64encode(cursor.encode("UTF-8")).decode("ASCII")
+
+
+def decode_cursor(cursor: str, sort_by: str, asc: int, size: int) -> List[Any]:
+    try:
+        cursor = json.loads(urlsafe_b64decode(cursor.encode("ASCII")))
+        cursor_sort_by = cursor["sort_by"]
+        cursor_asc = bool(cursor["asc"])
+        values = [datetime.fromisoformat(value["datetime"]) if isinstance(value, dict) else value for value in cursor["keys"]]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if cursor_sort_by != sort_by or cursor_asc != (asc == PaginationDefaults.ASC) or len(values) != size:
+        raise ValueError("Cursor does not match sort order")
+
+    return values
+
+
+def paginate(query: Query, sort_keys: List[Any], sort_by: str, asc: int, page: int, limit: int, after: str = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Orders <query> by <sort_keys> and returns page <page> of size <limit>, so sorting and slicing happen in the database.
+    If cursor <after> is given, the page starting right after the row it was issued for is returned instead (keyset pagination),
+    which costs the same regardless of how deep the page is. Cursors are only accepted for the column <sort_by> and direction
+    they were issued for. The last sort key must be unique (e.g. the primary key) and no sort key may be NULL, nullable columns
+    are sorted by an is_(None) key followed by the column coalesced to a default.
+    Returns the rows of the page and, if there may be more rows, the cursor of the next page.
+    """
+    if page < 1 or limit < 1:
+        raise ValueError(f"Invalid pagination parameters")
+
+    direction = ascending if asc == PaginationDefaults.ASC else descending
+    query = query.add_columns(*sort_keys).order_by(*[direction(key) for key in sort_keys])
+    if after:
+        values = decode_cursor(after, sort_by, asc, len(sort_keys))
+        if asc == PaginationDefaults.ASC:
+            query = query.filter(tuple_(*sort_keys) > tuple_(*values))
+        else:
+            query = query.filter(tuple_(*sort_keys) < tuple_(*values))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    rows = query.limit(limit).all()
+    cursor = encode_cursor(list(rows[-1][1:]), sort_by, asc) if len(rows) == limit else None
+
+    return [row[0] for row in rows], cursor
+
+
+def paginate_ranked(query: Query,
+                    key: Any,
+                    ranked: List[Any],
+                    sort_by: str,
+                    asc: int,
+                    page: int,
+                    limit: int,
+                    after: str = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns page <page> of size <limit> of the rows of <query> in the order of <ranked>, values of the unique column <key> ranked
+    by relevance, e.g. by app.lib.SearchIndex, most relevant first if <asc>. Only the rows of the page are loaded, by their keys.
+    Cursors hold the position and key of the last row of a page, the page after it starts right after that row if it is still ranked.
+    Returns the rows of the page and, if there are more ranked rows, the cursor of the next page.
+    """
+    if page < 1 or limit < 1:
+        raise ValueError(f"Invalid pagination parameters")
+
+    ranked = list(ranked) if asc == PaginationDefaults.ASC else list(reversed(ranked))
+    if after:
+        position, last = decode_cursor(after, sort_by, asc, 2)
+        start = ranked.index(last) + 1 if last in ranked else position
+    else:
+        start = (page - 1) * limit
+
+    keys = ranked[start:start + limit]
+    rows = {
+        getattr(row, key.key): row
+        for row in query.filter(key.in_(keys))
+    } if keys else {}
+    cursor = encode_cursor([start + len(keys), keys[-1]], sort_by, asc) if start + limit < len(ranked) else None
+
+    # rows deleted since they were ranked are skipped
+    return [rows[value] for value in keys if value in rows], cursor
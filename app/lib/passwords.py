@@ -0,0 +1,84 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.lib.environment import SALT, PASSWORD_CACHE_SIZE, PASSWORD_CACHE_TTL, PASSWORD_HASH_WORKERS
+from app.lib.LRUCache import LRUCache
+"""
+Hashes and verifies passwords with scrypt in a bounded pool of threads, hashlib releases the GIL while deriving keys
+"""
+
+# scrypt parameters of new hashes, stored hashes using others are replaced on the next login, see needs_rehash
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 64
+PREFIX = "scrypt"
+
+# derivations run at once, each takes about 128 * SCRYPT_N * SCRYPT_R bytes (16 MiB) of memory
+executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+# keys of passwords verified within the last PASSWORD_CACHE_TTL seconds, by an HMAC with a per process key of stored hash and password
+verified = LRUCache(PASSWORD_CACHE_SIZE, PASSWORD_CACHE_TTL)
+CACHE_KEY = os.urandom(32)
+
+
+def derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode("UTF-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=KEY_BYTES)
+
+
+def encode(password: str) -> str:
+    salt = os.urandom(SALT_BYTES)
+    key = derive(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([PREFIX, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P), base64.b64encode(salt).decode(), base64.b64encode(key).decode()])
+
+
+def check(password: str, pw_hash: str) -> bool:
+    if not pw_hash.startswith(PREFIX + "$"):
+        # salted SHA-512 hex digests of passwords hashed before scrypt was introduced
+        legacy_hash = hashlib.sha512((password + SALT).encode("UTF-8")).hexdigest()
+        return hmac.compare_digest(legacy_hash, pw_hash)
+
+    _, n, r, p, salt, key = pw_hash.split("$")
+    return hmac.compare_digest(derive(password, base64.b64decode(salt), int(n), int(r), int(p)), base64.b64decode(key))
+
+
+def cache_key(password: str, pw_hash: str) -> bytes:
+    return hmac.new(CACHE_KEY, f"{pw_hash}\0{password}".encode("UTF-8"), hashlib.sha256).digest()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hashes <password> with a random salt in the password pool, blocking the calling thread until it is done.
+    """
+    return executor.submit(encode, password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(executor, encode, password)
+
+
+async def verify_password_async(password: str, pw_hash: str) -> bool:
+    """
+    Whether <password> matches <pw_hash>, a scrypt hash or a legacy salted SHA-512 digest. The event loop keeps serving other
+    requests while the key is derived in the password pool. Successful verifications are cached for PASSWORD_CACHE_TTL seconds,
+    so repeated logins with the same password skip the derivation, failed ones never are.
+    """
+    key = cache_key(password, pw_hash)
+    if PASSWORD_CACHE_TTL > 0 and verified.get(key):
+        return True
+
+    valid = await asyncio.get_running_loop().run_in_executor(executor, check, password, pw_hash)
+    if valid and PASSWORD_CACHE_TTL > 0:
+        verified.set(key, True)
+    return valid
+
+
+def needs_rehash(pw_hash: str) -> bool:
+    """
+    Whether <pw_hash> is a legacy SHA-512 digest or uses other scrypt parameters than new hashes.
+    """
+    return not pw_hash.startswith(f"{PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
@@ -0,0 +1,30 @@
+import json
+from typing import Any, List
+from fastapi import HTTPException, Request
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def read_json_rows(request: Request) -> List[Any]:
+    """
+    Reads the request body as a JSON array, or as newline delimited JSON if the content type says so.
+    NDJSON bodies are parsed line by line while they are received.
+    """
+    try:
+        if request.headers.get("content-type", "").split(";")[0].strip() not in NDJSON_MEDIA_TYPES:
+            rows = json.loads(await request.body())
+            if not isinstance(rows, list):
+                raise ValueError("Expected a JSON array")
+            return rows
+
+        rows = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            rows.extend(json.loads(line) for line in lines if line.strip())
+        if buffer.strip():
+            rows.append(json.loads(buffer))
+        return rows
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request body: {e}")
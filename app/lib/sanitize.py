@@ -0,0 +1,27 @@
+import re
+from functools import lru_cache
+import bleach
+
+from app.lib.environment import SANITIZE_CACHE_SIZE
+
+# characters bleach changes in text: tags, character references, carriage returns and other control characters
+UNSAFE_CHARACTERS = re.compile(r"[\x00-\x08\x0b-\x1f&<>]")
+# longer texts, i.e. article details, are rarely repeated and not cached
+MAX_CACHED_LENGTH = 1024
+
+
+def sanitize(text: str) -> str:
+    """
+    Same as bleach.clean(<text>, tags=[]): strips tags, escapes &, < and > and replaces control characters.
+    Texts without any of these characters are returned as they are without being parsed, parsed texts are cached.
+    """
+    if UNSAFE_CHARACTERS.search(text) is None:
+        return text
+    if len(text) > MAX_CACHED_LENGTH:
+        return bleach.clean(text, tags=[])
+    return clean(text)
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def clean(text: str) -> str:
+    return bleach.clean(text, tags=[])
@@ -0,0 +1,46 @@
+from typing import Any, Dict, List
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+"""
+Keeps in-process caches consistent with the changes sessions commit, with one set of session listeners for all of them
+"""
+
+# registered caches, and by the tables whose changes they follow
+caches: List[Any] = []
+table_caches: Dict[str, List[Any]] = {}
+
+
+def register(cache: Any) -> Any:
+    """
+    Class decorator registering <cache> for changes of the tables in cache.tables. After every flush writing rows of these tables,
+    cache.flushed(session, instances, dirty, deleted) is called with the new, changed and deleted rows and the session's dirty and
+    deleted rows. cache.committed(session) or cache.rolled_back(session) are called once the session's transaction ends, so caches
+    record changes in session.info until then.
+    """
+    caches.append(cache)
+    for table in cache.tables:
+        table_caches.setdefault(table, []).append(cache)
+    return cache
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    dirty, deleted = session.dirty, session.deleted
+    changed: Dict[Any, List[Any]] = {}
+    for instance in (*session.new, *dirty, *deleted):
+        for cache in table_caches.get(type(instance).__tablename__, ()):
+            changed.setdefault(cache, []).append(instance)
+    for cache, instances in changed.items():
+        cache.flushed(session, instances, dirty, deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for cache in caches:
+        cache.committed(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_soft_rollback(session: Session, previous_transaction) -> None:
+    for cache in caches:
+        cache.rolled_back(session)
@@ -3,15 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 import app.routers as routers
 from app.lib.environment import CREATE_DATABASE, CORS_ORIGINS
+from app.lib.pagination import CURSOR_HEADER
+from app.lib.last_write import LAST_WRITE_HEADER, mark_last_write
 
 if CREATE_DATABASE:
-    from app.db import Base, engine
-    from app.db.models import User, \
-                              Article, \
-                              Category, Store, Price, \
-                              ShoppingList, ShoppingListItem
+    from app.db import engine
+    from app.db.migrate import migrate
 
-    Base.metadata.create_all(engine)
+    migrate(engine)
 
 app = FastAPI()
 origins = CORS_ORIGINS
@@ -22,7 +21,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CURSOR_HEADER, LAST_WRITE_HEADER],
 )
+app.middleware("http")(mark_last_write)
 
 for router in routers.routers:
     app.include_router(router)
@@ -7,5 +7,17 @@ from app.routers.brands import brands
 from app.routers.articles import articles
 from app.routers.lists import lists
 from app.routers.list_items import list_items
+from app.routers.export import export
+from app.routers.suggest import suggest
+from app.routers.metrics import metrics
+from app.lib.environment import ASYNC_DATABASE_URL
 
-routers = [users, stores, categories, brands, articles, lists, list_items]
\ No newline at end of file
+routers = [users, stores, categories, brands, articles, lists, list_items, export, suggest, metrics]
+
+if ASYNC_DATABASE_URL:
+    # async read endpoints shadow their sync counterparts, so they have to be added first
+    from app.routers.async_articles import async_articles
+    from app.routers.async_lists import async_lists
+    from app.routers.async_list_items import async_list_items
+
+    routers = [async_articles, async_lists, async_list_items] + routers
\ No newline at end of file
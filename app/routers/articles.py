@@ -1,11 +1,13 @@
+import csv
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Iterator, List
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from starlette.responses import Response
-from app.db.models import Article, Brand, Store, Category, Price, User
-from app.lib import get_current_user, get_db
-from app.lib.pagination import ArticleColumns, PaginationDefaults
+from app.db.models import Article, Brand, Store, Category, ListCost, Price, User
+from app.lib import PriceTimeline, commit_unique, get_current_user, get_db, not_modified, read_json_rows
+from app.lib.pagination import CURSOR_HEADER, ArticleColumns, PaginationDefaults, paginate, paginate_ranked
 import app.schemas as schemas
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 articles = APIRouter(
@@ -17,50 +19,47 @@ articles = APIRouter(
     tags=["article"]
 )   #yapf:disable
 
+# stores, categories and brands are created along with articles, another request may have created one of the same name meanwhile,
+# see app.lib.commit_unique
+DUPLICATE_CATALOG_ENTRY = "A store, category or brand of the same name was created at the same time, please try again"
+
 @articles.get(
     "/",
     response_model=List[schemas.Article],
     responses={
-        200: dict(description="List of articles created by the current user, possibly filtered by name."),
-        400: dict(description="Invalid pagination parameters.", model=schemas.HTTPError),
+        200: dict(description="List of articles created by the current user, possibly filtered by name, by default most relevant first. " \
+                              "X-Next-Cursor holds the cursor of the next page."),
+        400: dict(description="Invalid pagination parameters or cursor, or sorting by relevance without a name.", model=schemas.HTTPError),
         404: dict(description="Requested page does not exist.", model=schemas.HTTPError)
     }
-)
+)   #yapf:disable
 def read_articles(
+    response: Response,
     name: str = None,
-    sort_by: ArticleColumns = ArticleColumns.UPDATED_AT,
+    sort_by: ArticleColumns = None,
     page: int = PaginationDefaults.FIRST_PAGE,
     asc: int = PaginationDefaults.ASC,
     limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
     auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     try:
-        if page < 1 or limit < 1:
-            raise ValueError(f"Invalid pagination parameters")
-        page -= 1
-
         articles: List[Article]
-        if name:
-            articles = Article.find(name, auth_user)
-        else:
-            articles = auth_user.articles
-
-        articles = sorted(
-            articles,
-            key=lambda article: article.name.casefold() if sort_by == ArticleColumns.NAME    #yapf:disable
-            else article.price().price if sort_by == ArticleColumns.PRICE    #yapf:disable
-            else (article.store.name.casefold() if article.store else ("z" * 1000).casefold()) if sort_by == ArticleColumns.STORE    #yapf:disable
-            else (article.category.name.casefold() if article.category else ("z" * 1000).casefold())
-            if sort_by == ArticleColumns.CATEGORY    #yapf:disable
-            else (article.brand.name.casefold() if article.brand else ("z" * 1000).casefold()) if sort_by == ArticleColumns.BRAND    #yapf:disable
-            else article.updated_at,    #yapf:disable  
-            reverse=asc != PaginationDefaults.ASC
-        )
-
-        if page * limit >= len(articles):
-            articles = []
+        if sort_by is None:
+            sort_by = ArticleColumns.RELEVANCE if name else ArticleColumns.UPDATED_AT
+        if sort_by == ArticleColumns.RELEVANCE:
+            if not name:
+                raise ValueError("Sorting by relevance requires a name")
+            articles, cursor = paginate_ranked(
+                Article.search(auth_user, db), Article.id, Article.ranked(auth_user, db, name), sort_by, asc, page, limit, after
+            )
         else:
-            articles = articles[page * limit:page * limit + limit]
+            query = Article.search(auth_user, db, name if name else None)
+            query, sort_keys = Article.sort_keys(query, sort_by)
+            articles, cursor = paginate(query, sort_keys, sort_by, asc, page, limit, after)
+        if cursor:
+            response.headers[CURSOR_HEADER] = cursor
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except LookupError as e:
@@ -75,12 +74,16 @@ def read_articles(
     "/{article_id}",
     response_model=schemas.Article,
     responses={
-        200: dict(description="Article <article_id>."),
+        200: dict(description="Article <article_id>. ETag identifies its version."),
+        304: dict(description="Article <article_id> did not change since the version in If-None-Match."),
         404: dict(description="Article <article_id> does not exist.", model=schemas.HTTPError)
     }
 )
-def read_article(article_id: int, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_article(article_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
+        unchanged = not_modified(request, response, Article.version(article_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         article = Article.get(article_id, auth_user, db)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -94,12 +97,18 @@ def read_article(article_id: int, auth_user: User = Depends(get_current_user), d
     "/{article_id}/prices",
     response_model=List[schemas.Price],
     responses={
-        200: dict(description="Prices of article <article_id>."),
+        200: dict(description="Prices of article <article_id>. ETag identifies their version."),
+        304: dict(description="The prices of article <article_id> did not change since the version in If-None-Match."),
         404: dict(description="Article <article_id> does not exist.", model=schemas.HTTPError)
     }
 )
-def read_article_prices(article_id: int, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_article_prices(
+    article_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+):
     try:
+        unchanged = not_modified(request, response, Article.version(article_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         article = Article.get(article_id, auth_user, db)
         prices = article.prices
     except LookupError as e:
@@ -111,17 +120,28 @@ def read_article_prices(article_id: int, auth_user: User = Depends(get_current_u
 
 
 @articles.get(
-    "/{article_id}/prices",
+    "/{article_id}/price",
     response_model=schemas.Price,
     responses={
-        200: dict(description="Price of article <article_id> valid at <at>."),
+        200: dict(description="Price of article <article_id> valid at <at>. ETag identifies its version."),
+        304: dict(description="The price of article <article_id> valid at <at> did not change since the version in If-None-Match."),
         404: dict(description="Article <article_id> does not exist.", model=schemas.HTTPError)
     }
 )
-def read_article_price(article_id: int, at: datetime = None, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_article_price(
+    article_id: int,
+    request: Request,
+    response: Response,
+    at: datetime = None,
+    auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     try:
+        unchanged = not_modified(request, response, Article.version(article_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         article = Article.get(article_id, auth_user, db)
-        price = article.price(at)
+        price = PriceTimeline.of(article).at(at)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -160,11 +180,11 @@ def create_article(article: schemas.ArticleCreate, auth_user: User = Depends(get
         current_price = Price.create(auth_user)
         current_price.price = Price.process_price(article.price.price)
         current_price.currency = Price.process_currency(article.price.currency)
-        current_price.article = current_article
+        current_article.set_price(current_price)
 
         db.add(current_article)
         db.add(current_price)
-        db.commit()
+        commit_unique(db, DUPLICATE_CATALOG_ENTRY)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
@@ -176,6 +196,75 @@ def create_article(article: schemas.ArticleCreate, auth_user: User = Depends(get
         return current_article
 
 
+@articles.post(
+    "/bulk",
+    response_model=schemas.ArticleImport,
+    status_code=201,
+    responses={
+        201: dict(description="IDs of the created articles and reasons why the rows at the indices in errors were skipped. " \
+                              "The body is a JSON array of articles to create, or one article per line if sent as application/x-ndjson."),
+        400: dict(description="The body is no JSON array or NDJSON.", model=schemas.HTTPError)
+    }
+)   #yapf:disable
+def create_articles(rows: List[Any] = Depends(read_json_rows), auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    try:
+        articles = []
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                articles.append((index, schemas.ArticleCreate.parse_obj(row)))
+            except ValidationError as e:
+                errors.append((index, str(e)))
+
+        ids, skipped = Article.bulk_create(articles, auth_user, db)
+        commit_unique(db, DUPLICATE_CATALOG_ENTRY)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return dict(ids=ids, errors=[dict(index=index, detail=detail) for index, detail in sorted(errors + skipped)])
+
+
+def decode_lines(file: Any) -> Iterator[str]:
+    """
+    Lines of the UTF-8 encoded binary <file>, decoded one by one so a line that is no UTF-8 can be named.
+    """
+    for line_num, line in enumerate(file, start=1):
+        try:
+            yield line.decode("utf-8-sig" if line_num == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise ValueError(f"Line {line_num}: the feed is no UTF-8 text")
+
+
+@articles.post(
+    "/prices",
+    response_model=schemas.PriceImport,
+    responses={
+        200: dict(description="Numbers of inserted, unchanged and failed rows of the price feed and reasons for the first failures. " \
+                              "The feed is a CSV file with a header and columns store, name, brand, price, currency and date (ISO 8601, UTC)."),
+        400: dict(description="A line of the feed is no UTF-8 text or has a date with a time zone, nothing was imported.", model=schemas.HTTPError)
+    }
+)   #yapf:disable
+def import_prices(file: UploadFile = File(...), auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    try:
+        # uploads are spooled to disk, the file is read row by row so it does not have to fit into memory
+        reader = csv.DictReader(decode_lines(file.file))
+        reader.fieldnames = [column.strip().lower() for column in reader.fieldnames or []]
+        result = Price.import_feed(((reader.line_num, row) for row in reader), auth_user, db)
+
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return dict(result, errors=[dict(line=line, detail=detail) for line, detail in result["errors"]])
+
+
 @articles.put(
     "/",
     response_model=schemas.Article,
@@ -192,8 +281,11 @@ def update_article(article: schemas.ArticleUpdate, auth_user: User = Depends(get
             set_store(current_article, article.store, auth_user, db)
             current_article.set_name(current_article.name)
         if article.category is not None:
+            previous_category = current_article.category
             set_category(current_article, article.category, auth_user, db)
             current_article.set_name(current_article.name)
+            if current_article.category != previous_category:
+                ListCost.invalidate(current_article.id, db)
         if article.brand is not None:
             set_brand(current_article, article.brand, auth_user, db)
             current_article.set_name(current_article.name)
@@ -206,12 +298,11 @@ def update_article(article: schemas.ArticleUpdate, auth_user: User = Depends(get
                 current_price = Price.create(auth_user)
                 current_price.price = Price.process_price(article.price.price)
                 current_price.currency = Price.process_currency(article.price.currency)
-                current_price.article = current_article
+                current_article.set_price(current_price)
 
                 db.add(current_price)
-                current_article.updated_at = datetime.utcnow()
 
-        db.commit()
+        commit_unique(db, DUPLICATE_CATALOG_ENTRY)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
@@ -301,4 +392,4 @@ def set_brand(article: Article, brand_name: str, user: User, db: Session) -> Non
     article.set_brand(brand)
     if article.brand != previous_brand and previous_brand is not None:
         if len(previous_brand.articles) == 0:
-            db.delete(previous_brand)
\ No newline at end of file
+            db.delete(previous_brand)
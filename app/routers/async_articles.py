@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Any, Callable
+from fastapi import APIRouter, Depends, Request
+from starlette.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import User
+from app.lib import get_current_user_async, get_async_db
+from app.lib.pagination import ArticleColumns, PaginationDefaults
+from app.routers.articles import read_articles as sync_read_articles, \
+    read_article as sync_read_article, \
+    read_article_prices as sync_read_article_prices, \
+    read_article_price as sync_read_article_price
+import app.schemas as schemas
+"""
+Async versions of the read endpoints in articles.py, used if ASYNC_DATABASE_URL is set.
+Each runs its sync counterpart on the AsyncSession's underlying sync session, so neither blocks a threadpool worker.
+Results are serialized inside run_sync because serialization may still load relationships; the routes
+therefore have no response_model, which would validate the already serialized schemas a second time.
+"""
+
+async_articles = APIRouter(prefix="/api/articles", tags=["article"], include_in_schema=False)
+
+
+def serialize(result: Any, to_schema: Callable[[Any], Any]) -> Any:
+    """
+    Serializes the <result> of a sync route with <to_schema>, unless the route answered with a response of its own, e.g. 304 Not Modified.
+    """
+    return result if isinstance(result, Response) else to_schema(result)
+
+
+@async_articles.get("/")
+async def read_articles(
+    response: Response,
+    name: str = None,
+    sort_by: ArticleColumns = None,
+    page: int = PaginationDefaults.FIRST_PAGE,
+    asc: int = PaginationDefaults.ASC,
+    limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session:
+        [schemas.Article.from_orm(article) for article in sync_read_articles(response, name, sort_by, page, asc, limit, after, auth_user, session)]
+    )
+
+
+@async_articles.get("/{article_id}")
+async def read_article(
+    article_id: int,
+    request: Request,
+    response: Response,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: serialize(sync_read_article(article_id, request, response, auth_user, session), schemas.Article.from_orm)
+    )
+
+
+@async_articles.get("/{article_id}/prices")
+async def read_article_prices(
+    article_id: int,
+    request: Request,
+    response: Response,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: serialize(
+            sync_read_article_prices(article_id, request, response, auth_user, session), lambda prices:
+            [schemas.Price.from_orm(price) for price in prices]
+        )
+    )
+
+
+@async_articles.get("/{article_id}/price")
+async def read_article_price(
+    article_id: int,
+    request: Request,
+    response: Response,
+    at: datetime = None,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: serialize(sync_read_article_price(article_id, request, response, at, auth_user, session), schemas.Price.from_orm)
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Request
+from starlette.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import User
+from app.lib import get_current_user_async, get_async_db
+from app.lib.pagination import ListItemColumns, PaginationDefaults
+from app.routers.list_items import read_items as sync_read_items, read_item as sync_read_item
+from app.routers.async_articles import serialize
+import app.schemas as schemas
+"""
+Async versions of the read endpoints in list_items.py, used if ASYNC_DATABASE_URL is set (see async_articles.py).
+"""
+
+async_list_items = APIRouter(prefix="/api/lists/{list_id}/items", tags=["list item"], include_in_schema=False)
+
+
+@async_list_items.get("/")
+async def read_items(
+    list_id: int,
+    request: Request,
+    response: Response,
+    name: str = None,
+    sort_by: ListItemColumns = None,
+    page: int = PaginationDefaults.FIRST_PAGE,
+    asc: int = PaginationDefaults.ASC,
+    limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: serialize(
+            sync_read_items(list_id, request, response, name, sort_by, page, asc, limit, after, auth_user, session), lambda items:
+            [schemas.ListItem.from_orm(item) for item in items]
+        )
+    )
+
+
+@async_list_items.get("/{item_id}")
+async def read_item(list_id: int, item_id: int, auth_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: schemas.ListItem.from_orm(sync_read_item(list_id, item_id, auth_user, session)))
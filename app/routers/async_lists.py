@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Request
+from starlette.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import User
+from app.lib import get_current_user_async, get_async_db
+from app.lib.pagination import ListColumns, PaginationDefaults
+from app.routers.lists import read_lists as sync_read_lists, \
+    read_list as sync_read_list, \
+    read_list_costs as sync_read_list_costs, \
+    export_list as sync_export_list
+from app.routers.async_articles import serialize
+import app.schemas as schemas
+"""
+Async versions of the read endpoints in lists.py, used if ASYNC_DATABASE_URL is set (see async_articles.py).
+"""
+
+async_lists = APIRouter(prefix="/api/lists", tags=["list"], include_in_schema=False)
+
+
+@async_lists.get("/")
+async def read_lists(
+    response: Response,
+    title: str = None,
+    sort_by: ListColumns = None,
+    page: int = PaginationDefaults.FIRST_PAGE,
+    asc: int = PaginationDefaults.ASC,
+    limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
+    auth_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session:
+        [schemas.List.from_orm(list) for list in sync_read_lists(response, title, sort_by, page, asc, limit, after, auth_user, session)]
+    )
+
+
+@async_lists.get("/{list_id}")
+async def read_list(
+    list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda session: serialize(sync_read_list(list_id, request, response, auth_user, session), schemas.List.from_orm))
+
+
+@async_lists.get("/{list_id}/costs")
+async def read_list_costs(
+    list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda session: sync_read_list_costs(list_id, request, response, auth_user, session))
+
+
+@async_lists.get("/{list_id}/markdown")
+async def export_list(
+    list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda session: sync_export_list(list_id, request, response, auth_user, session))
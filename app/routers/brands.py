@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from starlette.responses import Response
 from app.db.models import User, Brand
 from app.lib import get_current_user, get_db, UserRoles
-from app.lib.pagination import ArticleColumns, BrandColumns, CategoryColumns, PaginationDefaults
+from app.lib.pagination import CURSOR_HEADER, BrandColumns, PaginationDefaults, paginate
 import app.schemas as schemas
 from sqlalchemy.orm import Session
 
@@ -21,39 +21,30 @@ brands = APIRouter(
     "/",
     response_model=List[schemas.Brand],
     responses={
-        200: dict(description="List of brands created by the current user, possibly filtered by name."),
-        400: dict(description="Invalid name for filter.", model=schemas.HTTPError)
+        200: dict(description="List of brands created by the current user, possibly filtered by name. " \
+                              "X-Next-Cursor holds the cursor of the next page."),
+        400: dict(description="Invalid name for filter, pagination parameters or cursor.", model=schemas.HTTPError)
     }
-)
+)   #yapf:disable
 def read_brands(
+    response: Response,
     name: str = None,
-    sort_by: CategoryColumns = CategoryColumns.UPDATED_AT,
+    sort_by: BrandColumns = BrandColumns.UPDATED_AT,
     page: int = PaginationDefaults.FIRST_PAGE,
     asc: int = PaginationDefaults.ASC,
     limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
     auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     try:
-        if page < 1 or limit < 1:
-            raise ValueError(f"Invalid pagination parameters")
-        page -= 1
+        query = Brand.search(auth_user, db, name if name else None)
+        query, sort_keys = Brand.sort_keys(query, sort_by)
 
         brands: List[Brand]
-        if name:
-            brands = Brand.find(name, auth_user)
-        else:
-            brands = auth_user.brands
-
-        brands = sorted(
-            brands,
-            key=lambda brand: brand.name.casefold() if sort_by == BrandColumns.NAME else brand.updated_at,
-            reverse=asc != PaginationDefaults.ASC
-        )
-
-        if page * limit >= len(brands):
-            []
-
-        brands = brands[page * limit:page * limit + limit]
+        brands, cursor = paginate(query, sort_keys, sort_by, asc, page, limit, after)
+        if cursor:
+            response.headers[CURSOR_HEADER] = cursor
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from starlette.responses import Response
 from app.db.models import Category, User
 from app.lib import get_current_user, get_db, UserRoles
-from app.lib.pagination import ArticleColumns, CategoryColumns, PaginationDefaults
+from app.lib.pagination import CURSOR_HEADER, CategoryColumns, PaginationDefaults, paginate
 import app.schemas as schemas
 from sqlalchemy.orm import Session
 
@@ -21,39 +21,30 @@ categories = APIRouter(
     "/",
     response_model=List[schemas.Category],
     responses={
-        200: dict(description="List of categories created by the current user, possibly filtered by name."),
-        400: dict(description="Invalid name for filter.", model=schemas.HTTPError)
+        200: dict(description="List of categories created by the current user, possibly filtered by name. " \
+                              "X-Next-Cursor holds the cursor of the next page."),
+        400: dict(description="Invalid name for filter, pagination parameters or cursor.", model=schemas.HTTPError)
     }
-)
+)   #yapf:disable
 def read_categories(
+    response: Response,
     name: str = None,
     sort_by: CategoryColumns = CategoryColumns.UPDATED_AT,
     page: int = PaginationDefaults.FIRST_PAGE,
     asc: int = PaginationDefaults.ASC,
     limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
     auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     try:
-        if page < 1 or limit < 1:
-            raise ValueError(f"Invalid pagination parameters")
-        page -= 1
+        query = Category.search(auth_user, db, name if name else None)
+        query, sort_keys = Category.sort_keys(query, sort_by)
 
         categories: List[Category]
-        if name:
-            categories = Category.find(name, auth_user)
-        else:
-            categories = auth_user.categories
-
-        categories = sorted(
-            categories,
-            key=lambda category: category.name.casefold() if sort_by == CategoryColumns.NAME else category.updated_at,
-            reverse=asc != PaginationDefaults.ASC
-        )
-
-        if page * limit >= len(categories):
-            []
-
-        categories = categories[page * limit:page * limit + limit]
+        categories, cursor = paginate(query, sort_keys, sort_by, asc, page, limit, after)
+        if cursor:
+            response.headers[CURSOR_HEADER] = cursor
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
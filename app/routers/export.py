@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.responses import StreamingResponse
+from app.db.models import Article, ShoppingList, User
+from app.lib import get_current_user, get_db
+from app.lib.export import MEDIA_TYPES, ExportFormats, nest, stream_csv, stream_ndjson
+import app.schemas as schemas
+from sqlalchemy.orm import Query, Session
+
+export = APIRouter(
+    prefix="/api/export",
+    responses={
+        401: dict(description="Exports can only be accessed by logged in users.", model=schemas.HTTPError),
+        500: dict(description="Internal server error.", model=schemas.HTTPError)
+    },
+    tags=["export"]
+)   #yapf:disable
+
+
+def stream(query: Query, format: ExportFormats, name: str, parent_columns: int, children: str, child_prefix: str) -> StreamingResponse:
+    """
+    Streams the rows of <query> as CSV, or as NDJSON documents of the first <parent_columns> columns holding the remaining columns of
+    each row, without <child_prefix>, in a list <children>. Rows are fetched in batches while the response is sent, so exports run in constant memory.
+    """
+    columns = [column["name"] for column in query.column_descriptions]
+    if format == ExportFormats.CSV:
+        content = stream_csv(columns, query)
+    else:
+        child = {
+            column[len(child_prefix):] if column.startswith(child_prefix) else column: column
+            for column in columns[parent_columns:]
+        }
+        content = stream_ndjson(nest(query, columns[:parent_columns], children, child))
+
+    return StreamingResponse(
+        content, media_type=MEDIA_TYPES[format], headers={
+            "Content-Disposition": f'attachment; filename="{name}.{format.value}"'
+        }
+    )
+
+
+@export.get(
+    "/articles",
+    responses={
+        200: dict(description="All articles of the current user with their price history. " \
+                              "NDJSON holds one article with a list of prices per line, CSV one price per row.")
+    }
+)   #yapf:disable
+def export_articles(format: ExportFormats = ExportFormats.NDJSON, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    try:
+        response = stream(Article.export(auth_user, db), format, "articles", 8, "prices", "price_")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return response
+
+
+@export.get(
+    "/lists",
+    responses={
+        200: dict(description="All shopping lists of the current user with their items. " \
+                              "NDJSON holds one list with a list of items per line, CSV one item per row.")
+    }
+)   #yapf:disable
+def export_lists(format: ExportFormats = ExportFormats.NDJSON, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    try:
+        response = stream(ShoppingList.export(auth_user, db), format, "lists", 6, "items", "item_")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return response
@@ -1,10 +1,10 @@
 from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from starlette.responses import Response
 from app.db.models import User, ShoppingList, ShoppingListItem, Article
-from app.lib import get_current_user, get_db, UserRoles
-from app.lib.pagination import ListColumns, ListItemColumns, PaginationDefaults
+from app.lib import get_current_user, get_db, not_modified, UserRoles
+from app.lib.pagination import CURSOR_HEADER, ListItemColumns, PaginationDefaults, paginate, paginate_ranked
 import app.schemas as schemas
 from sqlalchemy.orm import Session
 
@@ -21,52 +21,52 @@ list_items = APIRouter(
     "/",
     response_model=List[schemas.ListItem],
     responses={
-        200: dict(description="Items of shopping list <list_id>."),
+        200: dict(description="Items of shopping list <list_id>, possibly filtered by name, by default most relevant first. " \
+                              "X-Next-Cursor holds the cursor of the next page, ETag identifies the version of the page."),
+        304: dict(description="The page did not change since the version in If-None-Match."),
+        400: dict(description="Invalid name for filter, pagination parameters or cursor, or sorting by relevance without a name.",
+                  model=schemas.HTTPError),
         404: dict(description="Shopping list <list_id> does not exist.", model=schemas.HTTPError)
     }
-)
+)   #yapf:disable
 def read_items(
     list_id: int,
+    request: Request,
+    response: Response,
     name: str = None,
-    sort_by: ListItemColumns = ListItemColumns.UPDATED_AT,
+    sort_by: ListItemColumns = None,
     page: int = PaginationDefaults.FIRST_PAGE,
     asc: int = PaginationDefaults.ASC,
     limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
     auth_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
+        unchanged = not_modified(request, response, ShoppingList.version(list_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         list = ShoppingList.get(list_id, auth_user, db)
 
-        if page < 1 or limit < 1:
-            raise ValueError(f"Invalid pagination parameters")
-        page -= 1
-
         list_items: List[ShoppingListItem]
-        if name:
-            list_items = list.filter_items(name)
-        else:
-            list_items = list.items
-
-        list_items = sorted(
-            list_items,
-            key=lambda item: item.article.name.casefold() if sort_by == ListItemColumns.NAME    #yapf:disable
-            else item.amount * item.price().price if sort_by == ListItemColumns.COST    #yapf:disable
-            else item.amount if sort_by == ListItemColumns.AMOUNT    #yapf:disable
-            else (item.article.store.name.casefold() if item.article.store else ("z" * 1000).casefold())
-            if sort_by == ListItemColumns.STORE    #yapf:disable
-            else (item.article.category.name.casefold() if item.article.category else ("z" * 1000).casefold())
-            if sort_by == ListItemColumns.CATEGORY    #yapf:disable
-            else (item.article.brand.name.casefold() if item.article.brand else ("z" * 1000).casefold())
-            if sort_by == ListItemColumns.BRAND    #yapf:disable
-            else item.updated_at,    #yapf:disable  
-            reverse=asc != PaginationDefaults.ASC
-        )
-
-        if page * limit >= len(list_items):
-            list_items = []
+        if sort_by is None:
+            sort_by = ListItemColumns.RELEVANCE if name else ListItemColumns.UPDATED_AT
+        if sort_by == ListItemColumns.RELEVANCE:
+            if not name:
+                raise ValueError("Sorting by relevance requires a name")
+            list_items, cursor = paginate_ranked(
+                ShoppingListItem.search(list, db), ShoppingListItem.id, ShoppingListItem.ranked(list, db, name), sort_by, asc, page, limit, after
+            )
         else:
-            list_items = list_items[page * limit:page * limit + limit]
+            query = ShoppingListItem.search(list, db, name if name else None)
+            query, sort_keys = ShoppingListItem.sort_keys(query, sort_by)
+            list_items, cursor = paginate(query, sort_keys, sort_by, asc, page, limit, after)
+        if cursor:
+            response.headers[CURSOR_HEADER] = cursor
+        # loads the price histories serialized by schemas.ListItem at once for all items priced before their article's current price
+        ShoppingListItem.load_prices(list_items, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -87,7 +87,7 @@ def read_item(list_id: int, item_id: int, auth_user: User = Depends(get_current_
     try:
         current_list = ShoppingList.get(list_id, auth_user, db)
         current_item = ShoppingListItem.get(item_id, auth_user, db)
-        if current_item not in current_list.items:
+        if current_item.list_id != current_list.id:
             raise LookupError(f"Item {item_id} is not an item of shopping list {list_id}.")
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -124,6 +124,7 @@ def create_item(list_id: int, item: schemas.ListItemCreate, auth_user: User = De
             current_item.set_price(item.price.price)
 
         db.add(current_item)
+        list.update_costs(db)
         db.commit()
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -136,6 +137,48 @@ def create_item(list_id: int, item: schemas.ListItemCreate, auth_user: User = De
         return current_item
 
 
+@list_items.post(
+    "/batch",
+    response_model=List[schemas.ListItem],
+    status_code=201,
+    responses={
+        200: dict(description="Updated shopping list items, if the batch created none. Either all changes were applied or none."),
+        201: dict(description="Updated and created shopping list items. Either all changes were applied or none."),
+        400: dict(description="Input validation failed.", model=schemas.HTTPError),
+        404: dict(description="Shopping list <list_id>, item or article does not exist.", model=schemas.HTTPError)
+    }
+)
+def change_items(
+    list_id: int, batch: schemas.ListItemBatch, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+):
+    try:
+        list = ShoppingList.get(list_id, auth_user, db)
+        item_ids = list.apply_item_changes(batch.create, batch.update, batch.delete, auth_user, db)
+
+        db.commit()
+        # loads all items at once instead of one by one while serializing
+        query = db.query(ShoppingListItem).options(*ShoppingListItem.loader_options()).filter(ShoppingListItem.id.in_(item_ids))
+        loaded = {
+            item.id: item
+            for item in query
+        }
+        items = [loaded[item_id] for item_id in item_ids]
+        ShoppingListItem.load_prices(items, db)
+        if not batch.create:
+            response.status_code = 200
+    except LookupError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return items
+
+
 @list_items.put(
     "/",
     response_model=schemas.ListItem,
@@ -160,6 +203,7 @@ def update_item(list_id: int, item: schemas.ListItemUpdate, auth_user: User = De
             current_item.set_amount(item.amount)
         if item.price is not None:
             current_item.set_price(item.price.price)
+        list.update_costs(db)
 
         db.commit()
     except LookupError as e:
@@ -190,6 +234,7 @@ def delete_item(list_id: int, item_id: int, auth_user: User = Depends(get_curren
         current_item.parent.updated_at = datetime.utcnow()
 
         db.delete(current_item)
+        list.update_costs(db)
         db.commit()
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -1,11 +1,11 @@
 from datetime import datetime
-from typing import Dict, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
 from starlette.responses import Response
 from app.db.models import User, Category, ShoppingList
-from app.db.models.ShoppingListItem import ShoppingListItem
-from app.lib import get_current_user, get_db, UserRoles
-from app.lib.pagination import ListColumns, PaginationDefaults
+from app.lib import get_current_user, get_db, not_modified, UserRoles
+from app.lib.list_export import MEDIA_TYPES, ListFormats, render_list
+from app.lib.pagination import CURSOR_HEADER, ListColumns, PaginationDefaults, paginate, paginate_ranked
 import app.schemas as schemas
 from sqlalchemy.orm import Session
 
@@ -23,41 +23,44 @@ lists = APIRouter(
 @lists.get(
     "/",
     response_model=List[schemas.List],
-    responses={200: dict(description="List of shopping lists created by the current user, possibly filtered by date.")}
-)
+    responses={
+        200: dict(description="List of shopping lists created by the current user, possibly filtered by title, by default most relevant first. " \
+                              "X-Next-Cursor holds the cursor of the next page."),
+        400: dict(description="Invalid title for filter, pagination parameters or cursor, or sorting by relevance without a title.",
+                  model=schemas.HTTPError)
+    }
+)   #yapf:disable
 def read_lists(
+    response: Response,
     title: str = None,
-    sort_by: ListColumns = ListColumns.UPDATED_AT,
+    sort_by: ListColumns = None,
     page: int = PaginationDefaults.FIRST_PAGE,
     asc: int = PaginationDefaults.ASC,
     limit: int = PaginationDefaults.LIMIT,
+    after: str = None,
     auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     try:
-        if page < 1 or limit < 1:
-            raise ValueError(f"Invalid pagination parameters")
-        page -= 1
-
         lists: List[ShoppingList]
-        if title:
-            lists = ShoppingList.find(title, auth_user)
-        else:
-            lists = auth_user.lists
-
-        lists = sorted(
-            lists,
-            key=lambda list: list.title.casefold() if sort_by == ListColumns.TITLE    #yapf:disable
-            else list.cost()["total"] if sort_by == ListColumns.COST    #yapf:disable
-            else list.finalized if sort_by == ListColumns.FINALIZED    #yapf:disable
-            else (list.category.name.casefold() if list.category else ("z" * 1000).casefold()) if sort_by == ListColumns.CATEGORY    #yapf:disable
-            else list.updated_at,    #yapf:disable  
-            reverse=asc != PaginationDefaults.ASC
-        )
-
-        if page * limit >= len(lists):
-            lists = []
+        if sort_by is None:
+            sort_by = ListColumns.RELEVANCE if title else ListColumns.UPDATED_AT
+        if sort_by == ListColumns.RELEVANCE:
+            if not title:
+                raise ValueError("Sorting by relevance requires a title")
+            lists, cursor = paginate_ranked(
+                ShoppingList.search(auth_user, db), ShoppingList.id, ShoppingList.ranked(auth_user, db, title), sort_by, asc, page, limit, after
+            )
         else:
-            lists = lists[page * limit:page * limit + limit]
+            query = ShoppingList.search(auth_user, db, title if title else None)
+            query, sort_keys = ShoppingList.sort_keys(query, sort_by)
+            lists, cursor = paginate(query, sort_keys, sort_by, asc, page, limit, after)
+        if cursor:
+            response.headers[CURSOR_HEADER] = cursor
+        # computes the costs serialized by schemas.List at once for all lists without up to date snapshots
+        ShoppingList.compute_costs([list for list in lists if not list.areCostsUpToDate()], db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     else:
@@ -68,12 +71,16 @@ def read_lists(
     "/{list_id}",
     response_model=schemas.List,
     responses={
-        200: dict(description="Shopping list <list_id>."),
+        200: dict(description="Shopping list <list_id>. ETag identifies its version."),
+        304: dict(description="Shopping list <list_id> did not change since the version in If-None-Match."),
         404: dict(description="Shopping list <list_id> does not exist.", model=schemas.HTTPError)
     }
 )
-def read_list(list_id: int, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_list(list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
+        unchanged = not_modified(request, response, ShoppingList.version(list_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         list = ShoppingList.get(list_id, auth_user, db)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -86,12 +93,16 @@ def read_list(list_id: int, auth_user: User = Depends(get_current_user), db: Ses
 @lists.get(
     "/{list_id}/costs",
     responses={
-        200: dict(description="Costs of shopping list <list_id>. Total and by category."),
+        200: dict(description="Costs of shopping list <list_id>. Total and by category. ETag identifies their version."),
+        304: dict(description="The costs of shopping list <list_id> did not change since the version in If-None-Match."),
         404: dict(description="Shopping list <list_id> does not exist.", model=schemas.HTTPError)
     }
 )
-def read_list_costs(list_id: int, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def read_list_costs(list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
+        unchanged = not_modified(request, response, ShoppingList.version(list_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         list = ShoppingList.get(list_id, auth_user, db)
 
     except LookupError as e:
@@ -106,35 +117,18 @@ def read_list_costs(list_id: int, auth_user: User = Depends(get_current_user), d
     "/{list_id}/markdown",
     response_model=str,
     responses={
-        200: dict(description="Markdown representation of this shopping list."),
+        200: dict(description="Markdown representation of this shopping list. ETag identifies its version."),
+        304: dict(description="Shopping list <list_id> did not change since the version in If-None-Match."),
         404: dict(description="Shopping list <list_id> does not exist", model=schemas.HTTPError)
     }
 )
-def export_list(list_id: int, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def export_list(list_id: int, request: Request, response: Response, auth_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
+        unchanged = not_modified(request, response, ShoppingList.version(list_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
         list = ShoppingList.get(list_id, auth_user, db)
-        stores: Dict[str, List[ShoppingListItem]] = {}
-        for item in list.items:
-            store = item.article.store.name if item.article.store else "No store specified"
-            if store not in stores.keys():
-                stores[store] = []
-            stores[store].append(item)
-
-        markdown = f"# {list.title}"
-        total_cost = 0
-        for store, items in stores.items():
-            markdown += f"\n## {store}"
-            store_cost = 0
-            for item in items:
-                store_cost += item.amount * item.price().price
-                markdown += f"\n* [ ] {int(item.amount) if item.amount.is_integer() else item.amount} x {item.article.name}"
-            total_cost += store_cost
-            store_cost = str(int(store_cost)) + "." + str(store_cost).split(".")[1][0:2]
-            markdown += f"\n\nExpected cost: {store_cost}"
-        markdown += "\n---"
-        total_cost = str(int(total_cost)) + "." + str(total_cost).split(".")[1][0:2]
-        markdown += f"\nExpected total cost: {total_cost}"
-
+        markdown = render_list(list, db, ListFormats.MARKDOWN)
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -143,6 +137,37 @@ def export_list(list_id: int, auth_user: User = Depends(get_current_user), db: S
         return markdown
 
 
+@lists.get(
+    "/{list_id}/export",
+    response_class=Response,
+    responses={
+        200: dict(description="Shopping list <list_id> as a markdown, plain text or HTML document. ETag identifies its version."),
+        304: dict(description="Shopping list <list_id> did not change since the version in If-None-Match."),
+        404: dict(description="Shopping list <list_id> does not exist", model=schemas.HTTPError)
+    }
+)
+def export_list_document(
+    list_id: int,
+    request: Request,
+    response: Response,
+    format: ListFormats = ListFormats.MARKDOWN,
+    auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    try:
+        unchanged = not_modified(request, response, ShoppingList.version(list_id, auth_user, db))
+        if unchanged is not None:
+            return unchanged
+        list = ShoppingList.get(list_id, auth_user, db)
+        document = render_list(list, db, format)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return Response(content=document, media_type=MEDIA_TYPES[format], headers=dict(response.headers))
+
+
 @lists.post(
     "/",
     response_model=schemas.List,
@@ -163,6 +188,7 @@ def create_list(list: schemas.ListCreate, auth_user: User = Depends(get_current_
         current_list.finalized = False
 
         db.add(current_list)
+        current_list.update_costs(db)
         db.commit()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -195,6 +221,7 @@ def update_list(list: schemas.ListUpdate, auth_user: User = Depends(get_current_
         if list.finalized is not None:
             current_list.finalized = list.finalized
             current_list.updated_at = datetime.utcnow()
+        current_list.update_costs(db)
 
         db.commit()
     except LookupError as e:
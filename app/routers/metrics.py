@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException
+import app.db as database
+from app.db.models import User
+from app.db.pool import pool_metrics
+from app.lib import Catalog, SearchIndex, Suggestions, get_current_user, UserRoles
+from app.lib.get_current_user import principals
+from app.lib.list_export import documents
+from app.lib.passwords import verified
+from app.lib.sanitize import clean
+import app.schemas as schemas
+
+metrics = APIRouter(
+    prefix="/api/metrics",
+    responses={
+        401: dict(description="Metrics can only be accessed by logged in users.", model=schemas.HTTPError),
+        403: dict(description="Metrics can only be accessed by admins.", model=schemas.HTTPError),
+        500: dict(description="Internal server error.", model=schemas.HTTPError)
+    },
+    tags=["metrics"]
+)   #yapf:disable
+
+@metrics.get("/", responses={
+    200: dict(description="Connection pool and cache metrics of the worker handling the request."),
+})
+def read_metrics(auth_user: User = Depends(get_current_user)):
+    try:
+        if auth_user.role != UserRoles.ADMIN:
+            raise PermissionError("You are not allowed to access metrics")
+
+        result = dict(
+            database_pool=pool_metrics(database.engine.pool),
+            replica_database_pools=[pool_metrics(replica_engine.pool) for replica_engine in database.replica_engines],
+            auth_cache=dict(size=len(principals), hits=principals.hits, misses=principals.misses),
+            catalog_cache=dict(size=len(Catalog.cache), hits=Catalog.cache.hits, misses=Catalog.cache.misses),
+            search_index_cache=dict(size=len(SearchIndex.cache), hits=SearchIndex.cache.hits, misses=SearchIndex.cache.misses),
+            suggestion_cache=dict(size=len(Suggestions.cache), hits=Suggestions.cache.hits, misses=Suggestions.cache.misses),
+            export_cache=dict(size=len(documents), hits=documents.hits, misses=documents.misses),
+            password_cache=dict(size=len(verified), hits=verified.hits, misses=verified.misses),
+            sanitize_cache=dict(size=clean.cache_info().currsize, hits=clean.cache_info().hits, misses=clean.cache_info().misses),
+        )
+        if hasattr(database, "async_engine"):
+            result["async_database_pool"] = pool_metrics(database.async_engine.pool)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return result
@@ -0,0 +1,42 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from app.db.models import User
+from app.lib import Suggestions, SuggestionTypes, get_current_user, get_db
+from app.lib.Suggestions import DEFAULT_SUGGESTIONS
+import app.schemas as schemas
+from sqlalchemy.orm import Session
+
+suggest = APIRouter(
+    prefix="/api/suggest",
+    responses={
+        401: dict(description="Suggestions can only be accessed by logged in users.", model=schemas.HTTPError),
+        500: dict(description="Internal server error.", model=schemas.HTTPError)
+    },
+    tags=["suggest"]
+)   #yapf:disable
+
+
+@suggest.get(
+    "/",
+    response_model=List[schemas.Suggestion],
+    responses={
+        200: dict(description="Up to <limit> articles, stores, categories or brands of the current user with a word of their name " \
+                              "starting with <q>, the ones used by most shopping list items first."),
+        400: dict(description="Empty prefix or invalid limit.", model=schemas.HTTPError)
+    }
+)   #yapf:disable
+def read_suggestions(
+    q: str,
+    type: SuggestionTypes = SuggestionTypes.ARTICLE,
+    limit: int = DEFAULT_SUGGESTIONS,
+    auth_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    try:
+        suggestions = [dict(id=id, name=name, uses=uses) for id, name, uses in Suggestions.of(type, auth_user, db).suggest(q, limit)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        return suggestions
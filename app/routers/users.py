@@ -2,9 +2,11 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic.errors import DecimalIsNotFiniteError
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import Response
 from app.db.models import User
-from app.lib import create_access_token, get_current_user, get_db, UserRoles
+from app.lib import commit_unique, create_access_token, get_current_user, get_db, invalidate_user, UserRoles
+from app.lib.passwords import hash_password_async, needs_rehash, verify_password_async
 import app.schemas as schemas
 from sqlalchemy.orm import Session
 
@@ -45,13 +47,20 @@ def read_users(current_user: User = Depends(get_current_user), db: Session = Dep
         404: dict(description="User does not exist.", model=schemas.HTTPError)
     }
 )
-def login(credentials: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(credentials: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # the database is accessed in the thread pool, passwords are hashed in the password pool, neither blocks the event loop
     try:
-        current_user = User.get(credentials.username, db)
-        if current_user.pw_hash != User.process_password(credentials.password):
+        current_user = await run_in_threadpool(User.get, credentials.username, db)
+        if not await verify_password_async(credentials.password, current_user.pw_hash):
             raise PermissionError("Invalid password")
+        if needs_rehash(current_user.pw_hash):
+            current_user.pw_hash = await hash_password_async(credentials.password)
         current_user.logged_in = True
-        db.commit()
+        claims = dict(sub=current_user.username, ver=current_user.token_version)
+        # the user's next requests have to see that they are logged in, even if replicas lag behind
+        db.info["username"] = current_user.username
+        await run_in_threadpool(db.commit)
+        invalidate_user(claims["sub"])
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except LookupError as e:
@@ -62,7 +71,7 @@ def login(credentials: OAuth2PasswordRequestForm = Depends(), db: Session = Depe
         print(str(e))
         raise HTTPException(status_code=500, detail=str(e))
     else:
-        return dict(access_token=create_access_token(dict(sub=current_user.username)), token_type="bearer")
+        return dict(access_token=create_access_token(claims), token_type="bearer")
 
 
 @users.post(
@@ -75,8 +84,10 @@ def login(credentials: OAuth2PasswordRequestForm = Depends(), db: Session = Depe
 def logout(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         current_user.logged_in = False
+        current_user.revoke_tokens()
 
         db.commit()
+        invalidate_user(current_user.username)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     else:
@@ -102,7 +113,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         current_user.role = UserRoles.USER
 
         db.add(current_user)
-        db.commit()
+        commit_unique(db, f"User name {current_user.username} is already used")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -135,9 +146,12 @@ def update_user(user: schemas.UserUpdate, auth_user: User = Depends(get_current_
         if user.role:
             if auth_user.role != UserRoles.ADMIN:
                 raise PermissionError("You are not allowed to update users other than yourself")
-            current_user.role = user.role
+            if user.role != current_user.role:
+                current_user.role = user.role
+                current_user.revoke_tokens()
 
         db.commit()
+        invalidate_user(current_user.username)
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
@@ -169,6 +183,7 @@ def delete_user(username: str, user: User = Depends(get_current_user), db: Sessi
 
         db.delete(current_user)
         db.commit()
+        invalidate_user(username)
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
@@ -100,4 +100,26 @@ class Article(BaseModel):
             schema["properties"]["brand"] = {
                 "title": "Brand",
                 "type": "string"
-            }
\ No newline at end of file
+            }
+
+
+class ArticleImportError(BaseModel):
+    index: int
+    detail: str
+
+
+class ArticleImport(BaseModel):
+    ids: List[int]
+    errors: List[ArticleImportError]
+
+
+class PriceImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class PriceImport(BaseModel):
+    inserted: int
+    unchanged: int
+    failed: int
+    errors: List[PriceImportError]
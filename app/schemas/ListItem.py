@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, validator
 from datetime import datetime
 
@@ -49,4 +49,10 @@ class ListItem(BaseModel):
                         "type": "string"
                     }
                 }
-            }
\ No newline at end of file
+            }
+
+
+class ListItemBatch(BaseModel):
+    create: List[ListItemCreate] = []
+    update: List[ListItemUpdate] = []
+    delete: List[int] = []
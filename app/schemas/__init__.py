@@ -6,5 +6,7 @@ from app.schemas.Store import StoreCreate, StoreUpdate, Store
 from app.schemas.Category import CategoryCreate, CategoryUpdate, Category
 from app.schemas.Brand import BrandCreate, BrandUpdate, Brand
 from app.schemas.Article import ArticleCreate, ArticleUpdate, Article, Price, PriceCreate
+from app.schemas.Article import ArticleImportError, ArticleImport, PriceImportError, PriceImport
 from app.schemas.List import ListCreate, ListUpdate, List
-from app.schemas.ListItem import ListItemCreate, ListItemUpdate, ListItem
\ No newline at end of file
+from app.schemas.ListItem import ListItemCreate, ListItemUpdate, ListItem, ListItemBatch
+from app.schemas.Suggestion import Suggestion
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Measures the login throughput of a running Shopping Manager API and the latency of reads served at the same time.
+
+Start the API with PASSWORD_CACHE_TTL=0 so every login derives a password hash, or with the default to measure cached verifications, e.g.:
+
+    python benchmarks/login_throughput.py --url http://localhost:8000 --logins 8 --readers 8 --cores 4
+
+Logins per second are divided by --cores, the number of CPUs of the API's host or PASSWORD_HASH_WORKERS if it is lower.
+The reads show whether logins stall other requests. Only the standard library is used so the script runs without the API's virtual environment.
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+
+from read_throughput import request
+
+
+def prepare(url, username, password):
+    try:
+        request(f"{url}/api/users", body=dict(username=username, first_name="Bench", last_name="Mark", password=password))
+    except urllib.error.HTTPError as e:
+        if e.code != 400:
+            raise
+    return request(f"{url}/api/login", form=dict(username=username, password=password))["access_token"]
+
+
+def run(url, username, password, token, logins, readers, duration):
+    latencies = dict(login=[], read=[])
+    errors = dict(login=0, read=0)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(kind):
+        own_latencies = []
+        own_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if kind == "login":
+                    request(f"{url}/api/login", form=dict(username=username, password=password))
+                else:
+                    request(f"{url}/api/lists/?limit=1", token=token)
+            except (urllib.error.URLError, ConnectionError):
+                own_errors += 1
+            else:
+                own_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies[kind].extend(own_latencies)
+            errors[kind] += own_errors
+
+    threads = [threading.Thread(target=worker, args=("login", )) for _ in range(logins)]
+    threads += [threading.Thread(target=worker, args=("read", )) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", default="benchmark")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--logins", type=int, default=8, help="number of clients logging in concurrently")
+    parser.add_argument("--readers", type=int, default=8, help="number of clients reading concurrently")
+    parser.add_argument("--cores", type=int, default=1, help="CPUs hashing passwords on the API's host")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    token = prepare(url, args.username, args.password)
+    latencies, errors = run(url, args.username, args.password, token, args.logins, args.readers, args.duration)
+
+    for kind, values in latencies.items():
+        if not values:
+            print(f"{kind + ':':7} no successful requests, {errors[kind]} errors")
+            continue
+        values.sort()
+        print(
+            f"{kind + ':':7} {len(values)} ok, {errors[kind]} errors, {len(values) / args.duration:.1f} req/s, "
+            f"latency mean {statistics.mean(values) * 1000:.1f} ms, "
+            f"p50 {values[len(values) // 2] * 1000:.1f} ms, "
+            f"p99 {values[int(len(values) * 0.99)] * 1000:.1f} ms"
+        )
+    print(f"logins per core: {len(latencies['login']) / args.duration / args.cores:.1f} /s")
+
+
+if __name__ == "__main__":
+    main()
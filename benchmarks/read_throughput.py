@@ -0,0 +1,120 @@
+"""
+Measures the throughput of the read endpoints of a running Shopping Manager API.
+
+Start the API once without and once with ASYNC_DATABASE_URL set and run this script against both, e.g.:
+
+    python benchmarks/read_throughput.py --url http://localhost:8000 --username bench --password bench --concurrency 100
+
+The user is created if it does not exist yet, and gets a shopping list with a few items so every endpoint has data to return.
+Only the standard library is used so the script runs without the API's virtual environment.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+def request(url, method=None, token=None, body=None, form=None):
+    headers = {}
+    data = None
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+        data = json.dumps(body).encode()
+    elif form is not None:
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+        data = urllib.parse.urlencode(form).encode()
+    with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers, method=method)) as response:
+        content = response.read()
+        return json.loads(content) if content else None
+
+
+def prepare(url, username, password, articles):
+    try:
+        request(f"{url}/api/users", body=dict(username=username, first_name="Bench", last_name="Mark", password=password))
+    except urllib.error.HTTPError as e:
+        if e.code != 400:
+            raise
+    token = request(f"{url}/api/login", form=dict(username=username, password=password))["access_token"]
+
+    lists = request(f"{url}/api/lists/?limit=1", token=token)
+    if lists:
+        return token, lists[0]["id"]
+
+    shopping_list = request(f"{url}/api/lists/", token=token, body=dict(title="Benchmark"))
+    for i in range(articles):
+        article = request(
+            f"{url}/api/articles/",
+            token=token,
+            body=dict(name=f"Article {i}", detail="", store="", category="", brand="", price=dict(price=1.0 + i, currency="EUR"))
+        )
+        request(f"{url}/api/lists/{shopping_list['id']}/items/", token=token, body=dict(article_id=article["id"], amount=1))
+    return token, shopping_list["id"]
+
+
+def run(url, token, list_id, concurrency, duration):
+    paths = ["/api/articles/", "/api/lists/", f"/api/lists/{list_id}", f"/api/lists/{list_id}/items/"]
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset):
+        own_latencies = []
+        own_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                request(url + paths[i % len(paths)], token=token)
+            except (urllib.error.URLError, ConnectionError):
+                own_errors += 1
+            else:
+                own_latencies.append(time.perf_counter() - start)
+            i += 1
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=worker, args=(i, )) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", default="benchmark")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--articles", type=int, default=20, help="number of articles created for a new benchmark user")
+    parser.add_argument("--concurrency", type=int, default=50, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    token, list_id = prepare(url, args.username, args.password, args.articles)
+    latencies, errors = run(url, token, list_id, args.concurrency, args.duration)
+
+    if not latencies:
+        print(f"no successful requests, {errors} errors")
+        return
+    latencies.sort()
+    print(f"requests:   {len(latencies)} ok, {errors} errors")
+    print(f"throughput: {len(latencies) / args.duration:.1f} req/s")
+    print(
+        f"latency:    mean {statistics.mean(latencies) * 1000:.1f} ms, "
+        f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
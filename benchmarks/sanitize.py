@@ -0,0 +1,53 @@
+"""
+Compares app.lib.sanitize with the bleach.clean(..., tags=[]) calls it replaces, on names like the ones users enter.
+
+Run from the repository root with the API's virtual environment activated and its .env in place:
+
+    python benchmarks/sanitize.py --calls 100000
+
+Plain names skip parsing, names containing markup characters are parsed once and then served from the cache.
+Every result is compared with bleach's before timing.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bleach
+from app.lib.sanitize import clean, sanitize
+
+NAMES = [
+    "Whole milk 1.5%", "Organic apples", "Bread", "Gouda (sliced)", "Oat drink", "Aldi", "Lidl", "Dairy", "Weekly groceries", "EUR", "Ben & Jerry's",
+    "Salt & pepper", "Fish <fresh>", "Crème fraîche", "Müller", "Tea\r\nbags"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct names, the more the fewer cache hits")
+    args = parser.parse_args()
+
+    random.seed(0)
+    distinct = [f"{random.choice(NAMES)} {number}" for number in range(args.distinct)]
+    texts = [random.choice(distinct) for _ in range(args.calls)]
+    for text in set(texts):
+        assert sanitize(text) == bleach.clean(text, tags=[]), text
+    clean.cache_clear()
+
+    results = {
+        "bleach.clean": timeit.timeit(lambda: [bleach.clean(text, tags=[]) for text in texts], number=1),
+        "sanitize (cold cache)": timeit.timeit(lambda: [sanitize(text) for text in texts], number=1),
+        "sanitize (warm cache)": timeit.timeit(lambda: [sanitize(text) for text in texts], number=1),
+    }
+    baseline = results["bleach.clean"]
+    for name, seconds in results.items():
+        print(f"{name:24} {seconds * 1e6 / args.calls:8.2f} µs/call {baseline / seconds:8.1f}x")
+    print(f"cache: {clean.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from alembic import context
+from app.db import Base, engine
+import app.db.models
+"""
+Runs migrations against app.db.engine, or the connection passed in config.attributes["connection"] by app.db.migrate
+"""
+
+config = context.config
+
+
+def run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=Base.metadata, render_as_batch=True, compare_type=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+connection = config.attributes.get("connection", None)
+if connection is None:
+    with engine.connect() as connection:
+        run_migrations(connection)
+else:
+    run_migrations(connection)
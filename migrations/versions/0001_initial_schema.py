@@ -0,0 +1,72 @@
+"""initial schema
+
+Schema previously created by Base.metadata.create_all. Databases created that way are stamped with this revision by
+app.db.migrate before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2021-12-20 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def owner(table: str) -> list:
+    return [
+        sa.Column("username", sa.String(32), nullable=False),
+        sa.ForeignKeyConstraint(["username"], ["User.username"], name=f"fk_{table}_username_User", ondelete="CASCADE")
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "User", sa.Column("username", sa.String(32), nullable=False), sa.Column("first_name", sa.String(64)), sa.Column("last_name", sa.String(64)),
+        sa.Column("pw_hash", sa.Text, nullable=False), sa.Column("role", sa.Text, nullable=False), sa.Column("logged_in", sa.Boolean),
+        sa.PrimaryKeyConstraint("username", name="pk_User")
+    )
+    for table in ("Store", "Category", "Brand"):
+        op.create_table(
+            table, sa.Column("id", sa.Integer, autoincrement=True, nullable=False), sa.Column("name", sa.Text, nullable=False),
+            sa.Column("created_at", sa.DateTime), sa.Column("updated_at", sa.DateTime), *owner(table),
+            sa.PrimaryKeyConstraint("id", name=f"pk_{table}")
+        )
+    op.create_table(
+        "Article", sa.Column("id", sa.Integer, autoincrement=True, nullable=False), sa.Column("name", sa.Text, nullable=False),
+        sa.Column("detail", sa.Text), sa.Column("created_at", sa.DateTime), sa.Column("updated_at", sa.DateTime), sa.Column("store_id", sa.Integer),
+        sa.Column("category_id", sa.Integer), sa.Column("brand_id", sa.Integer), *owner("Article"),
+        sa.ForeignKeyConstraint(["store_id"], ["Store.id"], name="fk_Article_store_id_Store"),
+        sa.ForeignKeyConstraint(["category_id"], ["Category.id"], name="fk_Article_category_id_Category"),
+        sa.ForeignKeyConstraint(["brand_id"], ["Brand.id"], name="fk_Article_brand_id_Brand"), sa.PrimaryKeyConstraint("id", name="pk_Article")
+    )
+    op.create_table(
+        "Price", sa.Column("id", sa.Integer, autoincrement=True, nullable=False), sa.Column("price", sa.Float, nullable=False),
+        sa.Column("created_at", sa.DateTime), sa.Column("currency", sa.String(32), nullable=False),
+        sa.Column("article_id", sa.Integer, nullable=False), *owner("Price"),
+        sa.ForeignKeyConstraint(["article_id"], ["Article.id"], name="fk_Price_article_id_Article", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", name="pk_Price")
+    )
+    op.create_table(
+        "ShoppingList", sa.Column("id", sa.Integer, autoincrement=True, nullable=False), sa.Column("title", sa.Text),
+        sa.Column("created_at", sa.DateTime), sa.Column("updated_at", sa.DateTime), sa.Column("finalized", sa.Boolean),
+        sa.Column("category_id", sa.Integer), *owner("ShoppingList"),
+        sa.ForeignKeyConstraint(["category_id"], ["Category.id"], name="fk_ShoppingList_category_id_Category"),
+        sa.PrimaryKeyConstraint("id", name="pk_ShoppingList")
+    )
+    op.create_table(
+        "ShoppingListItem", sa.Column("id", sa.Integer, autoincrement=True, nullable=False), sa.Column("article_id", sa.Integer, nullable=False),
+        sa.Column("amount", sa.Float), sa.Column("offer_price", sa.Float), sa.Column("created_at", sa.DateTime), sa.Column("updated_at", sa.DateTime),
+        sa.Column("list_id", sa.Integer, nullable=False), *owner("ShoppingListItem"),
+        sa.ForeignKeyConstraint(["article_id"], ["Article.id"], name="fk_ShoppingListItem_article_id_Article", ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["list_id"], ["ShoppingList.id"], name="fk_ShoppingListItem_list_id_ShoppingList", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", name="pk_ShoppingListItem")
+    )
+
+
+def downgrade():
+    for table in ("ShoppingListItem", "ShoppingList", "Price", "Article", "Brand", "Category", "Store", "User"):
+        op.drop_table(table)
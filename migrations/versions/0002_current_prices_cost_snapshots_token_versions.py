@@ -0,0 +1,51 @@
+"""current prices, cost snapshots and token versions
+
+Adds Article.current_price_id (filled with the latest price of every article), the (article_id, created_at) price index,
+the ListCost snapshot table and User.token_version.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# categories of cost snapshots are compared exactly, like the keys of the costs they are computed from
+CATEGORY = sa.String(255).with_variant(mysql.VARCHAR(255, charset="utf8mb4", collation="utf8mb4_bin"), "mysql")
+
+
+def upgrade():
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.add_column(sa.Column("current_price_id", sa.Integer, nullable=True))
+        batch_op.create_foreign_key("fk_Article_current_price_id_Price", "Price", ["current_price_id"], ["id"], ondelete="SET NULL")
+    article = sa.table("Article", sa.column("id"), sa.column("current_price_id"))
+    price = sa.table("Price", sa.column("id"), sa.column("article_id"), sa.column("created_at"))
+    latest_price = sa.select(price.c.id).where(price.c.article_id == article.c.id).order_by(price.c.created_at.desc()).limit(1)
+    op.execute(article.update().values(current_price_id=latest_price.scalar_subquery()))
+    op.create_index("ix_Price_article_id_created_at", "Price", ["article_id", "created_at"])
+
+    op.create_table(
+        "ListCost", sa.Column("list_id", sa.Integer, nullable=False), sa.Column("category", CATEGORY, nullable=False),
+        sa.Column("cost", sa.Float, nullable=False), sa.Column("created_at", sa.DateTime),
+        sa.ForeignKeyConstraint(["list_id"], ["ShoppingList.id"], name="fk_ListCost_list_id_ShoppingList", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("list_id", "category", name="pk_ListCost")
+    )
+
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.add_column(sa.Column("token_version", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.drop_column("token_version")
+    op.drop_table("ListCost")
+    op.drop_index("ix_Price_article_id_created_at", table_name="Price")
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.drop_constraint("fk_Article_current_price_id_Price", type_="foreignkey")
+        batch_op.drop_column("current_price_id")
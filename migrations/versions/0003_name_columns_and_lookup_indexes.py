@@ -0,0 +1,89 @@
+"""name columns and lookup indexes
+
+Turns the name columns of articles, stores, categories and brands into bounded strings compared case-insensitively,
+makes store, category and brand names unique per user and indexes the columns used to look up a user's rows.
+Names longer than 255 characters are truncated first, and stores, categories and brands whose names are equal by the new
+collation, e.g. "Cafe" and "Café" on MySQL, get their ID appended to their name, so no step fails halfway on existing data.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, sqlite
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+NAME_LENGTH = 255
+
+
+def NameString():
+    # name type as of this revision
+    return sa.String(NAME_LENGTH) \
+            .with_variant(mysql.VARCHAR(NAME_LENGTH, charset="utf8mb4", collation="utf8mb4_unicode_ci"), "mysql") \
+            .with_variant(sqlite.VARCHAR(NAME_LENGTH, collation="NOCASE"), "sqlite")
+
+
+def rename(rows, names):
+    if names:
+        op.get_bind().execute(rows.update().where(rows.c.id == sa.bindparam("row_id")), [dict(row_id=id, name=name) for id, name in names])
+
+
+def truncate_names(table):
+    # MySQL's LENGTH counts bytes
+    rows = sa.table(table, sa.column("id"), sa.column("name"))
+    length = sa.func.char_length if op.get_bind().dialect.name == "mysql" else sa.func.length
+    long_names = op.get_bind().execute(sa.select(rows.c.id, rows.c.name).where(length(rows.c.name) > NAME_LENGTH)).fetchall()
+    rename(rows, [(id, name[:NAME_LENGTH]) for id, name in long_names])
+
+
+def deduplicate_names(table):
+    # the name column already has the new collation, so the database groups names like the unique constraint compares them
+    rows = sa.table(table, sa.column("id"), sa.column("username"), sa.column("name"))
+    bind = op.get_bind()
+    groups = sa.select(rows.c.username, sa.func.min(rows.c.name)).group_by(rows.c.username, rows.c.name).having(sa.func.count() > 1)
+    for username, name in bind.execute(groups).fetchall():
+        duplicates = sa.select(rows.c.id, rows.c.name).where(rows.c.username == username, rows.c.name == name).order_by(rows.c.id)
+        duplicates = bind.execute(duplicates).fetchall()
+        rename(rows, [(id, f"{name[:NAME_LENGTH - len(f' ({id})')]} ({id})") for id, name in duplicates[1:]])
+
+
+def upgrade():
+    for table in ("Store", "Category", "Brand", "Article"):
+        truncate_names(table)
+
+    for table in ("Store", "Category", "Brand"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("name", existing_type=sa.Text, type_=NameString(), existing_nullable=False)
+        deduplicate_names(table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(f"uq_{table}_username", ["username", "name"])
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.alter_column("name", existing_type=sa.Text, type_=NameString(), existing_nullable=False)
+        batch_op.create_index("ix_Article_username_name", ["username", "name"])
+
+    op.create_index("ix_Price_username", "Price", ["username"])
+    op.create_index("ix_ShoppingList_username", "ShoppingList", ["username"])
+    op.create_index("ix_ShoppingListItem_article_id", "ShoppingListItem", ["article_id"])
+    op.create_index("ix_ShoppingListItem_list_id", "ShoppingListItem", ["list_id"])
+    op.create_index("ix_ShoppingListItem_username", "ShoppingListItem", ["username"])
+
+
+def downgrade():
+    op.drop_index("ix_ShoppingListItem_username", table_name="ShoppingListItem")
+    op.drop_index("ix_ShoppingListItem_list_id", table_name="ShoppingListItem")
+    op.drop_index("ix_ShoppingListItem_article_id", table_name="ShoppingListItem")
+    op.drop_index("ix_ShoppingList_username", table_name="ShoppingList")
+    op.drop_index("ix_Price_username", table_name="Price")
+
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.drop_index("ix_Article_username_name")
+        batch_op.alter_column("name", existing_type=NameString(), type_=sa.Text, existing_nullable=False)
+    for table in ("Brand", "Category", "Store"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f"uq_{table}_username", type_="unique")
+            batch_op.alter_column("name", existing_type=NameString(), type_=sa.Text, existing_nullable=False)
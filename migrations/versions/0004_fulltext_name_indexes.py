@@ -0,0 +1,38 @@
+"""fulltext name indexes
+
+Adds FULLTEXT indexes using the ngram parser to the name columns filtered by substring, used if SEARCH_FULLTEXT is set.
+Only MySQL supports them, other databases are left unchanged.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 14:00:00
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (table, column) of the names filtered by substring
+FULLTEXT_COLUMNS = [("Article", "name"), ("ShoppingList", "title"), ("Store", "name"), ("Category", "name"), ("Brand", "name")]
+
+
+def fulltext_index(table, column):
+    return f"ix_{table}_{column}_fulltext"
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+
+    for table, column in FULLTEXT_COLUMNS:
+        op.create_index(fulltext_index(table, column), table, [column], mysql_prefix="FULLTEXT", mysql_with_parser="ngram")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "mysql":
+        return
+
+    for table, column in reversed(FULLTEXT_COLUMNS):
+        op.drop_index(fulltext_index(table, column), table_name=table)
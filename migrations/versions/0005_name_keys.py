@@ -0,0 +1,75 @@
+"""name keys
+
+Adds name_key, the casefolded name, to articles, stores, categories and brands and makes it the column store, category and brand
+names are unique by per user, as the collations of the name columns fold case and accents differently than Python does.
+Stores, categories and brands whose names only differed in case so far get their ID appended to their name.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def NameKeyString():
+    # name key type as of this revision
+    return sa.String(510).with_variant(mysql.VARCHAR(510, charset="utf8mb4", collation="utf8mb4_bin"), "mysql")
+
+
+def fill_name_keys(table, unique):
+    rows = sa.table(table, sa.column("id"), sa.column("username"), sa.column("name"), sa.column("name_key"))
+    bind = op.get_bind()
+    seen = set()
+    values = []
+    for id, username, name in bind.execute(sa.select(rows.c.id, rows.c.username, rows.c.name).order_by(rows.c.id)):
+        key = name.casefold()
+        if unique and (username, key) in seen:
+            name = f"{name} ({id})"
+            key = name.casefold()
+        seen.add((username, key))
+        values.append({
+            "row_id": id,
+            "name": name,
+            "name_key": key
+        })
+    if values:
+        bind.execute(rows.update().where(rows.c.id == sa.bindparam("row_id")), values)
+
+
+def upgrade():
+    for table in ("Store", "Category", "Brand"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("name_key", NameKeyString(), nullable=True))
+        fill_name_keys(table, unique=True)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("name_key", existing_type=NameKeyString(), nullable=False)
+            batch_op.create_unique_constraint(f"uq_{table}_username_name_key", ["username", "name_key"])
+            batch_op.drop_constraint(f"uq_{table}_username", type_="unique")
+
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.add_column(sa.Column("name_key", NameKeyString(), nullable=True))
+    fill_name_keys("Article", unique=False)
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.alter_column("name_key", existing_type=NameKeyString(), nullable=False)
+        batch_op.create_index("ix_Article_username_name_key", ["username", "name_key"])
+        batch_op.drop_index("ix_Article_username_name")
+
+
+def downgrade():
+    with op.batch_alter_table("Article") as batch_op:
+        batch_op.create_index("ix_Article_username_name", ["username", "name"])
+        batch_op.drop_index("ix_Article_username_name_key")
+        batch_op.drop_column("name_key")
+
+    for table in ("Brand", "Category", "Store"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(f"uq_{table}_username", ["username", "name"])
+            batch_op.drop_constraint(f"uq_{table}_username_name_key", type_="unique")
+            batch_op.drop_column("name_key")
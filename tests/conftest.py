@@ -0,0 +1,71 @@
+import os
+import tempfile
+import uuid
+
+# the application reads its configuration on import
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}",
+    CREATE_DATABASE="true",
+    CORS_ORIGINS="[]",
+    SALT="salt",
+    SECRET_KEY="secret",
+)   #yapf:disable
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def username() -> str:
+    return f"user_{uuid.uuid4().hex[:16]}"
+
+
+def sign_up(client: TestClient, username: str) -> dict:
+    """
+    Creates user <username> and returns the authorization header of a new session.
+    """
+    response = client.post("/api/users", json=dict(username=username, first_name="Test", last_name="User", password="password"))
+    assert response.status_code == 201, response.text
+    response = client.post("/api/login", data=dict(username=username, password="password"))
+    assert response.status_code == 200, response.text
+    return {
+        "Authorization": f"Bearer {response.json()['access_token']}"
+    }
+
+
+@pytest.fixture
+def headers(client: TestClient, username: str) -> dict:
+    """
+    Authorization header of a new user, every test gets its own user so tests don't see each other's data.
+    """
+    return sign_up(client, username)
+
+
+@pytest.fixture
+def other_headers(client: TestClient) -> dict:
+    return sign_up(client, f"user_{uuid.uuid4().hex[:16]}")
+
+
+@pytest.fixture
+def admin_headers(client: TestClient) -> dict:
+    """
+    Authorization header of a new administrator.
+    """
+    from app.db import SessionLocal
+    from app.db.models import User
+    from app.lib import UserRoles, invalidate_user
+
+    username = f"admin_{uuid.uuid4().hex[:16]}"
+    headers = sign_up(client, username)
+    db = SessionLocal()
+    User.get(username, db).role = UserRoles.ADMIN
+    db.commit()
+    db.close()
+    invalidate_user(username)
+    return headers
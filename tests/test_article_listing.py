@@ -0,0 +1,37 @@
+from tests.utils import create_article, names
+
+
+def test_articles_are_sorted_in_both_directions(client, headers):
+    create_article(client, headers, "Milk", 1.19, store="Aldi", category="Dairy", brand="Weide")
+    create_article(client, headers, "bread", 2.5, store="Lidl")
+    create_article(client, headers, "Cheese", 3.99, store="Aldi", category="Dairy")
+
+    response = client.get("/api/articles/?sort_by=name", headers=headers)
+    assert response.status_code == 200
+    assert names(response.json()) == ["bread", "Cheese", "Milk"]
+    assert names(client.get("/api/articles/?sort_by=name&asc=0", headers=headers).json()) == ["Milk", "Cheese", "bread"]
+    assert names(client.get("/api/articles/?sort_by=price", headers=headers).json()) == ["Milk", "bread", "Cheese"]
+    assert names(client.get("/api/articles/?sort_by=price&asc=0", headers=headers).json()) == ["Cheese", "bread", "Milk"]
+
+
+def test_articles_are_filtered_by_name(client, headers):
+    for name in ("Green tea", "Black tea", "Coffee"):
+        create_article(client, headers, name)
+
+    assert sorted(names(client.get("/api/articles/?name=tea", headers=headers).json())) == ["Black tea", "Green tea"]
+    assert client.get("/api/articles/?name=juice", headers=headers).json() == []
+
+
+def test_articles_are_paginated(client, headers):
+    for index in range(5):
+        create_article(client, headers, f"Article {index}")
+
+    pages = [names(client.get(f"/api/articles/?sort_by=name&limit=2&page={page}", headers=headers).json()) for page in (1, 2, 3)]
+    assert pages == [["Article 0", "Article 1"], ["Article 2", "Article 3"], ["Article 4"]]
+    assert client.get("/api/articles/?limit=0", headers=headers).status_code == 400
+
+
+def test_articles_of_other_users_are_not_listed(client, headers, other_headers):
+    create_article(client, headers, "Mine")
+
+    assert "Mine" not in names(client.get("/api/articles/", headers=other_headers).json())
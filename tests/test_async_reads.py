@@ -0,0 +1,68 @@
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.lib import get_async_db
+from app.routers.async_articles import async_articles
+from app.routers.async_lists import async_lists
+from app.routers.async_list_items import async_list_items
+from tests.utils import add_item, create_article, create_list
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture(scope="module")
+def async_client() -> TestClient:
+    """
+    Client of the async read endpoints, on an AsyncEngine using the test database.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_async_engine(os.environ["DATABASE_URL"].replace("sqlite://", "sqlite+aiosqlite://"))
+    AsyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+    async def get_test_async_db():
+        db = AsyncSessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    app = FastAPI()
+    for router in (async_articles, async_lists, async_list_items):
+        app.include_router(router)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/articles/", "/api/articles/{article}", "/api/articles/{article}/prices", "/api/articles/{article}/price", "/api/lists/",
+             "/api/lists/{list}", "/api/lists/{list}/costs", "/api/lists/{list}/items/"]
+)   #yapf:disable
+def test_async_endpoints_answer_like_sync_ones(client, async_client, headers, path):
+    article = create_article(client, headers, "Milk", 1.19, store="Aldi")
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], article["id"], 2)
+    path = path.format(article=article["id"], list=shopping_list["id"])
+
+    expected = client.get(path, headers=headers)
+    response = async_client.get(path, headers=headers)
+    assert expected.status_code == 200, expected.text
+    assert response.status_code == 200, response.text
+    assert response.json() == expected.json()
+
+
+def test_async_endpoints_answer_not_modified(client, async_client, headers):
+    article = create_article(client, headers, "Milk", 1.19)
+
+    response = async_client.get(f"/api/articles/{article['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    response = async_client.get(f"/api/articles/{article['id']}", headers=dict(headers, **{
+        "If-None-Match": response.headers["ETag"]
+    }))
+    assert response.status_code == 304
+
+
+def test_async_endpoints_require_authentication(async_client):
+    assert async_client.get("/api/articles/").status_code == 401
@@ -0,0 +1,45 @@
+import importlib
+import pytest
+from app.lib.LRUCache import LRUCache
+from tests.utils import QueryCounter
+
+auth = importlib.import_module("app.lib.get_current_user")
+
+
+@pytest.fixture
+def cached_auth(monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_CACHE_TTL", 60)
+    monkeypatch.setattr(auth, "principals", LRUCache(16, 60))
+
+
+def test_cached_principal_skips_user_query(client, headers, cached_auth):
+    client.get("/api/stores/", headers=headers)
+    with QueryCounter() as queries:
+        assert client.get("/api/stores/", headers=headers).status_code == 200
+    assert queries.count == 1
+
+
+def test_logout_revokes_issued_tokens(client, headers, cached_auth):
+    assert client.get("/api/stores/", headers=headers).status_code == 200
+    assert client.post("/api/logout", headers=headers).status_code == 204
+
+    assert client.get("/api/stores/", headers=headers).status_code == 401
+
+
+def test_token_of_older_version_is_rejected(client, headers, username, cached_auth):
+    from app.db import SessionLocal
+    from app.db.models import User
+
+    db = SessionLocal()
+    User.get(username, db).revoke_tokens()
+    db.commit()
+    db.close()
+    auth.invalidate_user(username)
+
+    assert client.get("/api/stores/", headers=headers).status_code == 401
+
+
+def test_invalid_token_is_rejected(client):
+    assert client.get("/api/stores/", headers={
+        "Authorization": "Bearer garbage"
+    }).status_code == 401
@@ -0,0 +1,77 @@
+from datetime import datetime
+import json
+from tests.utils import create_article, names
+
+
+def article(name, price=1.0, **fields):
+    return dict(dict(name=name, detail="", price=dict(price=price, currency="EUR")), **fields)
+
+
+def test_bulk_creates_articles_with_their_prices(client, headers):
+    rows = [article("Milk", 1.19, store="Aldi", category="Dairy"), article("Bread", 2.5, store="Lidl", brand="Harry"), article("Cheese", 3.99)]
+    response = client.post("/api/articles/bulk", json=rows, headers=headers)
+    assert response.status_code == 201, response.text
+    result = response.json()
+    assert result["errors"] == []
+
+    for id, row in zip(result["ids"], rows):
+        created = client.get(f"/api/articles/{id}", headers=headers).json()
+        assert created["name"] == row["name"]
+        assert created["store"] == row.get("store", "")
+        assert created["brand"] == row.get("brand", "")
+        assert created["price"]["price"] == row["price"]["price"]
+        # MySQL DATETIME columns keep whole seconds
+        assert datetime.fromisoformat(created["created_at"]).microsecond == 0
+
+
+def test_bulk_skips_invalid_and_duplicate_rows(client, headers):
+    create_article(client, headers, "Milk", store="Aldi")
+    rows = [article("milk", store="ALDI"), article("Milk", store="Lidl"), dict(name="No price"), article("Milk", store="lidl"), article("")]
+    response = client.post("/api/articles/bulk", json=rows, headers=headers)
+    assert response.status_code == 201, response.text
+    result = response.json()
+
+    assert len(result["ids"]) == 1
+    assert [error["index"] for error in result["errors"]] == [0, 2, 3, 4]
+    response = client.get("/api/articles/", params=dict(sort_by="name"), headers=headers)
+    assert names(response.json(), "store") == ["Aldi", "Lidl"]
+
+
+def test_bulk_reports_rows_with_invalid_categories(client, headers):
+    rows = [article("Milk"), article("Bread", category="uncategorized"), article("Cheese", category="x" * 300), article("Eggs", category="Dairy")]
+    response = client.post("/api/articles/bulk", json=rows, headers=headers)
+    assert response.status_code == 201, response.text
+    result = response.json()
+
+    assert len(result["ids"]) == 2
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    response = client.get("/api/articles/", params=dict(sort_by="name"), headers=headers)
+    assert names(response.json()) == ["Eggs", "Milk"]
+
+
+def test_bulk_maps_ids_across_batches(client, headers, monkeypatch):
+    from app.db.models import Article
+    bulk_create = Article.bulk_create
+    monkeypatch.setattr(Article, "bulk_create", staticmethod(lambda rows, user, db: bulk_create(rows, user, db, batch_size=2)))
+
+    rows = [article(f"Article {index}", index + 1, store=["Aldi", "Lidl", None][index % 3]) for index in range(7)]
+    response = client.post("/api/articles/bulk", json=rows, headers=headers)
+    assert response.status_code == 201, response.text
+
+    for index, id in enumerate(response.json()["ids"]):
+        created = client.get(f"/api/articles/{id}", headers=headers).json()
+        assert (created["name"], created["price"]["price"]) == (f"Article {index}", index + 1)
+
+
+def test_bulk_reads_ndjson(client, headers):
+    body = "\n".join(json.dumps(article(name)) for name in ("Milk", "Bread")) + "\n"
+    response = client.post("/api/articles/bulk", data=body, headers=dict(headers, **{
+        "Content-Type": "application/x-ndjson"
+    }))
+    assert response.status_code == 201, response.text
+    assert len(response.json()["ids"]) == 2
+
+    response = client.post("/api/articles/bulk", data="{", headers=dict(headers, **{
+        "Content-Type": "application/x-ndjson"
+    }))
+    assert response.status_code == 400
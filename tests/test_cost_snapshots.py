@@ -0,0 +1,73 @@
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+from app.db import SessionLocal
+from app.db.models import ListCost, ShoppingList
+from tests.utils import add_item, create_article, create_list
+
+
+def snapshot(list_id):
+    db = SessionLocal()
+    try:
+        shopping_list = db.get(ShoppingList, list_id)
+        return shopping_list.areCostsUpToDate(), {
+            cost.category: cost.cost
+            for cost in shopping_list.costs
+        }
+    finally:
+        db.close()
+
+
+def test_item_changes_persist_up_to_date_snapshots(client, headers):
+    shopping_list = create_list(client, headers, "Weekly")
+    assert snapshot(shopping_list["id"]) == (True, {
+        "uncategorized": 0,
+        "total": 0
+    })
+
+    milk = create_article(client, headers, "Milk", price=1.5, category="Dairy")
+    item = add_item(client, headers, shopping_list["id"], milk["id"], amount=2)
+    assert snapshot(shopping_list["id"]) == (True, {
+        "Dairy": 3.0,
+        "uncategorized": 0,
+        "total": 3.0
+    })
+
+    response = client.put(f"/api/lists/{shopping_list['id']}/items/", json=dict(id=item["id"], amount=3), headers=headers)
+    assert response.status_code == 200
+    assert snapshot(shopping_list["id"]) == (True, {
+        "Dairy": 4.5,
+        "uncategorized": 0,
+        "total": 4.5
+    })
+
+
+def test_category_change_drops_snapshots(client, headers):
+    shopping_list = create_list(client, headers, "Weekly")
+    bread = create_article(client, headers, "Bread", price=2.0)
+    add_item(client, headers, shopping_list["id"], bread["id"])
+
+    assert client.put("/api/articles/", json=dict(id=bread["id"], category="Bakery"), headers=headers).status_code == 200
+    assert snapshot(shopping_list["id"]) == (False, {})
+    assert client.get(f"/api/lists/{shopping_list['id']}/costs", headers=headers).json() == {
+        "Bakery": 2.0,
+        "uncategorized": 0,
+        "total": 2.0
+    }
+
+
+def test_categories_are_keyed_exactly(client, headers):
+    shopping_list = create_list(client, headers, "Weekly")
+    for index, category in enumerate(("Total", "Uncategorized", "Café", "Cafe")):
+        article = create_article(client, headers, f"Article {index}", price=1.0, category=category)
+        add_item(client, headers, shopping_list["id"], article["id"])
+
+    assert snapshot(shopping_list["id"]) == (True, {
+        "Total": 1.0,
+        "Uncategorized": 1.0,
+        "Café": 1.0,
+        "Cafe": 1.0,
+        "uncategorized": 0,
+        "total": 4.0
+    })
+    # MySQL compares keys case and accent insensitively unless told otherwise
+    assert "COLLATE utf8mb4_bin" in str(CreateTable(ListCost.__table__).compile(dialect=mysql.dialect()))
@@ -0,0 +1,27 @@
+from app.db import SessionLocal
+from app.db.models import Article
+from tests.utils import create_article
+
+
+def test_current_price_follows_updates(client, headers):
+    article = create_article(client, headers, "Milk", price=1.09)
+    assert article["price"]["price"] == 1.09
+
+    for price in (1.19, 0.99):
+        response = client.put("/api/articles/", json=dict(id=article["id"], price=dict(price=price, currency="EUR")), headers=headers)
+        assert response.status_code == 200
+        assert response.json()["price"]["price"] == price
+
+    db = SessionLocal()
+    stored = db.get(Article, article["id"])
+    assert stored.current_price.price == 0.99
+    assert stored.current_price == max(stored.prices, key=lambda price: (price.created_at, price.id))
+    db.close()
+    assert client.get(f"/api/articles/{article['id']}/price", headers=headers).json()["price"] == 0.99
+
+
+def test_unchanged_price_adds_no_history(client, headers):
+    article = create_article(client, headers, "Bread", price=2.5)
+    client.put("/api/articles/", json=dict(id=article["id"], price=dict(price=2.5, currency="EUR")), headers=headers)
+
+    assert [price["price"] for price in client.get(f"/api/articles/{article['id']}/prices", headers=headers).json()] == [2.5]
@@ -0,0 +1,70 @@
+from app.db import SessionLocal
+from app.db.models import Article
+from app.lib.pagination import CURSOR_HEADER
+from tests.utils import add_item, create_article, create_list, names
+
+
+def walk(client, headers, url, limit=2):
+    """
+    Names of all rows of <url> fetched page by page with the cursor of the previous page.
+    """
+    rows = []
+    response = client.get(f"{url}&limit={limit}", headers=headers)
+    while True:
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        cursor = response.headers.get(CURSOR_HEADER)
+        if cursor is None:
+            return rows
+        response = client.get(f"{url}&limit={limit}&after={cursor}", headers=headers)
+
+
+def test_cursors_visit_every_row_once(client, headers):
+    for index, store in enumerate(["Aldi", "Lidl", None, "Aldi", None]):
+        create_article(client, headers, f"Article {index}", price=5 - index, **(dict(store=store) if store else {}))
+
+    for sort_by in ("name", "price", "store", "updated_at"):
+        for asc in (0, 1):
+            listed = names(client.get(f"/api/articles/?sort_by={sort_by}&asc={asc}&limit=100", headers=headers).json())
+            assert names(walk(client, headers, f"/api/articles/?sort_by={sort_by}&asc={asc}")) == listed
+            assert sorted(listed) == [f"Article {index}" for index in range(5)]
+
+
+def test_cursor_is_rejected_for_another_sort(client, headers):
+    for index in range(3):
+        create_article(client, headers, f"Article {index}")
+    cursor = client.get("/api/articles/?sort_by=name&limit=1", headers=headers).headers[CURSOR_HEADER]
+
+    assert client.get(f"/api/articles/?sort_by=name&limit=1&after={cursor}", headers=headers).status_code == 200
+    for query in ("sort_by=updated_at", "sort_by=name&asc=0", "sort_by=price"):
+        response = client.get(f"/api/articles/?{query}&limit=1&after={cursor}", headers=headers)
+        assert response.status_code == 400, query
+    assert client.get("/api/articles/?after=garbage", headers=headers).status_code == 400
+
+
+def test_articles_without_price_are_sorted_last(client, headers):
+    unpriced = create_article(client, headers, "Unpriced", price=1)
+    for index in range(3):
+        create_article(client, headers, f"Priced {index}", price=index + 2)
+    db = SessionLocal()
+    db.query(Article).filter(Article.id == unpriced["id"]).update(dict(current_price_id=None))
+    db.commit()
+    db.close()
+
+    ascending = names(walk(client, headers, "/api/articles/?sort_by=price&asc=1"))
+    assert ascending == ["Priced 0", "Priced 1", "Priced 2", "Unpriced"]
+    assert names(walk(client, headers, "/api/articles/?sort_by=price&asc=0")) == ascending[::-1]
+
+
+def test_cursors_page_lists_and_items(client, headers):
+    shopping_list = create_list(client, headers, "Weekly")
+    for index in range(5):
+        create_list(client, headers, f"List {index}")
+        add_item(client, headers, shopping_list["id"], create_article(client, headers, f"Article {index}")["id"], amount=index + 1)
+
+    for sort_by in ("title", "cost", "updated_at"):
+        listed = names(client.get(f"/api/lists/?sort_by={sort_by}&limit=100", headers=headers).json(), "id")
+        assert names(walk(client, headers, f"/api/lists/?sort_by={sort_by}"), "id") == listed
+    for sort_by in ("name", "cost", "amount", "store"):
+        url = f"/api/lists/{shopping_list['id']}/items/?sort_by={sort_by}"
+        assert names(walk(client, headers, url), "id") == names(client.get(f"{url}&limit=100", headers=headers).json(), "id")
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+import pytest
+from app.db import SessionLocal
+from app.db.models import Store, User
+from app.lib import Catalog
+from app.lib.LRUCache import LRUCache
+from app.routers.articles import DUPLICATE_CATALOG_ENTRY
+from tests.utils import create_article
+
+
+@pytest.fixture(autouse=True)
+def catalogs(monkeypatch):
+    monkeypatch.setattr(Catalog, "cache", LRUCache(16, 60))
+
+
+def create_store_elsewhere(username, name, created_at):
+    """
+    Creates a store like another process would, whose catalogs this process doesn't drop, and leaves a stale catalog cached.
+    """
+    db = SessionLocal()
+    store = Store.create(User.get(username, db))
+    store.set_name(name)
+    store.created_at = created_at
+    db.add(store)
+    db.commit()
+    db.close()
+    Catalog.cache.set(Catalog.key(Store, username), Catalog([]))
+
+
+def post_article(client, headers, store):
+    return client.post("/api/articles/", json=dict(name="Milk", detail="", store=store, price=dict(price=1, currency="EUR")), headers=headers)
+
+
+def test_names_taken_before_are_reported_as_duplicates(client, headers, username):
+    create_store_elsewhere(username, "Aldi", datetime.utcnow() - timedelta(minutes=1))
+
+    response = post_article(client, headers, "ALDI")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Store ALDI already exists"
+    # the stale catalog was dropped
+    assert post_article(client, headers, "ALDI").json()["store"] == "Aldi"
+
+
+def test_names_taken_meanwhile_are_reported_as_concurrent(client, headers, username):
+    create_store_elsewhere(username, "Aldi", datetime.utcnow() + timedelta(minutes=1))
+
+    response = post_article(client, headers, "Aldi")
+    assert response.status_code == 400
+    assert response.json()["detail"] == DUPLICATE_CATALOG_ENTRY
+
+
+def test_user_names_are_unique(client, headers, username):
+    response = client.post("/api/users", json=dict(username=username, first_name="Test", last_name="User", password="password"))
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"User name {username} is already used"
+
+
+def test_duplicate_articles_are_rejected_per_store(client, headers):
+    create_article(client, headers, "Milk", store="Aldi")
+
+    assert post_article(client, headers, "aldi").status_code == 400
+    assert post_article(client, headers, "Lidl").status_code == 201
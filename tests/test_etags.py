@@ -0,0 +1,73 @@
+import pytest
+from tests.utils import QueryCounter, add_item, create_article, create_list
+
+PATHS = ["/api/lists/{list}", "/api/lists/{list}/costs", "/api/lists/{list}/markdown", "/api/lists/{list}/export", "/api/lists/{list}/items/",
+         "/api/articles/{article}", "/api/articles/{article}/prices", "/api/articles/{article}/price"]   #yapf:disable
+
+
+@pytest.fixture
+def paths(client, headers):
+    article = create_article(client, headers, "Milk", 1.19, store="Aldi")
+    shopping_list = create_list(client, headers, "Weekly")
+    item = add_item(client, headers, shopping_list["id"], article["id"], 2)
+    return dict(article=article["id"], list=shopping_list["id"], item=item["id"])
+
+
+def get(client, headers, path, etag=None):
+    return client.get(path, headers=dict(headers, **({
+        "If-None-Match": etag
+    } if etag else {})))
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_unchanged_data_is_not_sent_again(client, headers, paths, path):
+    path = path.format(**paths)
+    response = get(client, headers, path)
+    assert response.status_code == 200, response.text
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    with QueryCounter() as queries:
+        unchanged = get(client, headers, path, response.headers["ETag"])
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == response.headers["ETag"]
+    # user and version lookup
+    assert queries.count == 2
+    assert get(client, headers, path, f'"other", {response.headers["ETag"]}').status_code == 304
+    assert get(client, headers, path, '"other"').status_code == 200
+
+
+@pytest.mark.parametrize("path", PATHS[:5])
+def test_changing_items_or_articles_changes_list_etags(client, headers, paths, path):
+    path = path.format(**paths)
+    etag = get(client, headers, path).headers["ETag"]
+
+    response = client.put(f"/api/lists/{paths['list']}/items/", json=dict(id=paths["item"], amount=3), headers=headers)
+    assert response.status_code == 200, response.text
+    response = get(client, headers, path, etag)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.put("/api/articles/", json=dict(id=paths["article"], name="Whole milk"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert get(client, headers, path, etag).status_code == 200
+
+
+@pytest.mark.parametrize("path", PATHS[5:])
+def test_changing_prices_changes_article_etags(client, headers, paths, path):
+    path = path.format(**paths)
+    etag = get(client, headers, path).headers["ETag"]
+
+    response = client.put("/api/articles/", json=dict(id=paths["article"], price=dict(price=1.29, currency="EUR")), headers=headers)
+    assert response.status_code == 200, response.text
+    assert get(client, headers, path, etag).status_code == 200
+
+
+def test_etags_depend_on_the_query_and_the_user(client, headers, other_headers, paths):
+    path = f"/api/lists/{paths['list']}/export"
+    etag = get(client, headers, path).headers["ETag"]
+
+    assert client.get(path, params=dict(format="html"), headers=dict(headers, **{
+        "If-None-Match": etag
+    })).status_code == 200
+    assert get(client, other_headers, path, etag).status_code == 404
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from tests.utils import add_item, create_article, create_list
+
+
+def lines(response):
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_articles_are_exported_with_their_price_history(client, headers, other_headers):
+    milk = create_article(client, headers, "Milk", 1.19, store="Aldi")
+    response = client.put("/api/articles/", json=dict(id=milk["id"], price=dict(price=1.29, currency="EUR")), headers=headers)
+    assert response.status_code == 200, response.text
+    create_article(client, headers, "Bread", 2.5)
+    create_article(client, other_headers, "Cheese", 3.99)
+
+    response = client.get("/api/export/articles", headers=headers)
+    assert response.headers["Content-Disposition"] == 'attachment; filename="articles.ndjson"'
+    articles = lines(response)
+    assert [(article["name"], article["store"]) for article in articles] == [("Milk", "Aldi"), ("Bread", None)]
+    assert [price["price"] for price in articles[0]["prices"]] == [1.19, 1.29]
+    assert [price["price"] for price in articles[1]["prices"]] == [2.5]
+
+
+def test_articles_are_exported_as_csv(client, headers):
+    milk = create_article(client, headers, "Milk", 1.19)
+    client.put("/api/articles/", json=dict(id=milk["id"], price=dict(price=1.29, currency="EUR")), headers=headers)
+
+    response = client.get("/api/export/articles", params=dict(format="csv"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["Content-Type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["name"], float(row["price"])) for row in rows] == [("Milk", 1.19), ("Milk", 1.29)]
+
+
+def test_lists_are_exported_with_their_items(client, headers):
+    milk = create_article(client, headers, "Milk")
+    bread = create_article(client, headers, "Bread")
+    weekly = create_list(client, headers, "Weekly")
+    add_item(client, headers, weekly["id"], milk["id"], 2)
+    add_item(client, headers, weekly["id"], bread["id"], 1)
+    create_list(client, headers, "Empty")
+
+    lists = lines(client.get("/api/export/lists", headers=headers))
+    assert [shopping_list["title"] for shopping_list in lists] == ["Weekly", "Empty"]
+    assert [(item["article"], item["amount"]) for item in lists[0]["items"]] == [("Milk", 2), ("Bread", 1)]
+    assert lists[1]["items"] == []
+
+    response = client.get("/api/export/lists", params=dict(format="csv"), headers=headers)
+    assert [row["article"] for row in csv.DictReader(io.StringIO(response.text))] == ["Milk", "Bread", ""]
@@ -0,0 +1,52 @@
+from tests.utils import add_item, create_article, create_list
+
+
+def items(client, headers, list_id):
+    response = client.get(f"/api/lists/{list_id}/items/", headers=headers)
+    assert response.status_code == 200, response.text
+    return sorted((item["article_id"], item["amount"]) for item in response.json())
+
+
+def test_batch_creates_updates_and_deletes_items(client, headers):
+    milk, bread, cheese = (create_article(client, headers, name)["id"] for name in ("Milk", "Bread", "Cheese"))
+    shopping_list = create_list(client, headers, "Weekly")
+    kept = add_item(client, headers, shopping_list["id"], milk, 1)
+    deleted = add_item(client, headers, shopping_list["id"], bread, 1)
+
+    batch = dict(create=[dict(article_id=cheese, amount=2), dict(article_id=bread, amount=3)], update=[dict(id=kept["id"], amount=4)],
+                 delete=[deleted["id"]])   #yapf:disable
+    response = client.post(f"/api/lists/{shopping_list['id']}/items/batch", json=batch, headers=headers)
+    assert response.status_code == 201, response.text
+    assert [item["amount"] for item in response.json()] == [4, 2, 3]
+    assert items(client, headers, shopping_list["id"]) == sorted([(milk, 4), (bread, 3), (cheese, 2)])
+
+    response = client.post(f"/api/lists/{shopping_list['id']}/items/batch", json=dict(delete=[kept["id"]]), headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+    assert items(client, headers, shopping_list["id"]) == sorted([(bread, 3), (cheese, 2)])
+
+
+def test_batch_changes_nothing_if_any_change_fails(client, headers):
+    milk, bread = (create_article(client, headers, name)["id"] for name in ("Milk", "Bread"))
+    shopping_list = create_list(client, headers, "Weekly")
+    item = add_item(client, headers, shopping_list["id"], milk, 1)
+    path = f"/api/lists/{shopping_list['id']}/items/batch"
+
+    response = client.post(path, json=dict(create=[dict(article_id=bread, amount=1)], delete=[item["id"] + 1000]), headers=headers)
+    assert response.status_code == 404
+    response = client.post(path, json=dict(create=[dict(article_id=milk, amount=1)], update=[dict(id=item["id"], amount=2)]), headers=headers)
+    assert response.status_code == 400
+    response = client.post(path, json=dict(create=[dict(article_id=bread, amount=-1)], delete=[item["id"]]), headers=headers)
+    assert response.status_code == 400
+
+    assert items(client, headers, shopping_list["id"]) == [(milk, 1)]
+
+
+def test_batch_rejects_finalized_lists(client, headers):
+    milk = create_article(client, headers, "Milk")["id"]
+    shopping_list = create_list(client, headers, "Weekly")
+    response = client.put("/api/lists/", json=dict(id=shopping_list["id"], finalized=True), headers=headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post(f"/api/lists/{shopping_list['id']}/items/batch", json=dict(create=[dict(article_id=milk, amount=1)]), headers=headers)
+    assert response.status_code == 400
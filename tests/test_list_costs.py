@@ -0,0 +1,35 @@
+from tests.utils import QueryCounter, add_item, create_article, create_list
+
+
+def fill_list(client, headers, title, items):
+    shopping_list = create_list(client, headers, title)
+    for name, price, amount, category in items:
+        article = create_article(client, headers, name, price=price, **(dict(category=category) if category else {}))
+        add_item(client, headers, shopping_list["id"], article["id"], amount=amount)
+    return shopping_list
+
+
+def test_costs_are_summed_by_category(client, headers):
+    shopping_list = fill_list(client, headers, "Weekly", [("Milk", 1.5, 2, "Dairy"), ("Cheese", 4.0, 1, "Dairy"), ("Bread", 2.5, 1, None)])
+
+    response = client.get(f"/api/lists/{shopping_list['id']}/costs", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "Dairy": 7.0,
+        "uncategorized": 2.5,
+        "total": 9.5
+    }
+
+
+def test_cost_queries_do_not_grow_with_items(client, headers):
+    small = fill_list(client, headers, "Small", [(f"Small {index}", 1.0, 1, f"Category {index}") for index in range(2)])
+    large = fill_list(client, headers, "Large", [(f"Large {index}", 1.0, 1, f"Category {index}") for index in range(12)])
+
+    counts = []
+    for shopping_list in (small, large):
+        with QueryCounter() as queries:
+            response = client.get(f"/api/lists/{shopping_list['id']}/costs", headers=headers)
+        assert response.status_code == 200
+        counts.append(queries.count)
+    assert counts[0] == counts[1]
+    assert client.get(f"/api/lists/{large['id']}/costs", headers=headers).json()["total"] == 12.0
@@ -0,0 +1,62 @@
+import pytest
+from app.lib import list_export
+from app.lib.LRUCache import LRUCache
+from tests.utils import add_item, create_article, create_list
+
+
+@pytest.fixture
+def documents(monkeypatch):
+    documents = LRUCache(16, 60)
+    monkeypatch.setattr(list_export, "documents", documents)
+    return documents
+
+
+def export(client, headers, list_id, format):
+    response = client.get(f"/api/lists/{list_id}/export", params=dict(format=format), headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_lists_are_rendered_by_store(client, headers, documents):
+    milk = create_article(client, headers, "Milk", 1.5, store="Aldi")
+    bread = create_article(client, headers, "Bread & Butter", 2.0)
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], milk["id"], 2)
+    add_item(client, headers, shopping_list["id"], bread["id"], 1)
+
+    markdown = export(client, headers, shopping_list["id"], "markdown")
+    assert markdown.headers["Content-Type"].startswith("text/markdown")
+    assert markdown.text.splitlines() == [
+        "# Weekly", "## Aldi", "* [ ] 2 x Milk", "", "Expected cost: 3.00", f"## {list_export.NO_STORE}", "* [ ] 1 x Bread &amp; Butter", "",
+        "Expected cost: 2.00", "---", "Expected total cost: 5.00"
+    ]
+    assert "[ ] 1 x Bread & Butter" in export(client, headers, shopping_list["id"], "text").text
+    html = export(client, headers, shopping_list["id"], "html").text
+    assert "<h2>Aldi</h2>" in html and "Bread &amp; Butter" in html
+
+
+def test_documents_are_cached_until_the_list_changes(client, headers, documents):
+    milk = create_article(client, headers, "Milk", 1.5)
+    shopping_list = create_list(client, headers, "Weekly")
+    item = add_item(client, headers, shopping_list["id"], milk["id"], 2)
+
+    export(client, headers, shopping_list["id"], "markdown")
+    export(client, headers, shopping_list["id"], "markdown")
+    assert (documents.misses, documents.hits) == (1, 1)
+
+    response = client.put(f"/api/lists/{shopping_list['id']}/items/", json=dict(id=item["id"], amount=3), headers=headers)
+    assert response.status_code == 200, response.text
+    assert "3 x Milk" in export(client, headers, shopping_list["id"], "markdown").text
+
+
+def test_documents_expire(client, headers, monkeypatch):
+    documents = LRUCache(16, 0)
+    monkeypatch.setattr(list_export, "documents", documents)
+    milk = create_article(client, headers, "Milk", 1.5)
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], milk["id"], 2)
+
+    export(client, headers, shopping_list["id"], "markdown")
+    export(client, headers, shopping_list["id"], "markdown")
+    assert (documents.misses, documents.hits) == (2, 0)
+    assert len(documents) == 1
@@ -0,0 +1,126 @@
+import sys
+from sqlalchemy.dialects import mysql
+from app.db import SessionLocal, fulltext
+from app.db.models import Article, ShoppingList, Store, User
+from app.lib import SearchIndex
+from tests.utils import add_item, create_article, create_list, names
+
+
+def test_search_index_ranks_prefixes_then_word_starts_then_substrings():
+    index = SearchIndex([(1, "Buttermilk"), (2, "Milk chocolate"), (3, "Whole Milk"), (4, "Milk"), (5, "Bread")])
+
+    assert index.search("MILK") == [4, 2, 3, 1]
+    assert index.search("milk", limit=2) == [4, 2]
+    # queries shorter than a trigram check every name
+    assert index.search("b") == [5, 1]
+
+    index.add(5, "Milkbread")
+    index.remove(4)
+    assert index.search("milk") == [5, 2, 3, 1]
+    assert index.search("bread") == [5]
+
+
+def test_name_filters_rank_matches_by_relevance(client, headers, other_headers):
+    for name in ("Buttermilk", "Whole Milk", "Milk chocolate", "Bread", "50% off", "50 percent"):
+        create_article(client, headers, name)
+    create_article(client, other_headers, "Milk")
+
+    def filtered(name, **params):
+        response = client.get("/api/articles/", params=dict(name=name, **params), headers=headers)
+        assert response.status_code == 200, response.text
+        return names(response.json())
+
+    assert filtered("MILK") == ["Milk chocolate", "Whole Milk", "Buttermilk"]
+    assert filtered("milk", asc=0) == ["Buttermilk", "Whole Milk", "Milk chocolate"]
+    assert filtered("milk", sort_by="name") == ["Buttermilk", "Milk chocolate", "Whole Milk"]
+    assert filtered("50%") == ["50% off"]
+    assert filtered("_") == []
+
+    response = client.get("/api/articles/", params=dict(sort_by="relevance"), headers=headers)
+    assert response.status_code == 400
+
+
+def test_ranked_pages_follow_cursors(client, headers):
+    for name in ("Milk", "Milk chocolate", "Whole Milk", "Buttermilk", "Bread"):
+        create_article(client, headers, name)
+
+    response = client.get("/api/articles/", params=dict(name="milk", limit=2), headers=headers)
+    assert names(response.json()) == ["Milk", "Milk chocolate"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/articles/", params=dict(name="milk", limit=2, after=cursor), headers=headers)
+    assert names(response.json()) == ["Whole Milk", "Buttermilk"]
+    assert "X-Next-Cursor" not in response.headers
+    assert names(client.get("/api/articles/", params=dict(name="milk", limit=2, page=2), headers=headers).json()) == ["Whole Milk", "Buttermilk"]
+
+    # cursors are bound to the sort order they were issued for
+    response = client.get("/api/articles/", params=dict(name="milk", limit=2, after=cursor, sort_by="name"), headers=headers)
+    assert response.status_code == 400
+
+
+def test_index_follows_renames_and_deletes(client, headers):
+    bread = create_article(client, headers, "Bread")
+    milk = create_article(client, headers, "Milk")
+    assert names(client.get("/api/articles/", params=dict(name="milk"), headers=headers).json()) == ["Milk"]
+
+    response = client.put("/api/articles/", json=dict(id=bread["id"], name="Milk bread"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert client.delete(f"/api/articles/{milk['id']}", headers=headers).status_code == 204
+
+    assert names(client.get("/api/articles/", params=dict(name="milk"), headers=headers).json()) == ["Milk bread"]
+    assert names(client.get("/api/articles/", params=dict(name="bread"), headers=headers).json()) == ["Milk bread"]
+
+
+def test_list_and_item_filters_are_ranked(client, headers):
+    create_list(client, headers, "Weekly milk")
+    create_list(client, headers, "Milk run")
+    create_list(client, headers, "Party")
+    response = client.get("/api/lists/", params=dict(title="milk"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert names(response.json(), "title") == ["Milk run", "Weekly milk"]
+
+    shopping_list = create_list(client, headers, "Groceries")
+    whole_milk, _, milk = (create_article(client, headers, name) for name in ("Whole Milk", "Bread", "Milk"))
+    for article in (whole_milk, milk):
+        add_item(client, headers, shopping_list["id"], article["id"])
+    response = client.get(f"/api/lists/{shopping_list['id']}/items/", params=dict(name="milk"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert names(response.json(), "article_id") == [milk["id"], whole_milk["id"]]
+
+
+def test_find_and_filter_items_rank_by_the_index(client, headers, username):
+    milk, chocolate, _ = (create_article(client, headers, name, store=name.split()[-1]) for name in ("Whole Milk", "Milk chocolate", "Bread"))
+    shopping_list = create_list(client, headers, "Weekly milk")
+    create_list(client, headers, "Party")
+    add_item(client, headers, shopping_list["id"], milk["id"])
+    add_item(client, headers, shopping_list["id"], chocolate["id"])
+
+    db = SessionLocal()
+    try:
+        user = User.get(username, db)
+        assert [article.name for article in Article.find("milk", user)] == ["Milk chocolate", "Whole Milk"]
+        assert [store.name for store in Store.find("MILK", user)] == ["Milk"]
+        assert [shopping_list.title for shopping_list in ShoppingList.find("milk", user)] == ["Weekly milk"]
+        items = ShoppingList.get(shopping_list["id"], user, db).filter_items("milk")
+        assert [item.article_id for item in items] == [chocolate["id"], milk["id"]]
+    finally:
+        db.close()
+
+
+def test_filters_query_the_database_without_cached_indexes(client, headers, username, monkeypatch):
+    monkeypatch.setattr(sys.modules["app.lib.SearchIndex"], "SEARCH_INDEX_TTL", 0)
+    for name in ("Buttermilk", "Whole Milk", "Bread"):
+        create_article(client, headers, name)
+
+    response = client.get("/api/articles/", params=dict(name="milk"), headers=headers)
+    assert names(response.json()) == ["Whole Milk", "Buttermilk"]
+    assert SearchIndex.cache.peek(SearchIndex.key(Article, username)) is None
+
+
+def test_fulltext_narrows_down_filters(monkeypatch):
+    monkeypatch.setattr(fulltext, "SEARCH_FULLTEXT", True)
+
+    clause = str(fulltext.contains(Article.name, "whole milk").compile(dialect=mysql.dialect(), compile_kwargs=dict(literal_binds=True)))
+    assert "MATCH (`Article`.name) AGAINST ('+\"whole\" +\"milk\"' IN BOOLEAN MODE)" in clause
+    # words shorter than the ngram size are not indexed
+    assert "MATCH" not in str(fulltext.contains(Article.name, "a").compile(dialect=mysql.dialect()))
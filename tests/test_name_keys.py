@@ -0,0 +1,70 @@
+import os
+import tempfile
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from app.db import BASE_DIR
+from tests.utils import create_article, names
+
+
+def test_store_names_differing_in_case_are_the_same_store(client, headers):
+    create_article(client, headers, "Coffee", store="Café")
+    create_article(client, headers, "Tea", store="CAFÉ")
+
+    response = client.get("/api/stores/", headers=headers)
+    assert response.status_code == 200, response.text
+    assert names(response.json()) == ["Café"]
+
+
+def test_store_names_differing_in_accents_are_different_stores(client, headers):
+    create_article(client, headers, "Coffee", store="Café")
+    create_article(client, headers, "Tea", store="Cafe")
+
+    response = client.get("/api/stores/", params=dict(sort_by="name"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert sorted(names(response.json())) == ["Cafe", "Café"]
+
+
+def test_article_names_differing_in_case_are_duplicates(client, headers):
+    create_article(client, headers, "Äpfel", store="Aldi")
+
+    response = client.post("/api/articles/", json=dict(name="äPFEL", detail="", store="aldi", price=dict(price=1, currency="EUR")), headers=headers)
+    assert response.status_code == 400, response.text
+    create_article(client, headers, "Apfel", store="Aldi")
+    create_article(client, headers, "äpfel", store="Lidl")
+
+
+def test_name_keys_are_filled_by_the_migration():
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'migration.db')}"
+    engine = create_engine(url)
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0004")
+        for id, name in enumerate(["Straße", "STRASSE", "Café"], start=1):
+            connection.execute(text("INSERT INTO Store (id, name, username) VALUES (:id, :name, 'user')"), dict(id=id, name=name))
+        command.upgrade(config, "head")
+        rows = connection.execute(text("SELECT name, name_key FROM Store ORDER BY id")).fetchall()
+
+    assert [tuple(row) for row in rows] == [("Straße", "strasse"), ("STRASSE (2)", "strasse (2)"), ("Café", "café")]
+
+
+def test_names_are_cleaned_before_the_name_columns_are_constrained():
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'migration.db')}"
+    engine = create_engine(url)
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0002")
+        # equal by the NOCASE collation of revision 0003, like "Cafe" and "Café" are by MySQL's utf8mb4_unicode_ci
+        for id, name in enumerate(["Milk", "MILK", "x" * 300, "milk", "Bread"], start=1):
+            connection.execute(text("INSERT INTO Category (id, name, username) VALUES (:id, :name, 'user')"), dict(id=id, name=name))
+        connection.execute(text("INSERT INTO Category (id, name, username) VALUES (6, 'milk', 'other')"))
+        command.upgrade(config, "0003")
+        rows = connection.execute(text("SELECT name FROM Category ORDER BY id")).fetchall()
+
+    assert [row[0] for row in rows] == ["Milk", "MILK (2)", "x" * 255, "milk (4)", "Bread", "milk"]
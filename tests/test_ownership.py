@@ -0,0 +1,38 @@
+from app.db import SessionLocal
+from app.db.models import User
+from app.lib import UserRoles
+from tests.utils import QueryCounter, add_item, create_article, create_list
+
+
+def test_rows_of_other_users_are_not_found(client, headers, other_headers):
+    article = create_article(client, headers, "Milk")
+    shopping_list = create_list(client, headers, "Weekly")
+    item = add_item(client, headers, shopping_list["id"], article["id"])
+
+    for path in (f"/api/articles/{article['id']}", f"/api/lists/{shopping_list['id']}", f"/api/lists/{shopping_list['id']}/items/"):
+        assert client.get(path, headers=headers).status_code == 200
+        assert client.get(path, headers=other_headers).status_code == 404, path
+    response = client.put(f"/api/lists/{shopping_list['id']}/items/", json=dict(id=item["id"], amount=5), headers=other_headers)
+    assert response.status_code == 404
+    assert client.delete(f"/api/articles/{article['id']}", headers=other_headers).status_code == 404
+
+
+def test_lookup_is_one_query(client, headers):
+    article = create_article(client, headers, "Bread")
+    for index in range(5):
+        create_article(client, headers, f"Other {index}")
+
+    with QueryCounter() as queries:
+        client.delete(f"/api/articles/{article['id'] + 1000}", headers=headers)
+    # user and article lookup
+    assert queries.count == 2
+
+
+def test_administrators_access_rows_of_all_users(client, headers, other_headers, username):
+    article = create_article(client, other_headers, "Cheese")
+    db = SessionLocal()
+    User.get(username, db).role = UserRoles.ADMIN
+    db.commit()
+    db.close()
+
+    assert client.get(f"/api/articles/{article['id']}", headers=headers).status_code == 200
@@ -0,0 +1,62 @@
+import asyncio
+import hashlib
+import pytest
+from app.db import SessionLocal
+from app.db.models import User
+from app.lib import passwords
+from app.lib.LRUCache import LRUCache
+from app.lib.passwords import hash_password, needs_rehash, verify_password_async
+
+
+@pytest.fixture
+def verified(monkeypatch):
+    cache = LRUCache(16, 300)
+    monkeypatch.setattr(passwords, "verified", cache)
+    return cache
+
+
+def stored_hash(username):
+    db = SessionLocal()
+    try:
+        return User.get(username, db).pw_hash
+    finally:
+        db.close()
+
+
+def login(client, username, password):
+    return client.post("/api/login", data=dict(username=username, password=password))
+
+
+def test_passwords_are_hashed_with_scrypt(client, headers, username):
+    pw_hash = stored_hash(username)
+    assert pw_hash.startswith(f"{passwords.PREFIX}${passwords.SCRYPT_N}$")
+    assert not needs_rehash(pw_hash)
+    assert hash_password("password") != hash_password("password")
+
+    assert login(client, username, "wrong").status_code == 403
+    assert login(client, username, "password").status_code == 200
+
+
+def test_legacy_hashes_are_replaced_on_login(client, headers, username):
+    db = SessionLocal()
+    User.get(username, db).pw_hash = hashlib.sha512(("password" + "salt").encode("UTF-8")).hexdigest()
+    db.commit()
+    db.close()
+
+    assert login(client, username, "wrong").status_code == 403
+    assert needs_rehash(stored_hash(username))
+    assert login(client, username, "password").status_code == 200
+    assert not needs_rehash(stored_hash(username))
+    assert login(client, username, "password").status_code == 200
+
+
+def test_only_successful_verifications_are_cached(verified):
+    pw_hash = hash_password("password")
+
+    assert not asyncio.run(verify_password_async("wrong", pw_hash))
+    assert len(verified) == 0
+    assert asyncio.run(verify_password_async("password", pw_hash))
+    assert asyncio.run(verify_password_async("password", pw_hash))
+    assert (len(verified), verified.hits) == (1, 1)
+    # a cached password doesn't verify against another hash
+    assert not asyncio.run(verify_password_async("password", hash_password("other")))
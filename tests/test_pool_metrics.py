@@ -0,0 +1,52 @@
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+from app.db.pool import MeteredQueuePool, engine_options, pool_metrics
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(os.environ["DATABASE_URL"], poolclass=MeteredQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.1)
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_in_use_and_overflow_are_counted(engine):
+    first = engine.connect()
+    assert pool_metrics(engine.pool)["in_use"] == 1
+    second = engine.connect()
+    metrics = pool_metrics(engine.pool)
+    first.close()
+    second.close()
+
+    assert metrics["in_use"] == 2
+    assert metrics["overflow"] == 1
+    assert metrics["checkouts"] == 2
+    assert metrics["overflow_checkouts"] == 1
+    assert metrics["checkout_ms_max"] >= metrics["checkout_ms_mean"] > 0
+    assert pool_metrics(engine.pool)["in_use"] == 0
+
+
+def test_exhausted_pool_counts_timeouts(engine):
+    connections = [engine.connect(), engine.connect()]
+    with pytest.raises(TimeoutError):
+        engine.connect()
+    for connection in connections:
+        connection.close()
+
+    assert pool_metrics(engine.pool)["timeouts"] == 1
+
+
+def test_only_queue_pools_are_configured_and_metered(engine):
+    assert engine_options("mysql://user@localhost/db")["poolclass"] is MeteredQueuePool
+    assert "poolclass" not in engine_options("sqlite:////tmp/test.db")
+    assert pool_metrics(create_engine("sqlite://").pool) is None
+
+
+def test_metrics_are_reported_to_administrators_only(client, headers, admin_headers):
+    assert client.get("/api/metrics/", headers=headers).status_code == 403
+
+    response = client.get("/api/metrics/", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert {"database_pool", "auth_cache", "catalog_cache", "password_cache"} <= set(response.json())
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from tests.utils import add_item, create_article, create_list
+
+HEADER = "store,name,brand,price,currency,date\n"
+
+
+def import_feed(client, headers, feed):
+    content = feed.encode() if isinstance(feed, str) else feed
+    return client.post("/api/articles/prices", files=dict(file=("feed.csv", content, "text/csv")), headers=headers)
+
+
+def prices(client, headers, article_id):
+    response = client.get(f"/api/articles/{article_id}/prices", headers=headers)
+    assert response.status_code == 200, response.text
+    return [price["price"] for price in response.json()]
+
+
+def test_feed_prices_are_added_to_matching_articles(client, headers):
+    milk = create_article(client, headers, "Milk", 1.19, store="Aldi", brand="Weide")
+    bread = create_article(client, headers, "Bread", 2.5)
+    feed = HEADER + "aldi,MILK,weide,1.29,EUR,2030-01-01T00:00:00\n,Bread,,2.5,EUR,2030-01-01\nLidl,Milk,,1,EUR,\n,Bread,,-1,EUR,\n"
+
+    response = import_feed(client, headers, feed)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["inserted"], result["unchanged"], result["failed"]) == (1, 1, 2)
+    assert [error["line"] for error in result["errors"]] == [4, 5]
+    assert prices(client, headers, milk["id"]) == [1.19, 1.29]
+    assert client.get(f"/api/articles/{milk['id']}", headers=headers).json()["price"]["price"] == 1.29
+    assert prices(client, headers, bread["id"]) == [2.5]
+
+    response = import_feed(client, headers, feed)
+    assert (response.json()["inserted"], response.json()["unchanged"]) == (0, 2)
+
+
+def test_backdated_prices_change_etags_and_costs(client, headers):
+    milk = create_article(client, headers, "Milk", 1.0)
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], milk["id"], 2)
+    listed_at = datetime.fromisoformat(client.get(f"/api/lists/{shopping_list['id']}", headers=headers).json()["updated_at"])
+    created_at = datetime.fromisoformat(client.get(f"/api/articles/{milk['id']}/prices", headers=headers).json()[0]["created_at"])
+    later = (listed_at + timedelta(days=1)).isoformat()
+    assert import_feed(client, headers, HEADER + f",Milk,,3,EUR,{later}\n").json()["inserted"] == 1
+
+    costs = client.get(f"/api/lists/{shopping_list['id']}/costs", headers=headers)
+    assert costs.json()["total"] == 2.0
+    article_prices = client.get(f"/api/articles/{milk['id']}/prices", headers=headers)
+
+    # neither the latest price nor the current one, but valid when the list was last updated
+    backdated = (created_at + (listed_at - created_at) / 2).isoformat()
+    assert import_feed(client, headers, HEADER + f",Milk,,2,EUR,{backdated}\n").json()["inserted"] == 1
+
+    response = client.get(f"/api/articles/{milk['id']}/prices", headers=dict(headers, **{
+        "If-None-Match": article_prices.headers["ETag"]
+    }))
+    assert response.status_code == 200
+    assert [price["price"] for price in response.json()] == [1.0, 2.0, 3.0]
+    response = client.get(f"/api/lists/{shopping_list['id']}/costs", headers=dict(headers, **{
+        "If-None-Match": costs.headers["ETag"]
+    }))
+    assert response.status_code == 200
+    assert response.json()["total"] == 4.0
+
+
+def test_dates_with_time_zones_are_rejected(client, headers):
+    milk = create_article(client, headers, "Milk", 1.0)
+
+    response = import_feed(client, headers, HEADER + ",Milk,,2,EUR,2030-01-01T00:00:00\n,Milk,,3,EUR,2030-01-02T00:00:00+02:00\n")
+    assert response.status_code == 400
+    assert "Line 3" in response.json()["detail"]
+    assert prices(client, headers, milk["id"]) == [1.0]
+
+
+def test_feeds_that_are_no_utf8_are_rejected(client, headers):
+    milk = create_article(client, headers, "Milk", 1.0)
+
+    response = import_feed(client, headers, HEADER.encode() + b",Milk,,2,EUR,\n,M\xe4use,,3,EUR,\n")
+    assert response.status_code == 400
+    assert "Line 3" in response.json()["detail"]
+    assert prices(client, headers, milk["id"]) == [1.0]
+
+    response = import_feed(client, headers, b"\xef\xbb\xbf" + HEADER.encode() + b",Milk,,2,EUR,\n")
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.lib import PriceTimeline
+from tests.utils import create_article
+
+START = datetime(2026, 1, 1)
+
+
+def price(days: int, value: float) -> SimpleNamespace:
+    return SimpleNamespace(created_at=START + timedelta(days=days), price=value)
+
+
+def test_lookup_returns_price_valid_at_time():
+    timeline = PriceTimeline([price(10, 3.0), price(0, 1.0), price(5, 2.0)])
+
+    assert timeline.at(START).price == 1.0
+    assert timeline.at(START + timedelta(days=4, hours=23)).price == 1.0
+    assert timeline.at(START + timedelta(days=5)).price == 2.0
+    assert timeline.at(START + timedelta(days=100)).price == 3.0
+    assert timeline.at().price == 3.0
+    # before the first price the latest one applies
+    assert timeline.at(START - timedelta(days=1)).price == 3.0
+
+
+def test_added_prices_keep_timeline_sorted():
+    timeline = PriceTimeline([price(0, 1.0), price(10, 3.0)])
+    timeline.add(price(5, 2.0))
+
+    assert [entry.price for entry in timeline.prices] == [1.0, 2.0, 3.0]
+    assert timeline.at(START + timedelta(days=7)).price == 2.0
+
+
+def test_empty_timeline_raises_lookup_error():
+    try:
+        PriceTimeline([]).at()
+    except LookupError:
+        pass
+    else:
+        raise AssertionError("expected LookupError")
+
+
+def test_price_endpoint_answers_point_in_time_queries(client, headers):
+    article = create_article(client, headers, "Tea", price=1.0)
+    for value in (2.0, 3.0):
+        client.put("/api/articles/", json=dict(id=article["id"], price=dict(price=value, currency="EUR")), headers=headers)
+    prices = client.get(f"/api/articles/{article['id']}/prices", headers=headers).json()
+    assert [entry["price"] for entry in prices] == [1.0, 2.0, 3.0]
+
+    for entry in prices:
+        response = client.get(f"/api/articles/{article['id']}/price", params=dict(at=entry["created_at"]), headers=headers)
+        assert response.json()["price"] == entry["price"]
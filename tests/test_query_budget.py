@@ -0,0 +1,58 @@
+import pytest
+from tests.utils import QueryCounter, add_item, create_article, create_list
+
+# statements per request, including authentication, whatever the number of rows
+BUDGETS = {
+    "/api/articles/": 2,
+    "/api/articles/{article}": 3,
+    "/api/articles/{article}/prices": 4,
+    "/api/lists/": 3,
+    "/api/lists/{list}": 4,
+    "/api/lists/{list}/items/": 5,
+    "/api/lists/{list}/costs": 4,
+    "/api/stores/": 2,
+    "/api/categories/": 2,
+    "/api/brands/": 2,
+}
+
+
+def fill(client, headers, size, tag):
+    shopping_list = create_list(client, headers, f"List {tag}")
+    articles = []
+    for index in range(size):
+        article = create_article(client, headers, f"{tag} {index}", store=f"Store {index}", category=f"Category {index}", brand=f"Brand {index}")
+        add_item(client, headers, shopping_list["id"], article["id"])
+        create_list(client, headers, f"Other {tag} {index}")
+        articles.append(article)
+    return shopping_list, articles
+
+
+@pytest.mark.parametrize("size", [2, 8])
+def test_read_endpoints_stay_within_budget(client, headers, size):
+    shopping_list, articles = fill(client, headers, size, "Budget")
+    article = articles[-1]
+
+    for path, budget in BUDGETS.items():
+        with QueryCounter() as queries:
+            response = client.get(path.format(list=shopping_list["id"], article=article["id"]), headers=headers)
+        assert response.status_code == 200, path
+        assert queries.count <= budget, f"{path} took {queries.count} queries, budget {budget}"
+
+
+@pytest.mark.parametrize("size", [2, 12])
+def test_items_of_lists_older_than_their_prices_stay_within_budget(client, headers, size):
+    shopping_list, articles = fill(client, headers, size, "History")
+    path = f"/api/lists/{shopping_list['id']}/items/"
+    with QueryCounter() as queries:
+        client.get(path, headers=headers)
+    current = queries.count
+
+    # the items keep the prices valid when their list was last updated, the histories of all of them are loaded by one query
+    for article in articles:
+        client.put("/api/articles/", json=dict(id=article["id"], price=dict(price=9.0, currency="EUR")), headers=headers)
+    with QueryCounter() as queries:
+        items = client.get(path, params=dict(limit=size), headers=headers).json()
+
+    assert queries.count == current + 1
+    assert queries.count <= BUDGETS["/api/lists/{list}/items/"] + 1
+    assert [item["price"]["price"] for item in items] == [1.0] * size
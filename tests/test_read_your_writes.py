@@ -0,0 +1,54 @@
+import os
+import time
+import pytest
+from sqlalchemy import create_engine
+from starlette.requests import Request
+from app.db import engine
+from app.db.routing import RoutingSession
+from app.lib.last_write import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, last_write
+from tests.utils import create_article
+
+
+@pytest.fixture
+def session():
+    replica = create_engine(os.environ["DATABASE_URL"])
+    session = RoutingSession(replicas=[replica], bind=engine)
+    session.info["read_only"] = True
+    yield session
+    session.close()
+    replica.dispose()
+
+
+def test_writes_answer_with_their_time(client, headers):
+    article = create_article(client, headers, "Milk")
+    assert client.get(f"/api/articles/{article['id']}", headers=headers).headers.get(LAST_WRITE_HEADER) is None
+
+    before = time.time()
+    response = client.put("/api/articles/", json=dict(id=article["id"], detail="Whole milk"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert before - 1 <= float(response.headers[LAST_WRITE_HEADER]) <= time.time()
+    assert response.cookies[LAST_WRITE_COOKIE] == response.headers[LAST_WRITE_HEADER]
+
+
+def test_clients_who_wrote_recently_read_from_the_primary(session):
+    assert session.get_bind() is not engine
+
+    session.info["last_write"] = time.time() - 1
+    assert session.get_bind() is engine
+    session.info["last_write"] = time.time() - 3600
+    assert session.get_bind() is not engine
+
+
+def test_last_write_is_read_from_header_or_cookie():
+    def request(**headers):
+        return Request(dict(type="http", headers=[(name.lower().encode(), value.encode()) for name, value in headers.items()]))
+
+    assert last_write(request()) is None
+    assert last_write(request(Cookie=f"{LAST_WRITE_COOKIE}=12.5")) == 12.5
+    assert last_write(request(**{
+        LAST_WRITE_HEADER: "13.5",
+        "Cookie": f"{LAST_WRITE_COOKIE}=12.5"
+    })) == 13.5
+    assert last_write(request(**{
+        LAST_WRITE_HEADER: "yesterday"
+    })) is None
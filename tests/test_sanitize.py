@@ -0,0 +1,32 @@
+import bleach
+import pytest
+from app.lib import sanitize
+from app.lib.sanitize import MAX_CACHED_LENGTH, clean
+from tests.utils import create_article
+
+
+@pytest.mark.parametrize(
+    "text", ["Milk", "Crème brûlée", "Tom & Jerry", "<b>bold</b>", "a < b > c", "&amp;", "line\rbreak", "tab\tand\nnewline", "\x00null",
+             "<script>alert(1)</script>", "x" * (MAX_CACHED_LENGTH + 1) + "<"]
+)   #yapf:disable
+def test_sanitize_equals_bleach(text):
+    assert sanitize(text) == bleach.clean(text, tags=[])
+
+
+def test_plain_texts_are_neither_parsed_nor_cached():
+    before = clean.cache_info()
+    assert sanitize("Plain text without markup") == "Plain text without markup"
+    assert clean.cache_info() == before
+
+
+def test_texts_with_markup_are_cached():
+    sanitize("<i>cached</i> & unique")
+    before = clean.cache_info()
+    assert sanitize("<i>cached</i> & unique") == "&lt;i&gt;cached&lt;/i&gt; &amp; unique"
+    assert clean.cache_info().hits == before.hits + 1
+
+
+def test_names_are_stored_sanitized(client, headers):
+    article = create_article(client, headers, "<b>Milk</b> & Honey", store="A & B")
+    assert article["name"] == "&lt;b&gt;Milk&lt;/b&gt; &amp; Honey"
+    assert article["store"] == "A &amp; B"
@@ -0,0 +1,96 @@
+import pytest
+from app.db import SessionLocal
+from app.db.models import Store, User
+from app.lib import Catalog, session_caches
+from app.lib.LRUCache import LRUCache
+from tests.utils import create_article
+
+
+@pytest.fixture
+def catalogs(monkeypatch):
+    cache = LRUCache(16, 60)
+    monkeypatch.setattr(Catalog, "cache", cache)
+    return cache
+
+
+class Recorder:
+    tables = ("Store", )
+
+    def __init__(self):
+        self.calls = []
+
+    def flushed(self, session, instances, dirty, deleted):
+        self.calls.append(("flushed", [instance.name for instance in instances]))
+
+    def committed(self, session):
+        self.calls.append(("committed", ))
+
+    def rolled_back(self, session):
+        self.calls.append(("rolled_back", ))
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(session_caches, "caches", list(session_caches.caches))
+    monkeypatch.setattr(session_caches, "table_caches", {
+        table: list(caches)
+        for table, caches in session_caches.table_caches.items()
+    })
+    return session_caches.register(recorder)
+
+
+def test_catalogs_are_cached_until_an_entry_is_created(client, headers, catalogs):
+    # creating the store drops the catalog loaded to look it up
+    create_article(client, headers, "Milk", store="Aldi")
+    create_article(client, headers, "Bread", store="ALDI")
+    misses, hits = catalogs.misses, catalogs.hits
+    create_article(client, headers, "Cheese", store="aldi")
+    assert (catalogs.misses, catalogs.hits) == (misses, hits + 1)
+
+    create_article(client, headers, "Eggs", store="Lidl")
+    misses = catalogs.misses
+    create_article(client, headers, "Butter", store="lidl")
+    assert catalogs.misses == misses + 1
+
+    response = client.get("/api/stores/", headers=headers)
+    assert sorted(store["name"] for store in response.json()) == ["Aldi", "Lidl"]
+
+
+def test_caches_follow_flushes_of_their_tables_until_commit_or_rollback(client, headers, username, recorder):
+    db = SessionLocal()
+    try:
+        user = User.get(username, db)
+        store = Store.create(user)
+        store.set_name("Aldi")
+        db.add(store)
+        db.flush()
+        db.commit()
+        assert recorder.calls == [("flushed", ["Aldi"]), ("committed", )]
+
+        recorder.calls.clear()
+        store.set_name("Lidl")
+        user.first_name = "Other"
+        db.flush()
+        db.rollback()
+        assert recorder.calls == [("flushed", ["Lidl"]), ("rolled_back", )]
+    finally:
+        db.close()
+
+
+def test_rolled_back_changes_keep_catalogs(client, headers, username, catalogs):
+    create_article(client, headers, "Milk", store="Aldi")
+    db = SessionLocal()
+    try:
+        user = User.get(username, db)
+        assert Catalog.of(Store, user, db).id("aldi") is not None
+        store = Store.create(user)
+        store.set_name("Lidl")
+        db.add(store)
+        db.flush()
+        assert "changed_catalogs" in db.info
+        db.rollback()
+        assert "changed_catalogs" not in db.info
+        assert Catalog.cache.peek(Catalog.key(Store, username)) is not None
+    finally:
+        db.close()
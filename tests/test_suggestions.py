@@ -0,0 +1,57 @@
+import pytest
+from app.lib import Suggestions
+from app.lib.LRUCache import LRUCache
+from tests.utils import add_item, create_article, create_list
+
+
+@pytest.fixture(autouse=True)
+def suggestions(monkeypatch):
+    cache = LRUCache(64, 300)
+    monkeypatch.setattr(Suggestions, "cache", cache)
+    return cache
+
+
+def suggest(client, headers, q, **params):
+    response = client.get("/api/suggest/", params=dict(q=q, **params), headers=headers)
+    assert response.status_code == 200, response.text
+    return [suggestion["name"] for suggestion in response.json()]
+
+
+def test_words_starting_with_the_prefix_are_suggested_most_used_first(client, headers, other_headers):
+    ids = {
+        name: create_article(client, headers, name, store="Milk & More")["id"]
+        for name in ("Whole Milk", "Milk", "Milkshake", "Bread")
+    }
+    create_article(client, other_headers, "Milk rice")
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], ids["Whole Milk"])
+
+    assert suggest(client, headers, "MIL") == ["Whole Milk", "Milk", "Milkshake"]
+    assert suggest(client, headers, "mil", limit=2) == ["Whole Milk", "Milk"]
+    assert suggest(client, headers, "milk &", type="store") == ["Milk &amp; More"]
+    assert suggest(client, headers, "xyz") == []
+
+
+def test_invalid_prefixes_and_limits_are_rejected(client, headers):
+    assert client.get("/api/suggest/", params=dict(q=" "), headers=headers).status_code == 400
+    assert client.get("/api/suggest/", params=dict(q="a", limit=0), headers=headers).status_code == 400
+    assert client.get("/api/suggest/", params=dict(q="a", limit=51), headers=headers).status_code == 400
+
+
+def test_suggestions_follow_writes(client, headers, suggestions):
+    milk = create_article(client, headers, "Milk")
+    bread = create_article(client, headers, "Milk bread")
+    assert suggest(client, headers, "milk") == ["Milk", "Milk bread"]
+
+    # list items change usage counts in place
+    shopping_list = create_list(client, headers, "Weekly")
+    add_item(client, headers, shopping_list["id"], bread["id"])
+    misses = suggestions.misses
+    assert suggest(client, headers, "milk") == ["Milk bread", "Milk"]
+    assert suggestions.misses == misses
+
+    response = client.put("/api/articles/", json=dict(id=milk["id"], name="Oat milk"), headers=headers)
+    assert response.status_code == 200, response.text
+    assert suggest(client, headers, "oat") == ["Oat milk"]
+    assert client.delete(f"/api/articles/{milk['id']}", headers=headers).status_code in (200, 204)
+    assert suggest(client, headers, "oat") == []
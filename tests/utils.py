@@ -0,0 +1,50 @@
+from typing import Any, Dict, List
+from fastapi.testclient import TestClient
+
+
+def create_article(client: TestClient, headers: dict, name: str, price: float = 1.0, **fields: Any) -> Dict[str, Any]:
+    body = dict(dict(name=name, detail="", price=dict(price=price, currency="EUR")), **fields)
+    response = client.post("/api/articles/", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def create_list(client: TestClient, headers: dict, title: str, **fields: Any) -> Dict[str, Any]:
+    response = client.post("/api/lists/", json=dict(title=title, **fields), headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def add_item(client: TestClient, headers: dict, list_id: int, article_id: int, amount: float = 1, **fields: Any) -> Dict[str, Any]:
+    response = client.post(f"/api/lists/{list_id}/items/", json=dict(article_id=article_id, amount=amount, **fields), headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def names(rows: List[Dict[str, Any]], field: str = "name") -> List[Any]:
+    return [row[field] for row in rows]
+
+
+class QueryCounter:
+    """
+    Counts the statements sent to the primary database while it is entered.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __enter__(self) -> "QueryCounter":
+        from sqlalchemy import event
+        from app.db import engine
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        from sqlalchemy import event
+        from app.db import engine
+
+        event.remove(engine, "before_cursor_execute", self.record)
+
+    def record(self, *args) -> None:
+        self.count += 1